@@ -13,6 +13,25 @@ class Settings(BaseSettings):
     # Files
     DATA_DIR = "data"
     OPERADORAS_CSV = DATA_DIR + "/Relatorio_cadop.csv"
+    # Built with expense_rollups.py (Teste_de_Banco_de_Dados) --rollups-dir API/data/rollups
+    ROLLUPS_TOP_K = DATA_DIR + "/rollups/top_k.json"
+
+    # Operators
+    CADOP_REFRESH_SECONDS: int = 60  # How often the CSV is checked for a new version
+    CADOP_CHANGELOG_SIZE: int = 10000  # Operator changes kept for the changelog endpoint
+    # Versions of the registry (appended on every refresh) and archived files to import into them
+    CADOP_HISTORY_FILE = DATA_DIR + "/cadop_history.jsonl"
+    CADOP_SNAPSHOTS_DIR = DATA_DIR + "/cadop_snapshots"  # Relatorio_cadop_yyyy-mm-dd.csv files
+    CADOP_HISTORY_CACHE: int = 4  # Past versions kept indexed in memory for as_of searches
+
+    # Suggestions
+    SUGGEST_TOP_K: int = 10  # Suggestions kept per prefix (maximum limit of the suggest endpoint)
+    SUGGEST_QUERY_LOG = DATA_DIR + "/query_log.jsonl"  # Operators opened by registro_ans, weighting suggestions
+
+    # Analytics
+    ANALYTICS_CACHE_SIZE: int = 256  # Rankings kept in memory, one per period and account
+    ANALYTICS_DEFAULT_DESCRIPTION: str = ("EVENTOS/ SINISTROS CONHECIDOS OU AVISADOS  "
+                                          "DE ASSISTÊNCIA A SAÚDE MEDICO HOSPITALAR")
 
     class Config:
         env_file = ".env"
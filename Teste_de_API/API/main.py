@@ -1,13 +1,29 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from config import settings
-from routes import routes
+from routes import routes, analytics_routes
+from services.analytics_service import get_analytics_service
+from services.search_service import get_search_service
+from services.suggest_service import get_suggest_service
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the operators, the suggestions and the expense rollups with the app, not on the first request
+    get_search_service()
+    get_suggest_service()
+    get_analytics_service()
+    yield
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     description="API for searching healthcare operators in Brazil",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -22,3 +38,4 @@ app.add_middleware(
 
 # Include routers
 app.include_router(routes.router, prefix="/api/v1", tags=["operators"])
+app.include_router(analytics_routes.router, prefix="/api/v1", tags=["analytics"])
@@ -0,0 +1,10 @@
+from typing import List
+
+from pydantic import BaseModel
+
+from models.operator_change import OperatorChange
+
+
+class ChangelogResponse(BaseModel):
+    version: int  # Version of the loaded operators
+    changes: List[OperatorChange]
@@ -0,0 +1,17 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class Expense(BaseModel):
+    """Expense of an operator in one quarter, joined with the operator registry"""
+    quarter: str
+    registro_ans: str
+    razao_social: Optional[str] = None
+    modalidade: Optional[str] = None
+    uf: Optional[str] = None
+    cd_conta_contabil: str
+    descricao: Optional[str] = None
+    vl_saldo_inicial: float
+    vl_saldo_final: float
+    despesa: float
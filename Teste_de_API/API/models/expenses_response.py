@@ -0,0 +1,10 @@
+from typing import List
+
+from pydantic import BaseModel
+
+from models.expense import Expense
+
+
+class ExpensesResponse(BaseModel):
+    period: str
+    data: List[Expense]
@@ -0,0 +1,15 @@
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from models.operator import Operator
+
+
+class OperatorChange(BaseModel):
+    """Insert, update or delete of an operator found when the CADOP file was refreshed"""
+    version: int
+    changed_at: str
+    operation: str  # insert, update or delete
+    registro_ans: str
+    fields: List[str] = []  # Changed fields (updates only)
+    operator: Optional[Operator] = None  # Record after the change (None for deletes)
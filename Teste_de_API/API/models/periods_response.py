@@ -0,0 +1,8 @@
+from typing import List
+
+from pydantic import BaseModel
+
+
+class PeriodsResponse(BaseModel):
+    quarters: List[str]
+    years: List[str]
@@ -1,3 +1,4 @@
+from datetime import date
 from typing import Optional
 
 from pydantic import BaseModel
@@ -8,3 +9,4 @@ class SearchParams(BaseModel):
     query: str
     category: str
     limit: int = 20
+    as_of: Optional[date] = None  # Search the registry as it was on this date
@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+
+
+class Suggestion(BaseModel):
+    """Type-ahead suggestion of an operator"""
+    id: str  # registro_ans
+    label: str  # razao_social
@@ -0,0 +1,9 @@
+from typing import List
+
+from pydantic import BaseModel
+
+from models.suggestion import Suggestion
+
+
+class SuggestionsResponse(BaseModel):
+    data: List[Suggestion]
@@ -0,0 +1,40 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query, HTTPException
+
+from models.expenses_response import ExpensesResponse
+from models.periods_response import PeriodsResponse
+from services.analytics_service import AnalyticsService, get_analytics_service
+
+router = APIRouter()
+
+
+@router.get("/analytics/top-expenses", response_model=ExpensesResponse)
+async def top_expenses(
+        period: str = Query(..., description="Quarter (2024Q4) or year (2024)"),
+        account: Optional[str] = Query(None, description="Account code (cd_conta_contabil)"),
+        description: Optional[str] = Query(None, description="Account description, used when no account is given"),
+        limit: int = Query(10, ge=1, le=100, description="Number of operators"),
+        analytics_service: AnalyticsService = Depends(get_analytics_service),
+):
+    """
+    Rank the operators with the highest expenses of an account in a quarter or year.
+    Defaults to the medical and hospital claims account of the analytical queries.
+    """
+    try:
+        results = analytics_service.top_expenses(period, account, description, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if not results.data:
+        raise HTTPException(status_code=404, detail="No expenses found for this period and account")
+
+    return results
+
+
+@router.get("/analytics/periods", response_model=PeriodsResponse)
+async def periods(analytics_service: AnalyticsService = Depends(get_analytics_service)):
+    """
+    List the quarters and years with expense rollups.
+    """
+    return analytics_service.periods()
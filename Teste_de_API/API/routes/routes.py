@@ -1,8 +1,15 @@
+from datetime import date
+from typing import Optional
+
 from fastapi import APIRouter, Depends, Query, HTTPException
+from models.changelog_response import ChangelogResponse
+from models.operator import Operator
 from models.operators_response import OperatorsResponse
 from models.search_params import SearchParams
+from models.suggestions_response import SuggestionsResponse
 
-from services.search_service import SearchService
+from services.search_service import ChangelogExpiredError, SearchService, get_search_service
+from services.suggest_service import SuggestService, get_suggest_service
 
 router = APIRouter()
 
@@ -11,7 +18,8 @@ router = APIRouter()
 async def search_operadoras(
         query: str = Query(..., description="Search term"),
         category: str = Query(..., description="Search category"),
-        search_service: SearchService = Depends(),
+        as_of: Optional[date] = Query(None, description="Search the registry as it was on this date (YYYY-MM-DD)"),
+        search_service: SearchService = Depends(get_search_service),
 ):
     """
     Search healthcare operators by text query.
@@ -20,7 +28,8 @@ async def search_operadoras(
 
     search_params = SearchParams(
         query=query,
-        category=category
+        category=category,
+        as_of=as_of
     )
 
     # Set definitive 20 limit to avoid malicious request
@@ -32,3 +41,52 @@ async def search_operadoras(
         raise HTTPException(status_code=404, detail="No matching operators found")
 
     return results
+
+
+@router.get("/operators/changelog", response_model=ChangelogResponse)
+async def operators_changelog(
+        since: int = Query(0, ge=0, description="Version already known by the client"),
+        limit: int = Query(1000, ge=1, le=10000, description="Maximum number of changes"),
+        search_service: SearchService = Depends(get_search_service),
+):
+    """
+    List the operators inserted, updated or deleted by the CADOP refreshes after a version.
+    """
+    try:
+        return search_service.changes_since(since, limit)
+    except ChangelogExpiredError as e:
+        raise HTTPException(status_code=410, detail=str(e))
+
+
+@router.get("/operators/suggest", response_model=SuggestionsResponse)
+async def suggest_operators(
+        q: str = Query(..., description="Typed text"),
+        limit: int = Query(10, ge=1, le=10, description="Maximum number of suggestions"),
+        suggest_service: SuggestService = Depends(get_suggest_service),
+):
+    """
+    Suggest operators whose razao_social, nome_fantasia or cidade words start with the typed words.
+    Returns only the registro_ans (id) and razao_social (label), most picked first.
+    """
+    return suggest_service.suggest(q, limit)
+
+
+@router.get("/operators/{registro_ans}", response_model=Operator)
+async def get_operator(
+        registro_ans: str,
+        as_of: Optional[date] = Query(None, description="Return the operator as it was on this date (YYYY-MM-DD)"),
+        search_service: SearchService = Depends(get_search_service),
+        suggest_service: SuggestService = Depends(get_suggest_service),
+):
+    """
+    Get a healthcare operator by its ANS registration.
+    """
+    operator = search_service.get_operator(registro_ans, as_of)
+
+    if operator is None:
+        raise HTTPException(status_code=404, detail="Operator not found")
+
+    if as_of is None:
+        suggest_service.log_pick(registro_ans)
+
+    return operator
@@ -0,0 +1,124 @@
+import re
+import json
+import heapq
+import threading
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from config import settings
+from models.expense import Expense
+from models.expenses_response import ExpensesResponse
+from models.periods_response import PeriodsResponse
+from services.search_service import SearchService, get_search_service
+
+QUARTER_PATTERN = re.compile(r"^(\d{4})Q([1-4])$")
+
+
+class AnalyticsService:
+    """
+    Expense rankings served from the precomputed rollups (see expense_rollups.py in
+    Teste_de_Banco_de_Dados), joined in memory with the operators loaded by the
+    SearchService. Loaded once with the app; rankings are cached per period and
+    account, and dropped when the operators change version.
+    """
+
+    def __init__(self, search_service: SearchService):
+        self.search_service = search_service
+        # Quarter ("2024Q4") -> account -> [variation, reg_ans, vl_saldo_inicial, vl_saldo_final] (cents)
+        self.top: Dict[str, Dict[str, List[list]]] = {}
+        self.descriptions: Dict[str, str] = {}
+        self.k = 0
+        self.version = search_service.version  # Version of the operators in the cached rankings
+        self._lock = threading.Lock()
+        self._load_rollups()
+        self._ranking = lru_cache(maxsize=settings.ANALYTICS_CACHE_SIZE)(self._rank)
+
+    def _load_rollups(self) -> None:
+        """Load the top-k lists of every quarter"""
+        try:
+            with open(settings.ROLLUPS_TOP_K, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.top = data["quarters"]
+            self.descriptions = data["descriptions"]
+            self.k = data["k"]
+            print(f"Loaded expense rollups of {len(self.top)} quarters")
+        except Exception as e:
+            print(f"Error loading expense rollups: {e}")
+
+    def refresh(self) -> None:
+        """Drop the cached rankings when the operators changed version"""
+        with self._lock:
+            if self.version == self.search_service.version:
+                return
+            self._ranking.cache_clear()
+            self.version = self.search_service.version
+
+    def periods(self) -> PeriodsResponse:
+        """Quarters and years with rollups"""
+        quarters = sorted(self.top)
+        return PeriodsResponse(quarters=quarters, years=sorted({quarter[:4] for quarter in quarters}))
+
+    def _quarters_of(self, period: str) -> List[str]:
+        """Quarters of a quarter ("2024Q4") or year ("2024") period"""
+        if QUARTER_PATTERN.match(period):
+            return [period] if period in self.top else []
+        if period.isdigit() and len(period) == 4:
+            return [quarter for quarter in self.top if quarter.startswith(period)]
+        raise ValueError(f"Invalid period '{period}', expected a year (2024) or a quarter (2024Q4)")
+
+    def _accounts_of(self, account: Optional[str], description: Optional[str]) -> Tuple[str, ...]:
+        """Account codes selected by an account code or a description"""
+        if account:
+            return (re.sub(r"[^0-9A-Za-z]", "", account),)
+        description = (description or settings.ANALYTICS_DEFAULT_DESCRIPTION).strip()
+        return tuple(sorted(code for code, text in self.descriptions.items() if text == description))
+
+    def _rank(self, period: str, accounts: Tuple[str, ...]) -> Tuple[Expense, ...]:
+        """The k highest expenses (lowest variation) of the accounts in the period"""
+        candidates = (
+            (entry[0], quarter, code, entry)
+            for quarter in self._quarters_of(period)
+            for code in accounts
+            for entry in self.top[quarter].get(code, [])
+        )
+        records = self.search_service.index.records
+        ranked = []
+        for variation, quarter, code, (_, registro_ans, initial, final) in heapq.nsmallest(
+                self.k, candidates, key=lambda item: item[0]):
+            record = records.get(registro_ans, {})
+            ranked.append(Expense(
+                quarter=quarter,
+                registro_ans=registro_ans,
+                razao_social=record.get("razao_social"),
+                modalidade=record.get("modalidade"),
+                uf=record.get("uf"),
+                cd_conta_contabil=code,
+                descricao=self.descriptions.get(code),
+                vl_saldo_inicial=initial / 100,
+                vl_saldo_final=final / 100,
+                despesa=abs(variation) / 100
+            ))
+        return tuple(ranked)
+
+    def top_expenses(self, period: str, account: Optional[str] = None, description: Optional[str] = None,
+                     limit: int = 10) -> ExpensesResponse:
+        """
+        Operators with the highest expenses of an account in a quarter or year
+        (same order as analytical_queries.sql)
+        """
+        period = period.strip().upper()
+        ranking = self._ranking(period, self._accounts_of(account, description))
+        return ExpensesResponse(period=period, data=list(ranking[:limit]))
+
+
+@lru_cache(maxsize=None)
+def _analytics_service() -> AnalyticsService:
+    return AnalyticsService(get_search_service())
+
+
+def get_analytics_service() -> AnalyticsService:
+    """Single AnalyticsService of the app (loaded on startup), with rankings dropped after the operators are refreshed"""
+    get_search_service()  # Refreshes the operators when the CSV was replaced
+    service = _analytics_service()
+    service.refresh()
+    return service
@@ -0,0 +1,214 @@
+import os
+import re
+import json
+from bisect import bisect_right
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from services.operator_index import Record
+
+SNAPSHOT_PATTERN = re.compile(r"^Relatorio_cadop_(\d{4}-\d{2}-\d{2})\.csv$", re.IGNORECASE)
+
+
+class OperatorHistory:
+    """
+    Successive versions of the CADOP registry, stored as column deltas.
+
+    Each version has the date it became valid (versions are valid until the next
+    one). Instead of a copy per version, every (operator, field) keeps only the
+    versions where its value changed, and every operator the versions where it was
+    added or removed, so a value as of a version is a binary search (the interval
+    index) over a handful of change points. Repeated values share one string.
+
+    The versions are appended to a JSON lines log (inserted records, changed fields
+    and deleted registros per version), replayed on load. Versions older than the
+    latest one are merged in with rebuild(), which rewrites the log in date order.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.dates: List[date] = []  # Date each version became valid (version n is dates[n - 1])
+        self.fields: List[str] = []
+        # registro_ans -> field -> (versions where the value changed, values)
+        self.columns: Dict[str, Dict[str, Tuple[List[int], List[str]]]] = {}
+        # registro_ans -> versions where the operator was added or removed, alternating
+        self.presence: Dict[str, List[int]] = {}
+        self._strings: Dict[str, str] = {}
+        self._load()
+
+    @property
+    def version(self) -> int:
+        """Latest version (0 when empty)"""
+        return len(self.dates)
+
+    def _reset(self) -> None:
+        self.dates = []
+        self.fields = []
+        self.columns = {}
+        self.presence = {}
+        self._strings = {}
+
+    def _load(self) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._apply(date.fromisoformat(entry["valid_from"]), entry["inserts"],
+                                    entry["updates"], entry["deletes"])
+            print(f"Loaded {self.version} versions of the operators history")
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Error loading operators history: {e}")
+
+    def _value(self, key: str, field: str, version: int) -> str:
+        versions, values = self.columns.get(key, {}).get(field, ((), ()))
+        position = bisect_right(versions, version) - 1
+        return values[position] if position >= 0 else ''
+
+    def _set(self, key: str, field: str, version: int, value: str) -> None:
+        versions, values = self.columns.setdefault(key, {}).setdefault(field, ([], []))
+        versions.append(version)
+        values.append(self._strings.setdefault(value, value))
+
+    def _apply(self, valid_from: date, inserts: Dict[str, Record], updates: Dict[str, Record],
+               deletes: List[str]) -> int:
+        if self.dates and valid_from < self.dates[-1]:
+            raise ValueError(f"Version dated {valid_from} is older than the latest one ({self.dates[-1]})")
+        self.dates.append(valid_from)
+        version = self.version
+
+        for key, record in inserts.items():
+            self.presence.setdefault(key, []).append(version)
+            for field, value in record.items():
+                if field not in self.fields:
+                    self.fields.append(field)
+                # Empty values are implicit, and an operator added back keeps the values that did not change
+                if self._value(key, field, version - 1) != value:
+                    self._set(key, field, version, value)
+        for key, changed in updates.items():
+            for field, value in changed.items():
+                self._set(key, field, version, value)
+        for key in deletes:
+            self.presence[key].append(version)
+        return version
+
+    def append(self, valid_from: date, inserts: Dict[str, Record], updates: Dict[str, Record],
+               deletes: List[str]) -> int:
+        """
+        Add a version and append it to the log.
+
+        Args:
+            valid_from: Date the version became valid (not older than the latest version)
+            inserts: registro_ans -> record of the operators added
+            updates: registro_ans -> changed fields and their new values
+            deletes: registro_ans of the operators removed
+
+        Returns:
+            Number of the new version
+        """
+        version = self._apply(valid_from, inserts, updates, deletes)
+        if self.path:
+            try:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(_entry(version, valid_from, inserts, updates, deletes))
+            except OSError as e:
+                print(f"Error saving operators history: {e}")
+        return version
+
+    def rebuild(self, snapshots: List[Tuple[date, Dict[str, Record]]]) -> None:
+        """
+        Merge full snapshots of any date into the history, rewriting the log.
+
+        Every version is expanded to its full set of records, the snapshots are placed
+        among them by date (after the versions of the same date) and the deltas are
+        computed again, so the versions after a merged snapshot are renumbered.
+
+        Args:
+            snapshots: (date the snapshot became valid, registro_ans -> record)
+        """
+        versions = [(valid_from, self.snapshot(version)) for version, valid_from in enumerate(self.dates, 1)]
+        versions.sort(key=lambda item: item[0])
+        for valid_from, records in sorted(snapshots, key=lambda item: item[0]):
+            versions.insert(bisect_right([item[0] for item in versions], valid_from), (valid_from, records))
+
+        self._reset()
+        lines = []
+        previous: Dict[str, Record] = {}
+        for valid_from, records in versions:
+            inserts, updates, deletes = diff_records(previous, records)
+            version = self._apply(valid_from, inserts, updates, deletes)
+            lines.append(_entry(version, valid_from, inserts, updates, deletes))
+            previous = records
+
+        if self.path:
+            temp_path = f"{self.path}.{os.getpid()}.tmp"
+            try:
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    f.writelines(lines)
+                os.replace(temp_path, self.path)
+            except OSError as e:
+                print(f"Error saving operators history: {e}")
+
+    def version_at(self, as_of: date) -> int:
+        """Version valid on a date (0 if the date is before the first version)"""
+        return bisect_right(self.dates, as_of)
+
+    def record_at(self, key: str, version: int) -> Optional[Record]:
+        """Record of an operator in a version, None if it was not registered then"""
+        if bisect_right(self.presence.get(key, ()), version) % 2 == 0:
+            return None
+        return {field: self._value(key, field, version) for field in self.fields}
+
+    def snapshot(self, version: int) -> Dict[str, Record]:
+        """Every operator registered in a version, in the order they were first added"""
+        snapshot = {}
+        for key in self.presence:
+            record = self.record_at(key, version)
+            if record is not None:
+                snapshot[key] = record
+        return snapshot
+
+
+def _entry(version: int, valid_from: date, inserts: Dict[str, Record], updates: Dict[str, Record],
+           deletes: List[str]) -> str:
+    """Log line of a version"""
+    return json.dumps({"version": version, "valid_from": valid_from.isoformat(), "inserts": inserts,
+                       "updates": updates, "deletes": deletes}, ensure_ascii=False) + "\n"
+
+
+def diff_records(old: Dict[str, Record], new: Dict[str, Record]) -> Tuple[Dict[str, Record], Dict[str, Record],
+                                                                         List[str]]:
+    """
+    Differences between two full sets of records.
+
+    Returns:
+        (records inserted, changed fields of the records updated, registros deleted)
+    """
+    inserts = {key: record for key, record in new.items() if key not in old}
+    updates = {}
+    for key, record in new.items():
+        if key in old:
+            changed = {field: value for field, value in record.items() if old[key].get(field, '') != value}
+            if changed:
+                updates[key] = changed
+    deletes = [key for key in old if key not in new]
+    return inserts, updates, deletes
+
+
+def snapshot_files(directory: str) -> List[Tuple[date, str]]:
+    """
+    Archived CADOP files named Relatorio_cadop_yyyy-mm-dd.csv in a directory.
+
+    Returns:
+        (date, path) sorted by date
+    """
+    if not directory or not os.path.isdir(directory):
+        return []
+    files = []
+    for name in os.listdir(directory):
+        match = SNAPSHOT_PATTERN.match(name)
+        if match:
+            files.append((date.fromisoformat(match.group(1)), os.path.join(directory, name)))
+    return sorted(files)
@@ -0,0 +1,204 @@
+import hashlib
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+# Fields searched by substring (trigram bitmaps) and by value (facet bitmaps)
+TEXT_FIELDS = ("registro_ans", "razao_social")
+FACET_FIELDS = ("modalidade",)
+
+Record = Dict[str, str]
+
+
+def load_operators_csv(path: str) -> Tuple[List[str], Dict[str, Record]]:
+    """
+    Read the CADOP CSV into records keyed by registro_ans.
+
+    Returns:
+        (column names, registro_ans -> record); values are stripped strings ("" when empty)
+    """
+    df = pd.read_csv(
+        path,
+        encoding='utf-8',
+        dtype=str,
+        delimiter=';',
+        low_memory=False,
+        quoting=1
+    )
+    df.columns = [col.strip().lower().replace(' ', '_') for col in df.columns]
+    df = df.fillna('')
+
+    columns = list(df.columns)
+    records: Dict[str, Record] = {}
+    for values in df.itertuples(index=False, name=None):
+        record = dict(zip(columns, (value.strip() for value in values)))
+        # The registry has one row per operator; keep the first one if a file repeats it
+        records.setdefault(record['registro_ans'], record)
+    return columns, records
+
+
+def row_hash(record: Record) -> bytes:
+    """Hash of every value of a record, to detect changed rows without comparing fields"""
+    return hashlib.blake2b("\x1f".join(record.values()).encode('utf-8'), digest_size=8).digest()
+
+
+def _trigrams(value: str) -> set:
+    return {value[i:i + 3] for i in range(len(value) - 2)}
+
+
+def _bits(bitmap: int) -> Iterator[int]:
+    """Positions of the set bits, lowest first"""
+    while bitmap:
+        lowest = bitmap & -bitmap
+        yield lowest.bit_length() - 1
+        bitmap ^= lowest
+
+
+class OperatorIndex:
+    """
+    Operators by registro_ans with bitmap indexes for search, maintained per change.
+
+    Every operator holds a slot (its bit in the bitmaps, which are Python ints):
+        - trigram bitmaps of the lowercased TEXT_FIELDS answer substring searches
+        - facet bitmaps of each lowercased value of the FACET_FIELDS answer value searches
+    Slots follow the load order, so results come in the order of the CSV (operators
+    added later come after the existing ones), and updating an operator only touches
+    the bitmaps of the fields that changed.
+    """
+
+    def __init__(self):
+        self.records: Dict[str, Record] = {}
+        self.hashes: Dict[str, bytes] = {}
+        self.slots: Dict[str, int] = {}
+        self.keys: List[Optional[str]] = []  # slot -> registro_ans (None once deleted)
+        self.live = 0  # Bitmap of the slots in use
+        self.trigrams: Dict[str, Dict[str, int]] = {field: {} for field in TEXT_FIELDS}
+        self.facets: Dict[str, Dict[str, int]] = {field: {} for field in FACET_FIELDS}
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @staticmethod
+    def _toggle(bitmaps: Dict[str, int], key: str, bit: int, on: bool) -> None:
+        if on:
+            bitmaps[key] = bitmaps.get(key, 0) | bit
+        else:
+            bitmap = bitmaps.get(key, 0) & ~bit
+            if bitmap:
+                bitmaps[key] = bitmap
+            else:
+                bitmaps.pop(key, None)
+
+    def _index_fields(self, slot: int, record: Record, fields: List[str], on: bool) -> None:
+        """Set (or clear) the bit of a slot in the bitmaps of some fields of its record"""
+        bit = 1 << slot
+        for field in fields:
+            value = record.get(field, '').lower()
+            if field in self.trigrams:
+                for trigram in _trigrams(value):
+                    self._toggle(self.trigrams[field], trigram, bit, on)
+            if field in self.facets:
+                self._toggle(self.facets[field], value, bit, on)
+
+    @property
+    def _indexed_fields(self) -> List[str]:
+        return [*self.trigrams, *self.facets]
+
+    def insert(self, key: str, record: Record, digest: bytes) -> None:
+        """Add a new operator in a new slot"""
+        slot = len(self.keys)
+        self.keys.append(key)
+        self.slots[key] = slot
+        self.records[key] = record
+        self.hashes[key] = digest
+        self.live |= 1 << slot
+        self._index_fields(slot, record, self._indexed_fields, True)
+
+    def update(self, key: str, record: Record, digest: bytes) -> List[str]:
+        """
+        Replace the record of an operator, reindexing only the changed fields.
+
+        Returns:
+            Names of the changed fields
+        """
+        old = self.records[key]
+        changed = [field for field in record if record[field] != old.get(field, '')]
+        indexed = [field for field in changed if field in self._indexed_fields]
+        slot = self.slots[key]
+        self._index_fields(slot, old, indexed, False)
+        self._index_fields(slot, record, indexed, True)
+        self.records[key] = record
+        self.hashes[key] = digest
+        return changed
+
+    def delete(self, key: str) -> Record:
+        """Remove an operator; returns its last record"""
+        slot = self.slots.pop(key)
+        record = self.records.pop(key)
+        self._index_fields(slot, record, self._indexed_fields, False)
+        del self.hashes[key]
+        self.keys[slot] = None
+        self.live &= ~(1 << slot)
+        return record
+
+    def diff(self, records: Dict[str, Record]) -> Tuple[List[str], List[str], List[str]]:
+        """
+        Compare a full set of records with the indexed ones by row hash.
+
+        Args:
+            records: registro_ans -> record, e.g. from load_operators_csv
+
+        Returns:
+            (registros inserted, updated, deleted)
+        """
+        inserted, updated = [], []
+        for key, record in records.items():
+            current = self.hashes.get(key)
+            if current is None:
+                inserted.append(key)
+            elif current != row_hash(record):
+                updated.append(key)
+        deleted = [key for key in self.records if key not in records]
+        return inserted, updated, deleted
+
+    def _candidates(self, field: str, query: str) -> int:
+        """Bitmap of the slots that may match a lowercased query on a field"""
+        if field in self.facets:
+            bitmap = 0
+            for value, values_bitmap in self.facets[field].items():
+                if query in value:
+                    bitmap |= values_bitmap
+            return bitmap
+        if field in self.trigrams and len(query) >= 3:
+            bitmap = self.live
+            for trigram in _trigrams(query):
+                bitmap &= self.trigrams[field].get(trigram, 0)
+                if not bitmap:
+                    break
+            return bitmap
+        return self.live  # Queries shorter than a trigram are checked against every operator
+
+    def search(self, field: str, query: str, limit: int) -> List[Record]:
+        """
+        Operators whose field contains the query (case insensitive), in slot order.
+
+        Args:
+            field: One of TEXT_FIELDS or FACET_FIELDS
+            query: Search text
+            limit: Maximum number of records
+
+        Returns:
+            Matching records
+        """
+        if field not in self.trigrams and field not in self.facets:
+            return []
+        query = query.lower()
+        results = []
+        for slot in _bits(self._candidates(field, query)):
+            record = self.records[self.keys[slot]]
+            # Trigrams only narrow the candidates, the substring itself is checked here
+            if query in record.get(field, '').lower():
+                results.append(record)
+                if len(results) >= limit:
+                    break
+        return results
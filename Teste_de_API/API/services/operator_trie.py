@@ -0,0 +1,154 @@
+import re
+import unicodedata
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Fields whose words complete a suggestion
+SUGGEST_FIELDS = ("razao_social", "nome_fantasia", "cidade")
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def normalize(text: str) -> List[str]:
+    """Lowercase words of a text without accents or punctuation ("Saúde S.A." -> ["saude", "s", "a"])"""
+    text = unicodedata.normalize("NFKD", text.lower())
+    return TOKEN_PATTERN.findall(text.encode("ascii", "ignore").decode("ascii"))
+
+
+def _bits(bitmap: int) -> Iterator[int]:
+    """Positions of the set bits, lowest first"""
+    while bitmap:
+        lowest = bitmap & -bitmap
+        yield lowest.bit_length() - 1
+        bitmap ^= lowest
+
+
+class _Node:
+    __slots__ = ("children", "entries", "top")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.entries = 0  # Bitmap of the entries with a word starting with this prefix
+        self.top: List[int] = []  # Heaviest of those entries, best first
+
+
+class OperatorTrie:
+    """
+    Prefix tree over the normalized words of the SUGGEST_FIELDS, for type-ahead.
+
+    Every operator is an entry (its bit in the node bitmaps, as in OperatorIndex).
+    Each node keeps the bitmap of the entries under it and its k heaviest entries,
+    so completing one word is a walk down the prefix and a slice of the node top
+    list. Weights only grow (they count how often an operator was picked), so a
+    new weight only moves its entry up the top lists on its own paths.
+    """
+
+    def __init__(self, k: int):
+        self.k = k
+        self.root = _Node()
+        self.keys: List[str] = []  # entry -> registro_ans
+        self.labels: List[str] = []  # entry -> label shown
+        self.weights: List[int] = []
+        self.slots: Dict[str, int] = {}  # registro_ans -> entry
+        self.words: List[List[str]] = []  # entry -> normalized words
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _rank(self, entry: int) -> Tuple[int, int]:
+        # Heaviest first, then in load order
+        return -self.weights[entry], entry
+
+    def _nodes(self, entry: int) -> Iterator[_Node]:
+        """Every node on the paths of the words of an entry (once each)"""
+        seen = set()
+        for word in self.words[entry]:
+            node = self.root
+            for char in word:
+                node = node.children[char]
+                if id(node) not in seen:
+                    seen.add(id(node))
+                    yield node
+
+    def add(self, key: str, label: str, texts: List[str], weight: int = 1) -> None:
+        """
+        Add an operator, before build().
+
+        Args:
+            key: registro_ans
+            label: Text returned with the suggestion
+            texts: Values of the SUGGEST_FIELDS
+            weight: Initial weight
+        """
+        entry = len(self.keys)
+        self.keys.append(key)
+        self.labels.append(label)
+        self.weights.append(weight)
+        self.slots[key] = entry
+        self.words.append(sorted({word for text in texts for word in normalize(text)}))
+        bit = 1 << entry
+        for word in self.words[entry]:
+            node = self.root
+            for char in word:
+                node = node.children.setdefault(char, _Node())
+                node.entries |= bit
+
+    def build(self) -> None:
+        """Compute the top list of every node"""
+        stack = list(self.root.children.values())
+        while stack:
+            node = stack.pop()
+            node.top = sorted(_bits(node.entries), key=self._rank)[:self.k]
+            stack.extend(node.children.values())
+
+    def add_weight(self, key: str, amount: int = 1) -> None:
+        """Increase the weight of an operator and move it up the top lists of its prefixes"""
+        entry = self.slots.get(key)
+        if entry is None:
+            return
+        self.weights[entry] += amount
+        rank = self._rank(entry)
+        for node in self._nodes(entry):
+            top = node.top
+            if entry in top:
+                top.remove(entry)
+            elif len(top) >= self.k and rank >= self._rank(top[-1]):
+                continue
+            position = 0
+            while position < len(top) and self._rank(top[position]) < rank:
+                position += 1
+            top.insert(position, entry)
+            del top[self.k:]
+
+    def _find(self, prefix: str) -> Optional[_Node]:
+        node = self.root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+
+    def complete(self, query: str, limit: int) -> List[Tuple[str, str]]:
+        """
+        Heaviest operators with a word starting with every word of the query.
+
+        Args:
+            query: Typed text (normalized here)
+            limit: Maximum number of suggestions (up to k for one word queries)
+
+        Returns:
+            (registro_ans, label) of the suggestions
+        """
+        words = normalize(query)
+        if not words:
+            return []
+        nodes = [self._find(word) for word in words]
+        if None in nodes:
+            return []
+        if len(nodes) == 1:
+            entries = nodes[0].top[:limit]
+        else:
+            bitmap = nodes[0].entries
+            for node in nodes[1:]:
+                bitmap &= node.entries
+            entries = sorted(_bits(bitmap), key=self._rank)[:limit]
+        return [(self.keys[entry], self.labels[entry]) for entry in entries]
@@ -1,43 +1,174 @@
-import pandas as pd
-from typing import List
+import os
+import time
+import threading
+from collections import deque
+from datetime import date, datetime, timezone
+from functools import lru_cache
+from typing import Dict, List, Optional
 
 from config import settings
+from models.changelog_response import ChangelogResponse
 from models.operator import Operator
+from models.operator_change import OperatorChange
 from models.operators_response import OperatorsResponse
 from models.search_params import SearchParams
+from services.operator_history import OperatorHistory, diff_records, snapshot_files
+from services.operator_index import OperatorIndex, Record, load_operators_csv, row_hash
+
+
+class ChangelogExpiredError(Exception):
+    """The changes after the requested version are no longer kept"""
 
 
 class SearchService:
+    """
+    Operator search over an in-memory index of the CADOP file.
+
+    The index is built once; when the file is replaced, only the operators whose
+    rows changed (by row hash) are reindexed, and the changes are kept in a changelog.
+    Every version of the registry is kept in the operators history, so searches and
+    lookups can be answered as of a past date.
+    """
+
     def __init__(self):
-        self.df = None
+        self.index = OperatorIndex()
+        self.history = OperatorHistory(settings.CADOP_HISTORY_FILE)
+        self.version = 0
+        self.changelog: deque = deque(maxlen=settings.CADOP_CHANGELOG_SIZE)
+        self._expired_version = 0  # Last version with changes dropped from the changelog
+        self._file_state = None  # (mtime, size) of the loaded CSV
+        self._checked_at = 0.0
+        self._lock = threading.RLock()
+        # Indexes of past versions, built on demand
+        self._past_indexes = lru_cache(maxsize=settings.CADOP_HISTORY_CACHE)(self._index_of_version)
         self._load_data()
 
     def _load_data(self) -> None:
         """Load healthcare operators data from CSV"""
         try:
-
             print("Load data")
-            self.df = pd.read_csv(
-                settings.OPERADORAS_CSV,
-                encoding='utf-8',
-                dtype=str,  # Load all columns as strings initially
-                delimiter= ';',
-                low_memory=False,
-                quoting=1
-            )
-            # Clean column names (remove spaces, lowercase)
-            self.df.columns = [col.strip().lower().replace(' ', '_') for col in self.df.columns]
-
-            # Clean data
-            for col in self.df.columns:
-                if self.df[col].dtype == 'object':
-                    self.df[col] = self.df[col].str.strip()
-
-            print(f"Loaded {len(self.df)} operators from CSV")
+            self._import_snapshots()
+            # Start from the latest version in the history, so the CSV only adds what changed since
+            for key, record in self.history.snapshot(self.history.version).items():
+                self.index.insert(key, record, row_hash(record))
+            self.version = self.history.version
+            self.refresh()
+            print(f"Loaded {len(self.index)} operators from CSV")
         except Exception as e:
             print(f"Error loading CSV data: {e}")
-            # Initialize with empty DataFrame if file not found
-            self.df = pd.DataFrame()
+
+    def _import_snapshots(self) -> None:
+        """
+        Add the archived CADOP files to the history, in date order.
+
+        Files newer than the history are appended to it. Files older than its latest
+        version (archived late) are merged in by rebuilding the history, which
+        renumbers the versions after them. Files dated like a version already in the
+        history were imported before and are skipped.
+        """
+        older = []
+        known = 0
+        for valid_from, path in snapshot_files(settings.CADOP_SNAPSHOTS_DIR):
+            if valid_from in self.history.dates:
+                known += 1
+                continue
+            _, records = load_operators_csv(path)
+            if self.history.dates and valid_from < self.history.dates[-1]:
+                older.append((valid_from, records))
+                continue
+            inserts, updates, deletes = diff_records(self.history.snapshot(self.history.version), records)
+            self.history.append(valid_from, inserts, updates, deletes)
+            print(f"Imported operators snapshot of {valid_from}")
+
+        if known:
+            print(f"Skipped {known} operators snapshots dated like versions already in the history")
+        if older:
+            print(f"Rebuilding the operators history with the older snapshots of "
+                  f"{', '.join(str(valid_from) for valid_from, _ in older)}")
+            self.history.rebuild(older)
+
+    def _stat(self) -> Optional[tuple]:
+        try:
+            stat = os.stat(settings.OPERADORAS_CSV)
+            return stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return None
+
+    def refresh(self) -> int:
+        """
+        Apply the differences between the CSV and the loaded operators.
+
+        The first load indexes every operator without logging changes.
+
+        Returns:
+            Number of changes applied
+        """
+        with self._lock:
+            file_state = self._stat()
+            _, records = load_operators_csv(settings.OPERADORAS_CSV)
+            inserted, updated, deleted = self.index.diff(records)
+            first_load = self.version == 0
+
+            changes = []
+            updates: Dict[str, Record] = {}
+            for key in inserted:
+                self.index.insert(key, records[key], row_hash(records[key]))
+                changes.append(("insert", key, [], records[key]))
+            for key in updated:
+                fields = self.index.update(key, records[key], row_hash(records[key]))
+                if fields:  # Only the column order changed otherwise
+                    changes.append(("update", key, fields, records[key]))
+                    updates[key] = {field: records[key][field] for field in fields}
+            for key in deleted:
+                self.index.delete(key)
+                changes.append(("delete", key, [], None))
+
+            if changes:
+                # The file date is when this version became valid
+                valid_from = datetime.fromtimestamp(file_state[0] / 1e9, timezone.utc).date()
+                if self.history.dates:
+                    valid_from = max(valid_from, self.history.dates[-1])
+                self.version = self.history.append(valid_from, {key: records[key] for key in inserted}, updates,
+                                                   deleted)
+            if changes and not first_load:
+                changed_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+                for operation, key, fields, record in changes:
+                    if len(self.changelog) == self.changelog.maxlen:
+                        self._expired_version = self.changelog[0].version
+                    self.changelog.append(OperatorChange(
+                        version=self.version, changed_at=changed_at, operation=operation, registro_ans=key,
+                        fields=fields, operator=self._to_operator(record) if record else None))
+                print(f"Refreshed operators (version {self.version}): {len(inserted)} inserted, "
+                      f"{len(updated)} updated, {len(deleted)} deleted")
+            self._file_state = file_state
+            return len(changes)
+
+    def refresh_if_changed(self) -> None:
+        """Refresh when the CSV was replaced (checked at most every CADOP_REFRESH_SECONDS)"""
+        now = time.monotonic()
+        if now - self._checked_at < settings.CADOP_REFRESH_SECONDS:
+            return
+        self._checked_at = now
+        if self._stat() not in (None, self._file_state):
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Error refreshing CSV data: {e}")
+
+    def _index_of_version(self, version: int) -> OperatorIndex:
+        index = OperatorIndex()
+        for key, record in self.history.snapshot(version).items():
+            index.insert(key, record, row_hash(record))
+        return index
+
+    def _index_as_of(self, as_of: Optional[date]) -> Optional[OperatorIndex]:
+        """Index of the registry valid on a date (the current one when None)"""
+        if as_of is None:
+            return self.index
+        version = self.history.version_at(as_of)
+        if version == 0:
+            return None
+        return self.index if version == self.history.version else self._past_indexes(version)
 
     def search_operadoras(self, params: SearchParams) -> OperatorsResponse:
         """
@@ -45,59 +176,50 @@ class SearchService:
         Returns the most relevant results
         """
         print("Query to search data: ", params.query)
-        if self.df.empty:
-            return []
-
-        query = params.query.lower()
-
-        # Create mask based on selected fields
-        mask = pd.Series(False, index=self.df.index)
-
-        if params.category  ==  "registro_ans":
-            razao_mask = self.df['registro_ans'].str.contains(query, na=False)
-            mask = mask | razao_mask
-
-        if params.category == "razao_social":
-            nome_mask = self.df['razao_social'].str.lower().str.contains(query, na=False)
-            mask = mask | nome_mask
-
-        if params.category == "modalidade":
-            nome_mask = self.df['modalidade'].str.lower().str.contains(query, na=False)
-            mask = mask | nome_mask
-
-        results = self.df[mask]
-
-        # Limit results and convert to response model
-        results = results.head(params.limit)
-
-        return OperatorsResponse(
-            data = [Operator(
-                registro_ans=self._handle_nan(row.get('registro_ans', '')),
-                cnpj=self._handle_nan(row.get('cnpj', '')),
-                razao_social=self._handle_nan(row.get('razao_social', '')),
-                nome_fantasia=self._handle_nan(row.get('nome_fantasia', '')),
-                modalidade=self._handle_nan(row.get('modalidade', '')),
-                logradouro=self._handle_nan(row.get('logradouro', '')),
-                numero=self._handle_nan(row.get('numero', '')),
-                complemento=self._handle_nan(row.get('complemento', '')),
-                bairro=self._handle_nan(row.get('bairro', '')),
-                cidade=self._handle_nan(row.get('cidade', '')),
-                uf=self._handle_nan(row.get('uf', '')),
-                cep=self._handle_nan(row.get('cep', '')),
-                ddd=self._handle_nan(row.get('ddd', '')),
-                telefone=self._handle_nan(row.get('telefone', '')),
-                fax=self._handle_nan(row.get('fax', '')),
-                endereco_eletronico=self._handle_nan(row.get('endereco_eletronico', '')),
-                representante=self._handle_nan(row.get('representante', '')),
-                cargo_representante=self._handle_nan(row.get('cargo_representante', '')),
-                regiao_de_comercializacao=self._handle_nan(row.get('regiao_de_comercializacao', '')),
-                data_registro_ans=self._handle_nan(row.get('data_registro_ans', ''))
-            )
-            for _, row in results.iterrows()
-        ])
-
-    def _handle_nan(self, value):
-        """Convert NaN values to empty strings"""
-        if pd.isna(value):
-            return ""
-        return value
+        with self._lock:
+            index = self._index_as_of(params.as_of)
+            if index is None or not len(index):
+                return []
+            results = index.search(params.category, params.query, params.limit)
+
+        return OperatorsResponse(data=[self._to_operator(record) for record in results])
+
+    def get_operator(self, registro_ans: str, as_of: Optional[date] = None) -> Optional[Operator]:
+        """Operator with a registro_ans (as registered on a date, when given)"""
+        with self._lock:
+            if as_of is None:
+                record = self.index.records.get(registro_ans)
+            else:
+                version = self.history.version_at(as_of)
+                record = self.history.record_at(registro_ans, version) if version else None
+        return self._to_operator(record) if record else None
+
+    def changes_since(self, version: int, limit: int) -> ChangelogResponse:
+        """
+        Changes applied after a version, oldest first.
+
+        Raises:
+            ChangelogExpiredError: When changes after that version were already discarded
+        """
+        with self._lock:
+            if version < self._expired_version:
+                raise ChangelogExpiredError(
+                    f"Changes up to version {self._expired_version} are no longer kept, reload the operators")
+            changes: List[OperatorChange] = [change for change in self.changelog if change.version > version]
+            return ChangelogResponse(version=self.version, changes=changes[:limit])
+
+    def _to_operator(self, record: Record) -> Operator:
+        fields: Dict[str, str] = {field: record.get(field, '') for field in Operator.model_fields}
+        return Operator(**fields)
+
+
+@lru_cache(maxsize=None)
+def _search_service() -> SearchService:
+    return SearchService()
+
+
+def get_search_service() -> SearchService:
+    """Single SearchService of the app (loaded on startup), refreshed when the CSV changes"""
+    service = _search_service()
+    service.refresh_if_changed()
+    return service
@@ -0,0 +1,88 @@
+import os
+import json
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+from functools import lru_cache
+
+from config import settings
+from models.suggestion import Suggestion
+from models.suggestions_response import SuggestionsResponse
+from services.operator_trie import SUGGEST_FIELDS, OperatorTrie
+from services.search_service import SearchService, get_search_service
+
+
+class SuggestService:
+    """
+    Type-ahead suggestions (registro_ans and razao_social) for the operators.
+
+    The trie is built from the operators loaded by the SearchService and rebuilt when
+    they change version. Suggestions are weighted by the query log: every operator
+    opened by registro_ans (as a picked suggestion is) counts as one more pick.
+    """
+
+    def __init__(self, search_service: SearchService):
+        self.search_service = search_service
+        self.picks: Counter = Counter()
+        self.trie = OperatorTrie(settings.SUGGEST_TOP_K)
+        self.version = None  # Version of the operators in the trie
+        self._lock = threading.Lock()
+        self._load_query_log()
+        self.refresh()
+
+    def _load_query_log(self) -> None:
+        """Count the picks of each operator in the query log"""
+        if not os.path.exists(settings.SUGGEST_QUERY_LOG):
+            return
+        try:
+            with open(settings.SUGGEST_QUERY_LOG, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        self.picks[json.loads(line)["registro_ans"]] += 1
+            print(f"Loaded {sum(self.picks.values())} operator picks from the query log")
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Error loading query log: {e}")
+
+    def refresh(self) -> None:
+        """Rebuild the trie when the operators changed version"""
+        with self._lock:
+            if self.version == self.search_service.version:
+                return
+            trie = OperatorTrie(settings.SUGGEST_TOP_K)
+            for key, record in list(self.search_service.index.records.items()):
+                trie.add(key, record.get("razao_social", ""), [record.get(field, "") for field in SUGGEST_FIELDS],
+                         1 + self.picks[key])
+            trie.build()
+            self.trie = trie
+            self.version = self.search_service.version
+
+    def suggest(self, query: str, limit: int) -> SuggestionsResponse:
+        """Heaviest operators whose razao_social, nome_fantasia or cidade words start with the query words"""
+        with self._lock:
+            completions = self.trie.complete(query, limit)
+        return SuggestionsResponse(data=[Suggestion(id=key, label=label) for key, label in completions])
+
+    def log_pick(self, registro_ans: str) -> None:
+        """Record that an operator was opened, weighting its suggestions"""
+        with self._lock:
+            self.picks[registro_ans] += 1
+            self.trie.add_weight(registro_ans)
+        try:
+            with open(settings.SUGGEST_QUERY_LOG, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"registro_ans": registro_ans,
+                                    "at": datetime.now(timezone.utc).isoformat(timespec="seconds")}) + "\n")
+        except OSError as e:
+            print(f"Error saving query log: {e}")
+
+
+@lru_cache(maxsize=None)
+def _suggest_service() -> SuggestService:
+    return SuggestService(get_search_service())
+
+
+def get_suggest_service() -> SuggestService:
+    """Single SuggestService of the app (loaded on startup), rebuilt after the operators are refreshed"""
+    get_search_service()  # Refreshes the operators when the CSV was replaced
+    service = _suggest_service()
+    service.refresh()
+    return service
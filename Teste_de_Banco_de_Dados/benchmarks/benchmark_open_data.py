@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Open Data Fetcher Benchmark
+
+This script serves fixture ZIPs of synthetic quarterly accounting files from a local
+HTTP server (a stand-in for dadosabertos.ans.gov.br, with the same year directory
+layout and generated index pages) and compares:
+    - stream: open_data_fetcher.ingest_remote, decompressing and parsing while the
+      ZIPs download, without writing any CSV to disk
+    - files: downloading every ZIP, extracting it and building the store from the
+      extracted CSVs (columnar_store.build_store)
+
+Both stores are checked against the row counts and value totals of the fixtures.
+The fixtures cover UTF-8 and latin-1 files, both date formats and ZIPs written with
+data descriptors (as streaming zip tools do). The command line is checked too, by
+running "open_data_fetcher.py ingest" on the first year only.
+
+This script is also the test of open_data_fetcher: it exits with a non-zero code
+when a store does not match the fixtures, and a small run takes a few seconds.
+
+Usage:
+    python benchmarks/benchmark_open_data.py --quarters 8 --rows 300000 --workers 4
+    python benchmarks/benchmark_open_data.py --quarters 6 --rows 2000  # as a test
+
+Author: Vitor Oliveira
+Date: 2025-03-26
+"""
+
+import io
+import os
+import sys
+import time
+import random
+import shutil
+import logging
+import subprocess
+import zipfile
+import argparse
+import tempfile
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple
+
+import requests
+import pyarrow.parquet as pq
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from columnar_store import AccountingStore, build_store  # noqa: E402
+from open_data_fetcher import DATASETS, ingest_remote, list_directory  # noqa: E402
+
+ACCOUNTS = [("411111", "EVENTOS/ SINISTROS CONHECIDOS OU AVISADOS DE ASSISTÊNCIA A SAÚDE MEDICO HOSPITALAR"),
+            ("311111", "CONTRAPRESTAÇÕES EMITIDAS"),
+            ("461111", "DESPESAS ADMINISTRATIVAS"),
+            ("121111", "APLICAÇÕES FINANCEIRAS")]
+
+
+class _UnseekableWriter(io.RawIOBase):
+    """Write-only file without seek, so zipfile writes data descriptors"""
+
+    def __init__(self, f):
+        self._f = f
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        return self._f.write(data)
+
+
+def write_fixture(path: str, year: int, quarter: int, rows: int, seed: int) -> Tuple[int, int]:
+    """
+    Write a ZIP with the accounting CSV of a quarter.
+
+    Args:
+        path: Path of the ZIP
+        year: Year of the quarter
+        quarter: Quarter (1-4)
+        rows: Data rows
+        seed: Random seed
+
+    Returns:
+        (rows, total of vl_saldo_final in cents)
+    """
+    rng = random.Random(seed)
+    latin = seed % 2 == 1
+    brazilian_dates = seed % 3 == 0
+    month = (quarter - 1) * 3 + 1
+    day = f"01/{month:02d}/{year}" if brazilian_dates else f"{year}-{month:02d}-01"
+
+    lines = ['"DATA";"REG_ANS";"CD_CONTA_CONTABIL";"DESCRICAO";"VL_SALDO_INICIAL";"VL_SALDO_FINAL"']
+    total = 0
+    for _ in range(rows):
+        account, description = rng.choice(ACCOUNTS)
+        cents = rng.randint(0, 10 ** 10)
+        total += cents
+        final = f"{cents // 100},{cents % 100:02d}"
+        lines.append(f'"{day}";"{rng.randint(300000, 420000)}";"{account}";"{description}";"0";"{final}"')
+    data = ("\n".join(lines) + "\n").encode("latin-1" if latin else "utf-8")
+
+    with open(path, "wb") as f:
+        target = _UnseekableWriter(f) if seed % 2 == 0 else f
+        with zipfile.ZipFile(target, "w", zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr(f"{quarter}T{year}.csv", data)
+    return rows, total
+
+
+def generate_fixtures(root: str, quarters: int, rows: int) -> Dict[str, Tuple[int, int]]:
+    """
+    Write the open data directory tree with the fixture ZIPs.
+
+    Args:
+        root: Directory served as the FTP/PDA root
+        quarters: Number of quarters (from 2020Q1)
+        rows: Rows per quarter
+
+    Returns:
+        Quarter label -> (rows, total of vl_saldo_final in cents)
+    """
+    expected = {}
+    for i in range(quarters):
+        year, quarter = 2020 + i // 4, i % 4 + 1
+        directory = os.path.join(root, DATASETS["demonstracoes_contabeis"], str(year))
+        os.makedirs(directory, exist_ok=True)
+        expected[f"{year}Q{quarter}"] = write_fixture(os.path.join(directory, f"{quarter}T{year}.zip"),
+                                                      year, quarter, rows, seed=i)
+    return expected
+
+
+def serve(root: str) -> ThreadingHTTPServer:
+    """Serve a directory on a free local port, in a background thread"""
+    class QuietHandler(SimpleHTTPRequestHandler):
+        def log_message(self, *args) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(QuietHandler, directory=root))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def ingest_files(urls: List[str], work_dir: str, store_dir: str, workers: int) -> List[str]:
+    """Download and extract every ZIP, then build the store from the CSVs"""
+    extract_dir = os.path.join(work_dir, "extracted")
+    os.makedirs(extract_dir, exist_ok=True)
+    for url in urls:
+        path = os.path.join(work_dir, os.path.basename(url))
+        with requests.get(url, stream=True, timeout=60) as response, open(path, "wb") as f:
+            shutil.copyfileobj(response.raw, f)
+        with zipfile.ZipFile(path) as archive:
+            archive.extractall(extract_dir)
+    files = sorted(os.path.join(extract_dir, name) for name in os.listdir(extract_dir))
+    return build_store(files, store_dir, workers)
+
+
+def check_store(store_dir: str, expected: Dict[str, Tuple[int, int]]) -> bool:
+    """Compare the partitions of a store with the fixtures"""
+    store = AccountingStore(store_dir)
+    ok = sorted(store.partitions) == sorted(expected)
+    for label, (rows, total) in expected.items():
+        stats = store.partitions.get(label)
+        if not stats:
+            return False
+        table = pq.read_table(os.path.join(store_dir, stats["path"]), columns=["vl_saldo_final"])
+        ok = ok and table.num_rows == rows and table.column(0).to_numpy().sum() == total
+    return ok
+
+
+def ingest_cli(base_url: str, year: str, store_dir: str, workers: int) -> bool:
+    """Run the ingest command of the fetcher on one year, with the options after the command"""
+    command = [sys.executable, os.path.join(PROJECT_DIR, "open_data_fetcher.py"), "ingest",
+               "--base-url", base_url, "--years", year, "--store-dir", store_dir, "--workers", str(workers)]
+    result = subprocess.run(command, capture_output=True, text=True)
+    if result.returncode != 0:
+        print(result.stderr.strip())
+    return result.returncode == 0
+
+
+def main() -> int:
+    """
+    Main function to run the benchmark.
+
+    Returns:
+        Exit code (0 when every store matches the fixtures)
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the streaming open data fetcher")
+    parser.add_argument("--quarters", type=int, default=8, help="Quarterly ZIPs to serve")
+    parser.add_argument("--rows", type=int, default=200000, help="Rows per quarter")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent downloads / parser threads")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    work_dir = tempfile.mkdtemp(prefix="open_data_")
+    server = None
+    try:
+        root = os.path.join(work_dir, "PDA")
+        began = time.perf_counter()
+        expected = generate_fixtures(root, args.quarters, args.rows)
+        print(f"Generated {args.quarters} quarters of {args.rows} rows in {time.perf_counter() - began:.1f}s")
+
+        server = serve(root)
+        base_url = f"http://127.0.0.1:{server.server_port}/"
+        urls = list_directory(base_url + DATASETS["demonstracoes_contabeis"])
+        print(f"Listed {len(urls)} ZIPs from {base_url}")
+
+        total_rows = args.quarters * args.rows
+        results = {}
+        for name in ("stream", "files"):
+            store_dir = os.path.join(work_dir, f"store_{name}")
+            began = time.perf_counter()
+            if name == "stream":
+                ingest_remote(urls, store_dir, args.workers)
+            else:
+                ingest_files(urls, os.path.join(work_dir, "download"), store_dir, args.workers)
+            seconds = time.perf_counter() - began
+            results[name] = check_store(store_dir, expected)
+            print(f"{name:<8} {seconds:8.2f}s {total_rows / seconds:12,.0f} rows/s  "
+                  f"{'OK' if results[name] else 'MISMATCH'}")
+
+        year = min(label[:4] for label in expected)
+        store_dir = os.path.join(work_dir, "store_cli")
+        results["cli"] = (ingest_cli(base_url, year, store_dir, args.workers)
+                          and check_store(store_dir, {label: totals for label, totals in expected.items()
+                                                      if label.startswith(year)}))
+        print(f"{'cli':<8} ingest --years {year}: {'OK' if results['cli'] else 'MISMATCH'}")
+
+        return 0 if all(results.values()) else 1
+    finally:
+        if server:
+            server.shutdown()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
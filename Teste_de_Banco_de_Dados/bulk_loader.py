@@ -0,0 +1,653 @@
+#!/usr/bin/env python3
+"""
+Bulk Loader for demonstracoes_contabeis
+
+This tool loads the quarterly accounting files (1T2023.csv ... 4T2024.csv, about 6.26M
+rows) into the demonstracoes_contabeis table, replacing the serial COPY loop of
+import_csv.sql.
+
+Each file is split into byte ranges that end on line boundaries, and the ranges are
+loaded in parallel, each worker with its own connection:
+    1. the raw rows are streamed into an unlogged staging table of text columns
+       (COPY FROM STDIN on PostgreSQL, so the server does not need to read the files)
+    2. the staging rows are converted in one set-based statement into a new table:
+       dates in yyyy-mm-dd or dd/mm/yyyy and values with comma decimals are parsed
+       here, without depending on the server locale like the MONEY columns do
+    3. the new table is indexed and swapped in place of the old one in a single
+       transaction, so readers never see a partially loaded table
+
+On PostgreSQL the table is partitioned by quarter (demonstracoes_contabeis_2024q4, ...),
+so a single quarter can also be replaced: its rows are converted into a new indexed
+table that is attached in place of the old partition (replace_period, used by
+incremental_loader.py). The embedded targets replace the rows of the quarter in one
+transaction instead.
+
+Besides PostgreSQL, an embedded SQLite or DuckDB database can be the target, as a
+local stand-in for the server. The rows per second of each worker are reported.
+
+Usage:
+    python bulk_loader.py demonstracoes_contabeis --target postgres --dsn "dbname=ans user=postgres" --workers 4
+    python bulk_loader.py demonstracoes_contabeis --target duckdb --database ans.duckdb
+
+Author: Vitor Oliveira
+Date: 2025-03-26
+"""
+
+import io
+import os
+import sys
+import time
+import logging
+import argparse
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.csv_chunks import detect_encoding, find_csv_files, read_byte_range, split_byte_ranges
+
+logger = logging.getLogger(__name__)
+
+TABLE = "demonstracoes_contabeis"
+COLUMNS = ["data", "reg_ans", "cd_conta_contabil", "descricao", "vl_saldo_inicial", "vl_saldo_final"]
+
+# Target size of the byte ranges loaded by each task
+CHUNK_MB = 32
+
+# PostgreSQL names of the supported encodings
+PG_ENCODINGS = {"utf-8": "UTF8", "latin-1": "LATIN1"}
+
+# Name suffixes of the indexes created by LoadTarget._index_sql
+INDEX_SUFFIXES = ("data_idx", "descricao_data_idx", "reg_ans_idx")
+
+
+def _decimal_sql(column: str) -> str:
+    """SQL text of a value with the thousands dots removed and a dot as decimal separator"""
+    return (f"CASE WHEN {column} LIKE '%,%' THEN REPLACE(REPLACE({column}, '.', ''), ',', '.') "
+            f"ELSE NULLIF(TRIM({column}), '') END")
+
+
+def quarter_period(day: date) -> Tuple[str, date, date]:
+    """
+    Quarter containing a date.
+
+    Args:
+        day: Any date of the quarter
+
+    Returns:
+        (label such as "2024Q4", first date, end date exclusive)
+    """
+    quarter = (day.month - 1) // 3
+    start = date(day.year, quarter * 3 + 1, 1)
+    end = date(day.year + 1, 1, 1) if quarter == 3 else date(day.year, quarter * 3 + 4, 1)
+    return f"{day.year}Q{quarter + 1}", start, end
+
+
+class LoadTarget(ABC):
+    """Database a load writes to; each dialect provides its DDL and conversion SQL"""
+
+    name = ""
+
+    def __init__(self, table: str = TABLE):
+        self.table = table
+        self.staging = f"{table}__staging"
+        self.new = f"{table}__new"
+        self._local = threading.local()
+        self._connections: List[Any] = []
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def _connect(self) -> Any:
+        """Open a connection to the database"""
+
+    def connection(self) -> Any:
+        """Connection of the calling thread (opened on first use)"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._connect()
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    @abstractmethod
+    def _create_table_sql(self, name: str) -> str:
+        """CREATE TABLE statement of the final table"""
+
+    @abstractmethod
+    def _date_sql(self, column: str) -> str:
+        """SQL converting a staging text column (yyyy-mm-dd or dd/mm/yyyy) into a date"""
+
+    @abstractmethod
+    def _money_sql(self, column: str) -> str:
+        """SQL converting a staging text column (comma decimals) into an amount"""
+
+    def _index_sql(self, table: str, prefix: str) -> List[str]:
+        """Indexes of the final table (date filter, description + date filter of analytical_queries.sql)"""
+        return [
+            f"CREATE INDEX {prefix}_data_idx ON {table} (data)",
+            f"CREATE INDEX {prefix}_descricao_data_idx ON {table} (TRIM(descricao), data)",
+            f"CREATE INDEX {prefix}_reg_ans_idx ON {table} (reg_ans)",
+        ]
+
+    def _execute(self, statements: List[str]) -> None:
+        cursor = self.connection().cursor()
+        for statement in statements:
+            cursor.execute(statement)
+
+    def _fetch(self, statement: str) -> List[tuple]:
+        cursor = self.connection().cursor()
+        cursor.execute(statement)
+        return cursor.fetchall()
+
+    def _table_exists(self, name: str) -> bool:
+        return self._fetch(f"SELECT COUNT(*) FROM information_schema.tables WHERE table_name = '{name}'")[0][0] > 0
+
+    def prepare(self) -> None:
+        """Create an empty staging table"""
+        columns = ", ".join(f"{column} TEXT" for column in COLUMNS)
+        self._execute([f"DROP TABLE IF EXISTS {self.staging}", f"CREATE TABLE {self.staging} ({columns})"])
+
+    @abstractmethod
+    def load_range(self, path: str, start: int, end: int, encoding: str) -> int:
+        """
+        Load a byte range of a CSV file into the staging table.
+
+        Args:
+            path: Path to the CSV file
+            start: First byte of the range
+            end: End offset of the range (exclusive)
+            encoding: Encoding of the file
+
+        Returns:
+            Number of rows loaded
+        """
+
+    def _select_sql(self) -> str:
+        """Converted COLUMNS of the staging rows"""
+        return ", ".join([
+            f"{self._date_sql('data')} AS data", "reg_ans", "cd_conta_contabil", "descricao",
+            f"{self._money_sql('vl_saldo_inicial')} AS vl_saldo_inicial",
+            f"{self._money_sql('vl_saldo_final')} AS vl_saldo_final",
+        ])
+
+    def _insert_sql(self) -> str:
+        return f"INSERT INTO {self.new} ({', '.join(COLUMNS)}) SELECT {self._select_sql()} FROM {self.staging}"
+
+    def _period_insert_sql(self, table: str, start: date, end: date, first_id: Optional[int] = None) -> str:
+        """Insert the staging rows dated in [start, end) into a table, numbered from first_id if given"""
+        columns = ", ".join(COLUMNS)
+        select = f"{first_id} + row_number() OVER (), {columns}" if first_id is not None else columns
+        return (f"INSERT INTO {table} ({'id, ' if first_id is not None else ''}{columns}) "
+                f"SELECT {select} FROM (SELECT {self._select_sql()} FROM {self.staging}) converted "
+                f"WHERE data >= '{start.isoformat()}' AND data < '{end.isoformat()}'")
+
+    def _check_period(self, label: str, start: date, end: date) -> None:
+        """
+        Make sure every staging row is dated in a period before replacing it.
+
+        Raises:
+            ValueError: When staging rows are dated outside the period (a full load
+                keeps them, in the partitions of their own quarters)
+        """
+        outside = self._fetch(
+            f"SELECT COUNT(*) FROM (SELECT {self._date_sql('data')} AS data FROM {self.staging}) converted "
+            f"WHERE data < '{start.isoformat()}' OR data >= '{end.isoformat()}'")[0][0]
+        if outside:
+            raise ValueError(f"{outside} rows of the {label} files are dated outside {label}, "
+                             f"load these files with bulk_loader.py")
+
+    @abstractmethod
+    def finalize(self) -> int:
+        """
+        Convert the staging rows into a new indexed table and swap it with the old one.
+
+        Returns:
+            Number of rows of the new table
+        """
+
+    @abstractmethod
+    def replace_period(self, label: str, start: date, end: date) -> int:
+        """
+        Replace the rows of a period with the staging rows.
+
+        Rows of other periods are not touched.
+
+        Args:
+            label: Name of the period (e.g. "2024Q4")
+            start: First date
+            end: End date (exclusive)
+
+        Returns:
+            Number of rows of the period
+
+        Raises:
+            ValueError: When staging rows are dated outside the period (nothing is replaced)
+        """
+
+    def drop_staging(self) -> None:
+        """Drop the staging table"""
+        self._execute([f"DROP TABLE IF EXISTS {self.staging}"])
+
+    def close(self) -> None:
+        """Close the connections of every thread"""
+        for connection in self._connections:
+            connection.close()
+        self._connections = []
+        self._local = threading.local()
+
+
+class PostgresTarget(LoadTarget):
+    """PostgreSQL server, loaded with COPY FROM STDIN over parallel connections (psycopg 3)"""
+
+    name = "postgres"
+
+    def __init__(self, dsn: str, table: str = TABLE):
+        super().__init__(table)
+        self.dsn = dsn
+
+    def _connect(self) -> Any:
+        import psycopg
+        return psycopg.connect(self.dsn, autocommit=True)
+
+    def _create_table_sql(self, name: str) -> str:
+        # Same definition as create_database_and_tables.sql
+        return (f"CREATE TABLE {name} (id BIGSERIAL, data DATE NOT NULL, reg_ans VARCHAR(50), "
+                f"cd_conta_contabil VARCHAR(50), descricao VARCHAR(255), "
+                f"vl_saldo_inicial MONEY NOT NULL DEFAULT 0.00, vl_saldo_final MONEY NOT NULL DEFAULT 0.00, "
+                f"PRIMARY KEY (id, data)) PARTITION BY RANGE (data)")
+
+    def partition_name(self, label: str, table: Optional[str] = None) -> str:
+        """Name of the partition of a quarter (e.g. demonstracoes_contabeis_2024q4)"""
+        return f"{table or self.table}_{label.lower()}"
+
+    def _date_sql(self, column: str) -> str:
+        return f"CASE WHEN {column} LIKE '__/__/____' THEN to_date({column}, 'DD/MM/YYYY') ELSE {column}::date END"
+
+    def _money_sql(self, column: str) -> str:
+        return f"COALESCE(({_decimal_sql(column)})::numeric, 0)::money"
+
+    def prepare(self) -> None:
+        columns = ", ".join(f"{column} TEXT" for column in COLUMNS)
+        # Unlogged: the staging rows are not written to the WAL
+        self._execute([f"DROP TABLE IF EXISTS {self.staging}", f"CREATE UNLOGGED TABLE {self.staging} ({columns})"])
+
+    def load_range(self, path: str, start: int, end: int, encoding: str) -> int:
+        statement = (f"COPY {self.staging} ({', '.join(COLUMNS)}) FROM STDIN "
+                     f"WITH (FORMAT csv, DELIMITER ';', ENCODING '{PG_ENCODINGS[encoding]}')")
+        with self.connection().cursor() as cursor:
+            with cursor.copy(statement) as copy:
+                for block in read_byte_range(path, start, end):
+                    copy.write(block)
+            return cursor.rowcount
+
+    def finalize(self) -> int:
+        connection = self.connection()
+        quarters = sorted({quarter_period(day) for (day,) in self._fetch(
+            f"SELECT DISTINCT {self._date_sql('data')} FROM {self.staging}")})
+        self._execute([
+            f"DROP TABLE IF EXISTS {self.new}",
+            self._create_table_sql(self.new),
+            *[f"CREATE TABLE {self.partition_name(label, self.new)} PARTITION OF {self.new} "
+              f"FOR VALUES FROM ('{start}') TO ('{end}')" for label, start, end in quarters],
+            self._insert_sql(),
+            *self._index_sql(self.new, self.new),
+            f"ANALYZE {self.new}",
+        ])
+
+        # The indexes were built before the swap, which only renames objects
+        with connection.transaction():
+            self._execute([
+                f"DROP TABLE IF EXISTS {self.table}",
+                f"ALTER TABLE {self.new} RENAME TO {self.table}",
+                f"ALTER SEQUENCE {self.new}_id_seq RENAME TO {self.table}_id_seq",
+                f"ALTER INDEX {self.new}_pkey RENAME TO {self.table}_pkey",
+                *[f"ALTER INDEX {self.new}_{suffix} RENAME TO {self.table}_{suffix}" for suffix in INDEX_SUFFIXES],
+                *[f"ALTER TABLE {self.partition_name(label, self.new)} RENAME TO {self.partition_name(label)}"
+                  for label, _, _ in quarters],
+            ])
+        self._execute([f"DROP TABLE {self.staging}"])
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) FROM {self.table}")
+            return cursor.fetchone()[0]
+
+    def replace_period(self, label: str, start: date, end: date) -> int:
+        self._check_period(label, start, end)
+        connection = self.connection()
+        partitioned = self._fetch(f"SELECT COUNT(*) FROM pg_partitioned_table "
+                                  f"WHERE partrelid = to_regclass('{self.table}')")[0][0]
+        if not partitioned:
+            if self._table_exists(self.table):
+                raise RuntimeError(f"{self.table} is not partitioned by quarter, reload it once with bulk_loader.py")
+            self._execute([self._create_table_sql(self.table), *self._index_sql(self.table, self.table)])
+
+        partition = self.partition_name(label)
+        new = f"{partition}__new"
+        self._execute([
+            f"DROP TABLE IF EXISTS {new}",
+            f"CREATE TABLE {new} (LIKE {self.table} INCLUDING DEFAULTS)",
+            # Lets ATTACH PARTITION skip the scan that validates the range
+            f"ALTER TABLE {new} ADD CONSTRAINT {new}_range CHECK (data >= '{start}' AND data < '{end}')",
+            self._period_insert_sql(new, start, end),
+            f"ALTER TABLE {new} ADD CONSTRAINT {new}_pkey PRIMARY KEY (id, data)",
+            *self._index_sql(new, new),
+            f"ANALYZE {new}",
+        ])
+
+        # The indexes match those of the parent, so ATTACH adopts them instead of building new ones
+        with connection.transaction():
+            if self._table_exists(partition):
+                self._execute([f"ALTER TABLE {self.table} DETACH PARTITION {partition}", f"DROP TABLE {partition}"])
+            self._execute([
+                f"ALTER TABLE {new} RENAME TO {partition}",
+                f"ALTER INDEX {new}_pkey RENAME TO {partition}_pkey",
+                *[f"ALTER INDEX {new}_{suffix} RENAME TO {partition}_{suffix}" for suffix in INDEX_SUFFIXES],
+                f"ALTER TABLE {self.table} ATTACH PARTITION {partition} FOR VALUES FROM ('{start}') TO ('{end}')",
+                f"ALTER TABLE {partition} DROP CONSTRAINT {new}_range",
+            ])
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) FROM {partition}")
+            return cursor.fetchone()[0]
+
+
+class EmbeddedTarget(LoadTarget):
+    """Embedded database; ranges are parsed in parallel and appended to the staging table"""
+
+    # Whether ids are numbered by the insert instead of by the database
+    explicit_ids = False
+
+    def __init__(self, database: str, table: str = TABLE):
+        super().__init__(table)
+        self.database = database
+
+    def _read_range(self, path: str, start: int, end: int, encoding: str) -> Any:
+        """Parse a byte range into a DataFrame of text columns"""
+        import pandas as pd
+        data = b"".join(read_byte_range(path, start, end))
+        return pd.read_csv(io.BytesIO(data), sep=";", header=None, names=COLUMNS, dtype=str,
+                           keep_default_na=False, encoding=encoding)
+
+    @abstractmethod
+    def _insert_frame(self, frame: Any) -> None:
+        """Append a DataFrame of text columns to the staging table"""
+
+    def load_range(self, path: str, start: int, end: int, encoding: str) -> int:
+        frame = self._read_range(path, start, end, encoding)
+        self._insert_frame(frame)
+        return len(frame)
+
+    def finalize(self) -> int:
+        self._execute([f"DROP TABLE IF EXISTS {self.new}", self._create_table_sql(self.new), self._insert_sql()])
+
+        # Indexes are created after the rename, inside the swap transaction
+        self._execute([
+            "BEGIN",
+            f"DROP TABLE IF EXISTS {self.table}",
+            f"ALTER TABLE {self.new} RENAME TO {self.table}",
+            *self._index_sql(self.table, self.table),
+            "COMMIT",
+            f"DROP TABLE {self.staging}",
+        ])
+
+        cursor = self.connection().cursor()
+        cursor.execute(f"SELECT COUNT(*) FROM {self.table}")
+        return cursor.fetchone()[0]
+
+    def replace_period(self, label: str, start: date, end: date) -> int:
+        self._check_period(label, start, end)
+        if not self._table_exists(self.table):
+            self._execute([self._create_table_sql(self.table), *self._index_sql(self.table, self.table)])
+        # Numbered after every existing id, so no id of the deleted rows is reused
+        first_id = self._fetch(f"SELECT COALESCE(MAX(id), 0) FROM {self.table}")[0][0] if self.explicit_ids else None
+
+        # Only the rows of the period, and their index entries, are rewritten
+        period = f"data >= '{start.isoformat()}' AND data < '{end.isoformat()}'"
+        self._execute([
+            "BEGIN",
+            f"DELETE FROM {self.table} WHERE {period}",
+            self._period_insert_sql(self.table, start, end, first_id),
+            "COMMIT",
+        ])
+        return self._fetch(f"SELECT COUNT(*) FROM {self.table} WHERE {period}")[0][0]
+
+
+class SQLiteTarget(EmbeddedTarget):
+    """SQLite database file; parsing runs in parallel, inserts are serialized (single writer)"""
+
+    name = "sqlite"
+
+    def _connect(self) -> Any:
+        import sqlite3
+        connection = sqlite3.connect(self.database, isolation_level=None, check_same_thread=False, timeout=60)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=OFF")
+        return connection
+
+    def _table_exists(self, name: str) -> bool:
+        return self._fetch(f"SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = '{name}'")[0][0] > 0
+
+    def connection(self) -> Any:
+        # One connection shared by every thread, SQLite allows a single writer anyway
+        if not self._connections:
+            with self._lock:
+                if not self._connections:
+                    self._connections.append(self._connect())
+        return self._connections[0]
+
+    def _create_table_sql(self, name: str) -> str:
+        return (f"CREATE TABLE {name} (id INTEGER PRIMARY KEY, data DATE NOT NULL, reg_ans TEXT, "
+                f"cd_conta_contabil TEXT, descricao TEXT, "
+                f"vl_saldo_inicial REAL NOT NULL DEFAULT 0, vl_saldo_final REAL NOT NULL DEFAULT 0)")
+
+    def _date_sql(self, column: str) -> str:
+        return (f"CASE WHEN {column} LIKE '__/__/____' "
+                f"THEN substr({column}, 7, 4) || '-' || substr({column}, 4, 2) || '-' || substr({column}, 1, 2) "
+                f"ELSE {column} END")
+
+    def _money_sql(self, column: str) -> str:
+        return f"COALESCE(CAST(({_decimal_sql(column)}) AS REAL), 0)"
+
+    def _insert_frame(self, frame: Any) -> None:
+        statement = f"INSERT INTO {self.staging} VALUES ({', '.join('?' * len(COLUMNS))})"
+        rows = list(frame.itertuples(index=False, name=None))
+        with self._lock:
+            connection = self.connection()
+            connection.execute("BEGIN")
+            connection.executemany(statement, rows)
+            connection.execute("COMMIT")
+
+
+class DuckDBTarget(EmbeddedTarget):
+    """DuckDB database file; every thread appends through its own cursor"""
+
+    name = "duckdb"
+    explicit_ids = True
+
+    def __init__(self, database: str, table: str = TABLE):
+        super().__init__(database, table)
+        self._database = None
+
+    def _connect(self) -> Any:
+        import duckdb
+        with self._lock:
+            if self._database is None:
+                self._database = duckdb.connect(self.database)
+            return self._database.cursor()
+
+    def _create_table_sql(self, name: str) -> str:
+        return (f"CREATE TABLE {name} (id BIGINT PRIMARY KEY, data DATE NOT NULL, reg_ans VARCHAR, "
+                f"cd_conta_contabil VARCHAR, descricao VARCHAR, vl_saldo_inicial DECIMAL(18, 2) NOT NULL DEFAULT 0, "
+                f"vl_saldo_final DECIMAL(18, 2) NOT NULL DEFAULT 0)")
+
+    def _date_sql(self, column: str) -> str:
+        return (f"CASE WHEN {column} LIKE '__/__/____' THEN CAST(strptime({column}, '%d/%m/%Y') AS DATE) "
+                f"ELSE CAST({column} AS DATE) END")
+
+    def _money_sql(self, column: str) -> str:
+        return f"COALESCE(CAST(({_decimal_sql(column)}) AS DECIMAL(18, 2)), 0)"
+
+    def _insert_frame(self, frame: Any) -> None:
+        cursor = self.connection()
+        cursor.register("staging_frame", frame)
+        try:
+            cursor.execute(f"INSERT INTO {self.staging} SELECT * FROM staging_frame")
+        finally:
+            cursor.unregister("staging_frame")
+
+    def _insert_sql(self) -> str:
+        # Numbered while converting, a sequence would stay tied to the swapped table name
+        return (f"INSERT INTO {self.new} (id, {', '.join(COLUMNS)}) "
+                f"SELECT row_number() OVER (), {self._select_sql()} FROM {self.staging}")
+
+    def close(self) -> None:
+        super().close()
+        if self._database is not None:
+            self._database.close()
+            self._database = None
+
+
+def create_target(target: str, dsn: Optional[str] = None, database: Optional[str] = None,
+                  table: str = TABLE) -> LoadTarget:
+    """
+    Create the load target.
+
+    Args:
+        target: "postgres", "sqlite" or "duckdb"
+        dsn: PostgreSQL connection string (postgres only)
+        database: Database file (sqlite and duckdb only)
+        table: Name of the final table
+
+    Returns:
+        The target
+    """
+    if target == PostgresTarget.name:
+        return PostgresTarget(dsn or "", table)
+    if target == SQLiteTarget.name:
+        return SQLiteTarget(database or "ans.sqlite", table)
+    if target == DuckDBTarget.name:
+        return DuckDBTarget(database or "ans.duckdb", table)
+    raise ValueError(f"Unknown target '{target}'. Options: postgres, sqlite, duckdb")
+
+
+def _load_task(target: LoadTarget, path: str, start: int, end: int, encoding: str) -> Dict[str, Any]:
+    """Load one byte range and measure it"""
+    began = time.perf_counter()
+    rows = target.load_range(path, start, end, encoding)
+    return {
+        "worker": threading.current_thread().name,
+        "file": os.path.basename(path),
+        "rows": rows,
+        "bytes": end - start,
+        "seconds": time.perf_counter() - began,
+    }
+
+
+def run_load(files: List[str], target: LoadTarget, workers: int = 4, chunk_mb: int = CHUNK_MB,
+             encoding: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Load the CSV files into the target table, replacing its contents.
+
+    Args:
+        files: CSV files to load (all of them end up in the table)
+        target: Database target
+        workers: Parallel connections
+        chunk_mb: Size of the byte range of each task in MB
+        encoding: Encoding of the files; detected per file when None
+
+    Returns:
+        Load statistics ('rows', 'seconds', 'rows_per_second', 'workers' and 'files'),
+        or None if the load failed
+    """
+    began = time.perf_counter()
+    tasks = []
+    for path in files:
+        file_encoding = encoding or detect_encoding(path)
+        ranges = split_byte_ranges(path, chunk_mb * 1024 * 1024)
+        logger.info(f"{os.path.basename(path)}: {len(ranges)} chunks, {file_encoding}")
+        tasks.extend((path, start, end, file_encoding) for start, end in ranges)
+
+    try:
+        target.prepare()
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="loader") as executor:
+            results = list(executor.map(lambda task: _load_task(target, *task), tasks))
+        staged = sum(result["rows"] for result in results)
+        load_seconds = time.perf_counter() - began
+        logger.info(f"Staged {staged} rows in {load_seconds:.1f}s")
+
+        finalize_began = time.perf_counter()
+        rows = target.finalize()
+        logger.info(f"Converted, indexed and swapped {rows} rows in {time.perf_counter() - finalize_began:.1f}s")
+    except Exception as e:
+        logger.error(f"Error loading into {target.name}: {e}")
+        return None
+    finally:
+        target.close()
+
+    per_worker: Dict[str, Dict[str, Any]] = {}
+    per_file: Dict[str, int] = {}
+    for result in results:
+        stats = per_worker.setdefault(result["worker"], {"chunks": 0, "rows": 0, "seconds": 0.0})
+        stats["chunks"] += 1
+        stats["rows"] += result["rows"]
+        stats["seconds"] += result["seconds"]
+        per_file[result["file"]] = per_file.get(result["file"], 0) + result["rows"]
+
+    for worker, stats in sorted(per_worker.items()):
+        stats["rows_per_second"] = round(stats["rows"] / stats["seconds"]) if stats["seconds"] else 0
+        logger.info(f"  {worker}: {stats['rows']} rows in {stats['chunks']} chunks, "
+                    f"{stats['rows_per_second']} rows/s")
+
+    seconds = time.perf_counter() - began
+    return {
+        "rows": rows,
+        "seconds": round(seconds, 2),
+        "rows_per_second": round(rows / seconds) if seconds else 0,
+        "workers": per_worker,
+        "files": per_file,
+    }
+
+
+def main() -> int:
+    """
+    Main function to run the loader.
+
+    Returns:
+        Exit code (0 for success, non-zero for error)
+    """
+    parser = argparse.ArgumentParser(description="Load the demonstracoes_contabeis CSV files")
+    parser.add_argument("source", nargs="?", default="demonstracoes_contabeis",
+                        help="Directory of the quarterly CSV files or glob pattern")
+    parser.add_argument("--target", default="postgres", choices=["postgres", "sqlite", "duckdb"],
+                        help="Database to load into")
+    parser.add_argument("--dsn", default=os.environ.get("DATABASE_URL", "dbname=ans"),
+                        help="PostgreSQL connection string (defaults to $DATABASE_URL)")
+    parser.add_argument("--database", help="Database file of the sqlite and duckdb targets")
+    parser.add_argument("--table", default=TABLE, help="Table to replace")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Parallel connections")
+    parser.add_argument("--chunk-mb", type=int, default=CHUNK_MB, help="Size of each loaded byte range in MB")
+    parser.add_argument("--encoding", choices=["utf-8", "latin-1"], help="File encoding (detected by default)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+                        force=True)
+
+    files = find_csv_files(args.source)
+    if not files:
+        logger.error(f"No CSV files found in {args.source}")
+        return 1
+
+    target = create_target(args.target, args.dsn, args.database, args.table)
+    stats = run_load(files, target, args.workers, args.chunk_mb, args.encoding)
+    if stats is None:
+        return 1
+
+    logger.info(f"Loaded {stats['rows']} rows from {len(files)} files in {stats['seconds']}s "
+                f"({stats['rows_per_second']} rows/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
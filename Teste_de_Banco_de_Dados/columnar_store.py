@@ -0,0 +1,478 @@
+#!/usr/bin/env python3
+"""
+Partitioned Columnar Store for demonstracoes_contabeis
+
+This module keeps the accounting rows as Parquet files partitioned by year and
+quarter (`year=2024/quarter=4/part-0.parquet`), so analytical_queries.sql-style
+questions can be answered without a running PostgreSQL server:
+    - descricao is dictionary-encoded into descricao_id, with one dictionary for the
+      whole store (descriptions.json), so description filters compare integers
+    - rows are sorted by (descricao_id, cd_conta_contabil) before they are written,
+      so the min/max statistics of each row group cover a narrow range of both
+    - manifest.json keeps the row count and min/max statistics of every partition
+
+A query prunes the partitions outside its date range or whose statistics cannot
+match, skips the row groups whose statistics cannot match (predicate pushdown on
+the account code and description id), reads only the columns it needs and keeps
+the k lowest variations of each partition, merged with a heap.
+
+Usage:
+    python columnar_store.py build demonstracoes_contabeis --store-dir store
+    python columnar_store.py top --start 2024-10-01 --description "EVENTOS/ SINISTROS CONHECIDOS OU AVISADOS  DE ..."
+
+Author: Vitor Oliveira
+Date: 2025-03-26
+"""
+
+import os
+import sys
+import json
+import time
+import heapq
+import logging
+import argparse
+import tempfile
+from datetime import date
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from accounting_reader import read_accounting_batches
+from expense_rollups import normalize_account, quarter_code, quarter_label
+from utils.csv_chunks import find_csv_files
+
+logger = logging.getLogger(__name__)
+
+STORE_DIR = "store"
+MANIFEST_FILENAME = "manifest.json"
+DESCRIPTIONS_FILENAME = "descriptions.json"
+STORE_VERSION = 1
+
+ROW_GROUP_SIZE = 16 * 1024
+# Rows of a partition sorted together before they are written (a quarter fits in one sort)
+SORT_ROWS = 1024 * 1024
+
+STORE_SCHEMA = pa.schema([
+    ("data", pa.date32()),
+    ("reg_ans", pa.string()),
+    ("cd_conta_contabil", pa.string()),
+    ("descricao_id", pa.int32()),
+    ("vl_saldo_inicial", pa.int64()),  # cents
+    ("vl_saldo_final", pa.int64()),  # cents
+])
+
+QUERY_COLUMNS = ["data", "reg_ans", "cd_conta_contabil", "descricao_id", "vl_saldo_inicial", "vl_saldo_final"]
+
+
+def _write_json(path: str, data: Any) -> None:
+    """Atomically write a JSON file"""
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(temp_path, path)
+
+
+def period_range(period: str) -> Tuple[date, date]:
+    """
+    Date range of a quarter ("2024Q4") or year ("2024").
+
+    Args:
+        period: Quarter or year
+
+    Returns:
+        (start, end) with end exclusive
+    """
+    code = quarter_code(period)
+    if code is not None:
+        year, quarter = divmod(code, 10)
+        start = date(year, 3 * quarter - 2, 1)
+        return start, date(year + 1, 1, 1) if quarter == 4 else date(year, 3 * quarter + 1, 1)
+    if period.strip().isdigit():
+        return date(int(period), 1, 1), date(int(period) + 1, 1, 1)
+    raise ValueError(f"Invalid period '{period}', expected a year (2024) or a quarter (2024Q4)")
+
+
+class DescriptionDictionary:
+    """Maps the (trimmed) account descriptions to stable integer ids"""
+
+    def __init__(self, values: Optional[List[str]] = None):
+        self.values: List[str] = list(values or [])
+        self._ids = {value: index for index, value in enumerate(self.values)}
+
+    def id_of(self, description: str) -> Optional[int]:
+        """Id of a description, None if it is not in the store"""
+        return self._ids.get(description.strip())
+
+    def encode(self, descriptions: pa.Array) -> pa.Array:
+        """
+        Encode a description column, adding the descriptions not seen before.
+
+        Args:
+            descriptions: String array
+
+        Returns:
+            int32 array of ids
+        """
+        trimmed = pc.utf8_trim_whitespace(descriptions)
+        for value in pc.unique(trimmed).to_pylist():
+            if value is not None and value not in self._ids:
+                self._ids[value] = len(self.values)
+                self.values.append(value)
+        return pc.cast(pc.index_in(trimmed, value_set=pa.array(self.values, pa.string())), pa.int32())
+
+
+class PartitionWriter:
+    """Writes the rows of one partition, sorted, to a temporary file renamed on close"""
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._temp_path = f"{path}.tmp"
+        self._writer = pq.ParquetWriter(self._temp_path, STORE_SCHEMA)
+        self._buffer: List[pa.Table] = []
+        self._buffered_rows = 0
+        self.stats: Dict[str, Any] = {"rows": 0}
+
+    def write(self, table: pa.Table) -> None:
+        self._buffer.append(table)
+        self._buffered_rows += table.num_rows
+        if self._buffered_rows >= SORT_ROWS:
+            self.flush()
+
+    def flush(self) -> None:
+        """Sort and write the buffered rows"""
+        if not self._buffer:
+            return
+        table = pa.concat_tables(self._buffer)
+        self._buffer, self._buffered_rows = [], 0
+
+        table = table.sort_by([("descricao_id", "ascending"), ("cd_conta_contabil", "ascending")])
+        self._writer.write_table(table, row_group_size=ROW_GROUP_SIZE)
+
+        stats = self.stats
+        stats["rows"] += table.num_rows
+        for column in ("data", "cd_conta_contabil", "descricao_id"):
+            bounds = pc.min_max(table.column(column))
+            low, high = bounds["min"].as_py(), bounds["max"].as_py()
+            if low is None:
+                continue
+            if column == "data":
+                low, high = low.isoformat(), high.isoformat()
+            stats[f"min_{column}"] = min(stats.get(f"min_{column}", low), low)
+            stats[f"max_{column}"] = max(stats.get(f"max_{column}", high), high)
+
+    def close(self) -> Dict[str, Any]:
+        self.flush()
+        self._writer.close()
+        os.replace(self._temp_path, self.path)
+        return self.stats
+
+    def abort(self) -> None:
+        """Discard the partition, the previous file (if any) is kept"""
+        self._writer.close()
+        os.remove(self._temp_path)
+
+
+class AccountingStore:
+    """Year/quarter partitioned Parquet store of the accounting rows"""
+
+    def __init__(self, root: str = STORE_DIR):
+        """
+        Open the store (the manifest and dictionary are loaded if they exist).
+
+        Args:
+            root: Directory of the store
+        """
+        self.root = root
+        # Quarter label -> partition statistics
+        self.partitions: Dict[str, Dict[str, Any]] = {}
+        self.descriptions = DescriptionDictionary()
+        self._load()
+
+    def _load(self) -> None:
+        manifest_path = os.path.join(self.root, MANIFEST_FILENAME)
+        if not os.path.exists(manifest_path):
+            return
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            with open(os.path.join(self.root, DESCRIPTIONS_FILENAME), "r", encoding="utf-8") as f:
+                descriptions = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable store manifest in {self.root}: {e}")
+            return
+
+        if manifest.get("version") != STORE_VERSION:
+            logger.info(f"Store in {self.root} has another version, rebuild it")
+            return
+        self.partitions = manifest["partitions"]
+        self.descriptions = DescriptionDictionary(descriptions)
+
+    def _save_descriptions(self) -> None:
+        """Atomically write the description dictionary"""
+        os.makedirs(self.root, exist_ok=True)
+        _write_json(os.path.join(self.root, DESCRIPTIONS_FILENAME), self.descriptions.values)
+
+    def save(self) -> None:
+        """Atomically write the dictionary, then the manifest that refers to it"""
+        self._save_descriptions()
+        _write_json(os.path.join(self.root, MANIFEST_FILENAME),
+                    {"version": STORE_VERSION, "partitions": dict(sorted(self.partitions.items()))})
+
+    @staticmethod
+    def partition_path(code: int) -> str:
+        """Path of the file of a partition, relative to the store"""
+        return os.path.join(f"year={code // 10}", f"quarter={code % 10}", "part-0.parquet")
+
+    def _store_table(self, batch: pa.Table) -> pa.Table:
+        """Convert an accounting batch to STORE_SCHEMA"""
+        return pa.Table.from_arrays([
+            batch.column("data"),
+            pc.utf8_trim_whitespace(batch.column("reg_ans")),
+            normalize_account(batch.column("cd_conta_contabil")),
+            self.descriptions.encode(batch.column("descricao")),
+            batch.column("vl_saldo_inicial"),
+            batch.column("vl_saldo_final"),
+        ], schema=STORE_SCHEMA)
+
+    def ingest(self, batches: Iterable[pa.Table]) -> List[str]:
+        """
+        Write accounting batches, replacing the partitions of the quarters they contain.
+
+        Quarters are replaced as a whole, so every file of a quarter must be in the
+        batches. Each partition file is only renamed into place once complete.
+
+        Args:
+            batches: Tables with the schema of accounting_reader.ACCOUNTING_SCHEMA
+
+        Returns:
+            Labels of the written partitions
+        """
+        writers: Dict[int, PartitionWriter] = {}
+        try:
+            for batch in batches:
+                table = self._store_table(batch)
+                dates = table.column("data")
+                quarter = pc.add(pc.multiply(pc.year(dates), 10),
+                                 pc.add(pc.divide(pc.subtract(pc.month(dates), 1), 3), 1))
+                for code in pc.unique(quarter).to_pylist():
+                    if code is None:
+                        continue
+                    if code not in writers:
+                        writers[code] = PartitionWriter(os.path.join(self.root, self.partition_path(code)))
+                    writers[code].write(table.filter(pc.equal(quarter, code)))
+        except Exception:
+            for writer in writers.values():
+                writer.abort()
+            raise
+
+        # The dictionary only grows, so it is written before any partition using its new ids is in place
+        self._save_descriptions()
+        for code, writer in writers.items():
+            stats = writer.close()
+            stats["path"] = self.partition_path(code)
+            self.partitions[quarter_label(code)] = stats
+
+        self.save()
+        return [quarter_label(code) for code in sorted(writers)]
+
+    def _partition_matches(self, stats: Dict[str, Any], start: Optional[date], end: Optional[date],
+                           account: Optional[str], description_id: Optional[int]) -> bool:
+        """Whether the statistics of a partition allow matching rows"""
+        if stats.get("rows", 0) == 0:
+            return False
+        if start is not None and stats["max_data"] < start.isoformat():
+            return False
+        if end is not None and stats["min_data"] >= end.isoformat():
+            return False
+        if account is not None and not stats["min_cd_conta_contabil"] <= account <= stats["max_cd_conta_contabil"]:
+            return False
+        if description_id is not None and not stats["min_descricao_id"] <= description_id <= stats["max_descricao_id"]:
+            return False
+        return True
+
+    @staticmethod
+    def _row_groups(parquet_file: pq.ParquetFile, account: Optional[str], description_id: Optional[int]) -> List[int]:
+        """Row groups whose min/max statistics allow the account and description"""
+        metadata = parquet_file.metadata
+        names = parquet_file.schema_arrow.names
+        groups = []
+        for index in range(metadata.num_row_groups):
+            row_group = metadata.row_group(index)
+            keep = True
+            for column, value in (("cd_conta_contabil", account), ("descricao_id", description_id)):
+                if value is None:
+                    continue
+                statistics = row_group.column(names.index(column)).statistics
+                if statistics is not None and statistics.has_min_max and not statistics.min <= value <= statistics.max:
+                    keep = False
+                    break
+            if keep:
+                groups.append(index)
+        return groups
+
+    def _partition_top_k(self, path: str, start: Optional[date], end: Optional[date], account: Optional[str],
+                         description_id: Optional[int], k: int) -> List[Tuple[int, Dict[str, Any]]]:
+        """The k rows with the lowest variation of a partition, as (variation, row)"""
+        parquet_file = pq.ParquetFile(os.path.join(self.root, path))
+        groups = self._row_groups(parquet_file, account, description_id)
+        if not groups:
+            return []
+
+        # Only the filter and value columns are read for every row of the kept row groups
+        filters = [column for column, value in (("cd_conta_contabil", account), ("descricao_id", description_id))
+                   if value is not None]
+        table = parquet_file.read_row_groups(groups, columns=["data", "vl_saldo_inicial", "vl_saldo_final"] + filters)
+
+        mask = np.ones(table.num_rows, dtype=bool)
+        if start is not None:
+            mask &= pc.greater_equal(table.column("data"), pa.scalar(start, pa.date32())).to_numpy()
+        if end is not None:
+            mask &= pc.less(table.column("data"), pa.scalar(end, pa.date32())).to_numpy()
+        if account is not None:
+            mask &= pc.equal(table.column("cd_conta_contabil"), account).to_numpy(zero_copy_only=False)
+        if description_id is not None:
+            mask &= pc.equal(table.column("descricao_id"), description_id).to_numpy(zero_copy_only=False)
+        matching = np.flatnonzero(mask)
+        if len(matching) == 0:
+            return []
+
+        variation = (pc.fill_null(table.column("vl_saldo_final"), 0).to_numpy()
+                     - pc.fill_null(table.column("vl_saldo_inicial"), 0).to_numpy())[matching]
+        selected = np.argpartition(variation, k - 1)[:k] if len(variation) > k else np.arange(len(variation))
+        positions = matching[selected]
+
+        # The other columns are read only from the row groups holding the selected rows
+        sizes = np.array([parquet_file.metadata.row_group(group).num_rows for group in groups])
+        offsets = np.r_[0, np.cumsum(sizes)]
+        group_indexes = np.searchsorted(offsets, positions, side="right") - 1
+        needed = sorted(set(group_indexes.tolist()))
+        needed_table = parquet_file.read_row_groups([groups[index] for index in needed], columns=QUERY_COLUMNS)
+        needed_offsets = dict(zip(needed, np.r_[0, np.cumsum(sizes[needed])[:-1]]))
+        rows = needed_table.take(pa.array([needed_offsets[group] + position - offsets[group]
+                                           for group, position in zip(group_indexes.tolist(), positions.tolist())]))
+        return list(zip(variation[selected].tolist(), rows.to_pylist()))
+
+    def top_expenses(self, start: Optional[date] = None, end: Optional[date] = None, account: Optional[str] = None,
+                     description: Optional[str] = None, limit: int = 10, workers: int = 4) -> List[Dict[str, Any]]:
+        """
+        Rows with the highest expense (lowest vl_saldo_final - vl_saldo_inicial).
+
+        Same result as the queries of analytical_queries.sql, e.g. the last quarter of
+        2024 is start=date(2024, 10, 1) with the description of the account.
+
+        Args:
+            start: First date (inclusive)
+            end: Last date (exclusive)
+            account: Account code
+            description: Account description (compared after TRIM)
+            limit: Number of rows
+            workers: Partitions read in parallel
+
+        Returns:
+            Rows sorted by expense: 'data', 'reg_ans', 'cd_conta_contabil', 'descricao',
+            'vl_saldo_inicial', 'vl_saldo_final' and 'despesa' (in reais)
+        """
+        description_id = None
+        if description is not None:
+            description_id = self.descriptions.id_of(description)
+            if description_id is None:
+                return []
+        if account is not None:
+            account = normalize_account(pa.array([account]))[0].as_py()
+
+        paths = [stats["path"] for _, stats in sorted(self.partitions.items())
+                 if self._partition_matches(stats, start, end, account, description_id)]
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            partials = executor.map(
+                lambda path: self._partition_top_k(path, start, end, account, description_id, limit), paths)
+            best = heapq.nsmallest(limit, (item for partial in partials for item in partial), key=lambda item: item[0])
+
+        return [{
+            "data": row["data"].isoformat(),
+            "reg_ans": row["reg_ans"],
+            "cd_conta_contabil": row["cd_conta_contabil"],
+            "descricao": self.descriptions.values[row["descricao_id"]],
+            "vl_saldo_inicial": (row["vl_saldo_inicial"] or 0) / 100,
+            "vl_saldo_final": (row["vl_saldo_final"] or 0) / 100,
+            "despesa": abs(variation) / 100,
+        } for variation, row in best]
+
+
+def build_store(files: List[str], root: str = STORE_DIR, workers: int = 4) -> List[str]:
+    """
+    Build (or update) the partitions of the quarters contained in the files.
+
+    Args:
+        files: Quarterly accounting CSV files
+        root: Directory of the store
+        workers: Parser threads
+
+    Returns:
+        Labels of the written partitions
+    """
+    return AccountingStore(root).ingest(read_accounting_batches(files, workers))
+
+
+def main() -> int:
+    """
+    Main function to build the store or query it.
+
+    Returns:
+        Exit code (0 for success, non-zero for error)
+    """
+    parser = argparse.ArgumentParser(description="Partitioned columnar store of demonstracoes_contabeis")
+    parser.add_argument("--store-dir", default=STORE_DIR, help="Directory of the store")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="Write the partitions of the quarters in the given files")
+    build.add_argument("source", nargs="?", default="demonstracoes_contabeis",
+                       help="Directory of the quarterly CSV files or glob pattern")
+    build.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Parser threads")
+
+    top = commands.add_parser("top", help="Show the rows with the highest expenses")
+    top.add_argument("--period", help="Quarter (2024Q4) or year (2024)")
+    top.add_argument("--start", type=date.fromisoformat, help="First date (yyyy-mm-dd)")
+    top.add_argument("--end", type=date.fromisoformat, help="End date, exclusive (yyyy-mm-dd)")
+    top.add_argument("--account", help="Account code")
+    top.add_argument("--description", help="Account description")
+    top.add_argument("--limit", type=int, default=10, help="Number of rows")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+                        force=True)
+
+    if args.command == "build":
+        files = find_csv_files(args.source)
+        if not files:
+            logger.error(f"No CSV files found in {args.source}")
+            return 1
+        began = time.perf_counter()
+        partitions = build_store(files, args.store_dir, args.workers)
+        logger.info(f"Wrote partitions {', '.join(partitions)} in {time.perf_counter() - began:.1f}s")
+        return 0
+
+    start, end = args.start, args.end
+    if args.period:
+        try:
+            start, end = period_range(args.period)
+        except ValueError as e:
+            logger.error(str(e))
+            return 1
+
+    began = time.perf_counter()
+    rows = AccountingStore(args.store_dir).top_expenses(start, end, args.account, args.description, args.limit)
+    for row in rows:
+        print(f"{row['data']}  {row['reg_ans']:>8}  {row['cd_conta_contabil']:>10}  "
+              f"R$ {row['despesa']:>18,.2f}  {row['descricao']}")
+    logger.info(f"{len(rows)} rows in {(time.perf_counter() - began) * 1000:.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
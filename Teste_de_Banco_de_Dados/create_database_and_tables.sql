@@ -1,14 +1,17 @@
 CREATE DATABASE ans;
 
+-- Partitioned by quarter (demonstracoes_contabeis_2024q4, ...), so a quarter can be
+-- reloaded without touching the others (see incremental_loader.py)
 CREATE TABLE demonstracoes_contabeis (
- id BIGSERIAL PRIMARY KEY,
+ id BIGSERIAL,
  data DATE NOT NULL,
  reg_ans VARCHAR(50),
  cd_conta_contabil VARCHAR(50),
  descricao VARCHAR(255),
  vl_saldo_inicial MONEY NOT NULL DEFAULT 0.00,
- vl_saldo_final MONEY NOT NULL DEFAULT 0.00
-);
+ vl_saldo_final MONEY NOT NULL DEFAULT 0.00,
+ PRIMARY KEY (id, data)
+) PARTITION BY RANGE (data);
 
 CREATE TABLE relatorio_cadop (
  registro_ans VARCHAR(10) PRIMARY KEY,
@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+Quarterly Expense Rollups
+
+This module precomputes the answers of analytical_queries.sql at ingest time.
+Both queries filter one account description, then sort every matching row by
+vl_saldo_final - vl_saldo_inicial on each execution; here that work is done once:
+    - rollups: one row per (quarter, reg_ans, normalized cd_conta_contabil) with the
+      summed balances and variation, kept as one Parquet file per quarter
+    - top-k: for every quarter and account, the k entries with the lowest variation
+      (the same ASC order as the queries, the expense being its absolute value)
+
+A year top-k is the merge of the top-k of its quarters, since the k lowest of the
+year are always among the k lowest of some quarter; so a "full year" question reads
+at most four small lists and a "last trimester" question reads one. When a quarter
+is loaded again, only that quarter is recomputed.
+
+Usage:
+    python expense_rollups.py --rollups-dir rollups build demonstracoes_contabeis
+    python expense_rollups.py top 2024Q4 --description "EVENTOS/ SINISTROS CONHECIDOS OU AVISADOS  DE ..."
+    python expense_rollups.py top 2024 --account 411
+
+Author: Vitor Oliveira
+Date: 2025-03-26
+"""
+
+import os
+import re
+import sys
+import json
+import heapq
+import logging
+import argparse
+import tempfile
+from itertools import chain
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from accounting_reader import read_accounting_batches
+from utils.csv_chunks import find_csv_files
+
+logger = logging.getLogger(__name__)
+
+ROLLUPS_DIR = "rollups"
+TOP_K_FILENAME = "top_k.json"
+ROLLUPS_VERSION = 1
+
+# Entries kept per quarter and account; queries can ask for any limit up to it
+TOP_K = 100
+
+KEY_COLUMNS = ["quarter", "reg_ans", "cd_conta_contabil"]
+
+_QUARTER_PATTERN = re.compile(r"^(\d{4})Q([1-4])$")
+
+
+def quarter_label(code: int) -> str:
+    """Label of a quarter code (20244 -> "2024Q4")"""
+    return f"{code // 10}Q{code % 10}"
+
+
+def quarter_code(label: str) -> Optional[int]:
+    """Code of a quarter label ("2024Q4" -> 20244), None if invalid"""
+    match = _QUARTER_PATTERN.match(label.strip().upper())
+    return int(match.group(1)) * 10 + int(match.group(2)) if match else None
+
+
+def normalize_account(values: pa.Array) -> pa.Array:
+    """Keep only the letters and digits of account codes ("4.1.1" and "411" match)"""
+    return pc.replace_substring_regex(pc.utf8_trim_whitespace(values), r"[^0-9A-Za-z]", "")
+
+
+def aggregate_batch(batch: pa.Table) -> pa.Table:
+    """
+    Sum the balances of a batch per (quarter, reg_ans, account).
+
+    Args:
+        batch: Table with the schema of accounting_reader.ACCOUNTING_SCHEMA
+
+    Returns:
+        Table with the KEY_COLUMNS, descricao and the summed balances (cents) and rows
+    """
+    dates = batch.column("data")
+    quarter = pc.add(pc.multiply(pc.year(dates), 10), pc.add(pc.divide(pc.subtract(pc.month(dates), 1), 3), 1))
+
+    keyed = pa.table({
+        "quarter": pc.cast(quarter, pa.int32()),
+        "reg_ans": pc.utf8_trim_whitespace(batch.column("reg_ans")),
+        "cd_conta_contabil": normalize_account(batch.column("cd_conta_contabil")),
+        # TRIM, like the filter of analytical_queries.sql
+        "descricao": pc.utf8_trim_whitespace(batch.column("descricao")),
+        "vl_saldo_inicial": batch.column("vl_saldo_inicial"),
+        "vl_saldo_final": batch.column("vl_saldo_final"),
+    }).filter(pc.is_valid(quarter))
+
+    return keyed.group_by(KEY_COLUMNS).aggregate([
+        ("descricao", "max"),
+        ("vl_saldo_inicial", "sum"),
+        ("vl_saldo_final", "sum"),
+        ("vl_saldo_final", "count", pc.CountOptions(mode="all")),
+    ]).rename_columns(KEY_COLUMNS + ["descricao", "vl_saldo_inicial", "vl_saldo_final", "rows"])
+
+
+def merge_partials(partials: List[pa.Table], final: bool = True) -> pa.Table:
+    """
+    Combine partial aggregates of the same keys.
+
+    Args:
+        partials: Tables returned by aggregate_batch
+        final: Whether to add the variation column (vl_saldo_final - vl_saldo_inicial)
+
+    Returns:
+        Aggregated table
+    """
+    table = pa.concat_tables(partials) if len(partials) > 1 else partials[0]
+    if len(partials) > 1:
+        table = table.group_by(KEY_COLUMNS).aggregate([
+            ("descricao", "max"),
+            ("vl_saldo_inicial", "sum"),
+            ("vl_saldo_final", "sum"),
+            ("rows", "sum"),
+        ]).rename_columns(KEY_COLUMNS + ["descricao", "vl_saldo_inicial", "vl_saldo_final", "rows"])
+
+    if final:
+        variation = pc.subtract(pc.fill_null(table.column("vl_saldo_final"), 0),
+                                pc.fill_null(table.column("vl_saldo_inicial"), 0))
+        table = table.append_column("variation", variation)
+    return table
+
+
+def quarter_top_k(rollup: pa.Table, k: int) -> Dict[str, List[list]]:
+    """
+    Find the k entries with the lowest variation of each account in a quarter rollup.
+
+    Args:
+        rollup: Rollup table of one quarter
+        k: Entries per account
+
+    Returns:
+        Account code -> list of [variation, reg_ans, vl_saldo_inicial, vl_saldo_final]
+        sorted by variation
+    """
+    if rollup.num_rows == 0:
+        return {}
+
+    accounts = pc.dictionary_encode(rollup.column("cd_conta_contabil")).combine_chunks()
+    codes = accounts.indices.to_numpy(zero_copy_only=False)
+    variation = rollup.column("variation").to_numpy()
+
+    # Sort by account then variation, and keep the first k rows of every account
+    order = np.lexsort((variation, codes))
+    sorted_codes = codes[order]
+    starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+    rank = np.arange(len(order)) - np.repeat(starts, np.diff(np.r_[starts, len(order)]))
+    selected = rollup.take(pa.array(order[rank < k]))
+
+    top: Dict[str, List[list]] = {}
+    for row in selected.select(["cd_conta_contabil", "variation", "reg_ans", "vl_saldo_inicial",
+                                "vl_saldo_final"]).to_pylist():
+        top.setdefault(row["cd_conta_contabil"], []).append(
+            [row["variation"], row["reg_ans"], row["vl_saldo_inicial"], row["vl_saldo_final"]])
+    return top
+
+
+class ExpenseRollups:
+    """Per-quarter rollups and top-k lists, stored in a directory"""
+
+    def __init__(self, root: str = ROLLUPS_DIR, k: int = TOP_K):
+        """
+        Open the rollups directory (the top-k lists are loaded if they exist).
+
+        Args:
+            root: Directory of the rollup files
+            k: Entries kept per quarter and account
+        """
+        self.root = root
+        self.k = k
+        # Quarter code -> account -> top entries
+        self.top: Dict[int, Dict[str, List[list]]] = {}
+        # Account -> description
+        self.descriptions: Dict[str, str] = {}
+        self._load()
+
+    def _top_k_path(self) -> str:
+        return os.path.join(self.root, TOP_K_FILENAME)
+
+    def rollup_path(self, code: int) -> str:
+        """Path of the rollup file of a quarter"""
+        return os.path.join(self.root, f"quarter={quarter_label(code)}.parquet")
+
+    def _load(self) -> None:
+        path = self._top_k_path()
+        if not os.path.exists(path):
+            return
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable rollups index {path}: {e}")
+            return
+
+        if data.get("version") != ROLLUPS_VERSION or data.get("k", 0) < self.k:
+            logger.info(f"Rollups index {path} is outdated, rebuild the rollups")
+            return
+        self.top = {quarter_code(label): accounts for label, accounts in data["quarters"].items()}
+        self.descriptions = data["descriptions"]
+
+    def save(self) -> bool:
+        """
+        Atomically write the top-k index.
+
+        Returns:
+            True if written, False otherwise
+        """
+        data = {
+            "version": ROLLUPS_VERSION,
+            "k": self.k,
+            "quarters": {quarter_label(code): self.top[code] for code in sorted(self.top)},
+            "descriptions": self.descriptions,
+        }
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(temp_path, self._top_k_path())
+            return True
+        except OSError as e:
+            logger.warning(f"Could not write rollups index: {e}")
+            return False
+
+    @property
+    def quarters(self) -> List[str]:
+        """Labels of the quarters with rollups"""
+        return [quarter_label(code) for code in sorted(self.top)]
+
+    def replace_quarter(self, code: int, rollup: pa.Table) -> None:
+        """
+        Store the rollup of a quarter and recompute only its top-k lists.
+
+        Args:
+            code: Quarter code (e.g. 20244)
+            rollup: Table returned by merge_partials for that quarter
+        """
+        os.makedirs(self.root, exist_ok=True)
+        pq.write_table(rollup.drop_columns(["quarter"]), self.rollup_path(code))
+
+        self.top[code] = quarter_top_k(rollup, self.k)
+        accounts = rollup.group_by("cd_conta_contabil").aggregate([("descricao", "max")])
+        self.descriptions.update(zip(accounts.column("cd_conta_contabil").to_pylist(),
+                                     accounts.column("descricao_max").to_pylist()))
+        logger.info(f"Rollup of {quarter_label(code)}: {rollup.num_rows} entries, {len(self.top[code])} accounts")
+
+    def ingest(self, batches: Iterable[pa.Table]) -> List[str]:
+        """
+        Aggregate accounting batches and replace the quarters they contain.
+
+        Quarters are replaced as a whole, so every file of a quarter must be in the
+        batches.
+
+        Args:
+            batches: Tables with the schema of accounting_reader.ACCOUNTING_SCHEMA
+
+        Returns:
+            Labels of the replaced quarters
+        """
+        partials: Dict[int, List[pa.Table]] = {}
+        for batch in batches:
+            aggregated = aggregate_batch(batch)
+            for code in pc.unique(aggregated.column("quarter")).to_pylist():
+                partials.setdefault(code, []).append(aggregated.filter(pc.equal(aggregated.column("quarter"), code)))
+
+        for code, tables in sorted(partials.items()):
+            self.replace_quarter(code, merge_partials(tables))
+        return [quarter_label(code) for code in sorted(partials)]
+
+    def accounts_for(self, description: str) -> List[str]:
+        """Account codes whose (trimmed) description matches"""
+        description = description.strip()
+        return [account for account, text in self.descriptions.items() if text == description]
+
+    def top_expenses(self, period: str, account: Optional[str] = None, description: Optional[str] = None,
+                     limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Entries with the highest expense (lowest variation) of a quarter or year.
+
+        Args:
+            period: Quarter ("2024Q4") or year ("2024")
+            account: Account code
+            description: Account description (used when no account is given)
+            limit: Number of entries (at most k)
+
+        Returns:
+            Entries sorted by expense: 'quarter', 'reg_ans', 'cd_conta_contabil',
+            'descricao', 'vl_saldo_inicial', 'vl_saldo_final' and 'despesa' (in reais)
+        """
+        code = quarter_code(period)
+        if code is not None:
+            codes = [code] if code in self.top else []
+        elif period.strip().isdigit():
+            codes = [c for c in self.top if c // 10 == int(period)]
+        else:
+            raise ValueError(f"Invalid period '{period}', expected a year (2024) or a quarter (2024Q4)")
+
+        if account is not None:
+            accounts = [re.sub(r"[^0-9A-Za-z]", "", account)]
+        elif description is not None:
+            accounts = self.accounts_for(description)
+        else:
+            raise ValueError("An account or a description is required")
+
+        if limit > self.k:
+            logger.warning(f"Only the top {self.k} entries are kept, returning {self.k}")
+
+        candidates = chain.from_iterable(
+            ((c, a, entry) for entry in self.top[c].get(a, [])) for c in codes for a in accounts)
+        best = heapq.nsmallest(min(limit, self.k), candidates, key=lambda item: item[2][0])
+
+        return [{
+            "quarter": quarter_label(c),
+            "reg_ans": reg_ans,
+            "cd_conta_contabil": a,
+            "descricao": self.descriptions.get(a),
+            "vl_saldo_inicial": initial / 100,
+            "vl_saldo_final": final / 100,
+            "despesa": abs(variation) / 100,
+        } for c, a, (variation, reg_ans, initial, final) in best]
+
+
+def build_rollups(files: List[str], root: str = ROLLUPS_DIR, workers: int = 4, k: int = TOP_K) -> List[str]:
+    """
+    Build (or update) the rollups of the quarters contained in the files.
+
+    Args:
+        files: Quarterly accounting CSV files
+        root: Directory of the rollup files
+        workers: Parser threads
+        k: Entries kept per quarter and account
+
+    Returns:
+        Labels of the quarters built
+    """
+    rollups = ExpenseRollups(root, k)
+    quarters = rollups.ingest(read_accounting_batches(files, workers))
+    rollups.save()
+    return quarters
+
+
+def main() -> int:
+    """
+    Main function to build the rollups or query them.
+
+    Returns:
+        Exit code (0 for success, non-zero for error)
+    """
+    parser = argparse.ArgumentParser(description="Quarterly expense rollups of demonstracoes_contabeis")
+    parser.add_argument("--rollups-dir", default=ROLLUPS_DIR, help="Directory of the rollup files")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="Build the rollups of the quarters in the given files")
+    build.add_argument("source", nargs="?", default="demonstracoes_contabeis",
+                       help="Directory of the quarterly CSV files or glob pattern")
+    build.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Parser threads")
+    build.add_argument("--k", type=int, default=TOP_K, help="Entries kept per quarter and account")
+
+    top = commands.add_parser("top", help="Show the highest expenses of a quarter or year")
+    top.add_argument("period", help="Quarter (2024Q4) or year (2024)")
+    top.add_argument("--account", help="Account code")
+    top.add_argument("--description", help="Account description")
+    top.add_argument("--limit", type=int, default=10, help="Number of entries")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+                        force=True)
+
+    if args.command == "build":
+        files = find_csv_files(args.source)
+        if not files:
+            logger.error(f"No CSV files found in {args.source}")
+            return 1
+        quarters = build_rollups(files, args.rollups_dir, args.workers, args.k)
+        logger.info(f"Built rollups of {', '.join(quarters)}")
+        return 0
+
+    try:
+        entries = ExpenseRollups(args.rollups_dir).top_expenses(args.period, args.account, args.description,
+                                                                args.limit)
+    except ValueError as e:
+        logger.error(str(e))
+        return 1
+
+    for entry in entries:
+        print(f"{entry['quarter']}  {entry['reg_ans']:>8}  {entry['cd_conta_contabil']:>10}  "
+              f"R$ {entry['despesa']:>18,.2f}  {entry['descricao']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
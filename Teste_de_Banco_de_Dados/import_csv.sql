@@ -32,6 +32,12 @@ COPY relatorio_cadop FROM 'C:\\{YOUR_FILE_PATH}\\Teste_de_Banco_de_Dados\\relato
 -- 2. (Server Side) Execute via Server Query
 -- Import: Make sure you change the path correctly for your device
 -- Don't be afraid, it will take a while, there are a total of 6256861 lines adding up all the files
+-- Faster alternative: bulk_loader.py loads the files in parallel from the client side (COPY FROM STDIN),
+-- without hard-coded paths or server read permissions, and replaces the table atomically:
+--     python bulk_loader.py demonstracoes_contabeis --dsn "dbname=ans user=postgres" --workers 4
+-- To add or reload quarters without reloading the others (re-running this script appends
+-- every file again), use incremental_loader.py, which skips the files already loaded:
+--     python incremental_loader.py demonstracoes_contabeis --dsn "dbname=ans user=postgres"
 DO $$ 
 DECLARE 
     i INT;
@@ -45,6 +51,11 @@ BEGIN
             -- Build the file path dynamically
             file_path := 'C:\\Users\\vitor.DESKTOP-V9RV4P3\\Downloads\\vitor\\Teste_Intuitive_Care\\Teste_de_Banco_de_Dados\\demonstracoes_contabeis\\' || i || 'T' || year || '.csv';
             
+            -- Create the partition of the quarter
+            EXECUTE format('CREATE TABLE IF NOT EXISTS %I PARTITION OF demonstracoes_contabeis FOR VALUES FROM (%L) TO (%L)',
+                           'demonstracoes_contabeis_' || year || 'q' || i,
+                           make_date(year, 3 * i - 2, 1), (make_date(year, 3 * i - 2, 1) + INTERVAL '3 months')::date);
+
             -- Execute the COPY command with dynamic file path
 			-- Important: specify columns to ignore id column when reading the csv
             EXECUTE 'COPY demonstracoes_contabeis (data, reg_ans, cd_conta_contabil, descricao, vl_saldo_inicial, vl_saldo_final) FROM ' || quote_literal(file_path) || ' WITH (FORMAT csv, DELIMITER '';'' , HEADER true, ENCODING ''utf-8'')';
@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+Incremental Loader for demonstracoes_contabeis
+
+Re-running import_csv.sql appends every file again, and bulk_loader.py reloads all
+of them. This tool loads only the quarters whose files changed, and can be re-run
+any number of times with the same result:
+    - the files are grouped by quarter (from the date of their first row) and
+      hashed (SHA-256); the ledger (ingestion_ledger.json) keeps, per quarter, the
+      hashes of its files and the destinations already loaded with them
+    - a quarter whose files match the ledger is skipped
+    - a new or changed quarter is staged and replaces only its own partition (a
+      quarter whose files have rows dated in another quarter fails instead, as
+      replacing it would drop them; bulk_loader.py loads such files):
+        database  an indexed table attached as the quarter partition in one
+                  transaction (bulk_loader.LoadTarget.replace_period)
+        store     the partition file of the quarter, renamed into place (columnar_store.py)
+        rollups   the rollup and top-k lists of the quarter (expense_rollups.py)
+    - the ledger is written after each destination is updated, so an interrupted
+      run only redoes what was not finished (replacing a quarter is idempotent)
+
+Usage:
+    python incremental_loader.py demonstracoes_contabeis --dsn "dbname=ans user=postgres"
+    python incremental_loader.py demonstracoes_contabeis --target duckdb --database ans.duckdb
+    python incremental_loader.py demonstracoes_contabeis --destinations store rollups
+
+Author: Vitor Oliveira
+Date: 2025-03-26
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import logging
+import argparse
+import tempfile
+from datetime import date, datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from accounting_reader import DATE_FORMATS, read_accounting_batches
+from bulk_loader import CHUNK_MB, LoadTarget, create_target
+from columnar_store import STORE_DIR, AccountingStore, period_range
+from expense_rollups import ROLLUPS_DIR, TOP_K, ExpenseRollups, aggregate_batch, merge_partials, quarter_label
+from utils.csv_chunks import detect_encoding, find_csv_files, split_byte_ranges
+
+logger = logging.getLogger(__name__)
+
+LEDGER_FILE = "ingestion_ledger.json"
+LEDGER_VERSION = 1
+DESTINATIONS = ["database", "store", "rollups"]
+
+# Bytes hashed per read
+HASH_BLOCK = 1024 * 1024
+
+
+def file_checksum(path: str) -> str:
+    """
+    SHA-256 of a file.
+
+    Args:
+        path: Path to the file
+
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def file_quarter(path: str) -> Optional[int]:
+    """
+    Quarter of an accounting file, from the date of its first row.
+
+    Args:
+        path: Path to the CSV file
+
+    Returns:
+        Quarter code (e.g. 20244), or None if the first row has no valid date
+    """
+    with open(path, "rb") as f:
+        line = f.readline()
+        if b"DATA" in line.upper():
+            line = f.readline()
+
+    value = line.decode("latin-1").split(";", 1)[0].strip().strip('"')
+    for date_format in DATE_FORMATS:
+        try:
+            day = datetime.strptime(value, date_format).date()
+            return day.year * 10 + (day.month - 1) // 3 + 1
+        except ValueError:
+            continue
+    return None
+
+
+def group_by_quarter(files: List[str]) -> Dict[int, List[str]]:
+    """
+    Group accounting files by quarter.
+
+    Args:
+        files: CSV files
+
+    Returns:
+        Quarter code -> files of the quarter (files without a valid date are logged and skipped)
+    """
+    quarters: Dict[int, List[str]] = {}
+    for path in files:
+        code = file_quarter(path)
+        if code is None:
+            logger.warning(f"Skipping {path}: the first row has no valid DATA")
+            continue
+        quarters.setdefault(code, []).append(path)
+    return quarters
+
+
+class IngestionLedger:
+    """Checksums of the files each quarter was loaded from, per destination"""
+
+    def __init__(self, path: str = LEDGER_FILE):
+        """
+        Open the ledger (loaded if the file exists).
+
+        Args:
+            path: Path of the ledger file
+        """
+        self.path = path
+        # Quarter label -> {"files": {name: sha256}, "destinations": {destination: {"rows", "loaded_at"}}}
+        self.quarters: Dict[str, Dict[str, Any]] = {}
+        self._load()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable ledger {self.path}: {e}")
+            return
+        if data.get("version") == LEDGER_VERSION:
+            self.quarters = data["quarters"]
+
+    def save(self) -> bool:
+        """
+        Atomically write the ledger.
+
+        Returns:
+            True if written, False otherwise
+        """
+        data = {"version": LEDGER_VERSION, "quarters": dict(sorted(self.quarters.items()))}
+        try:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+            os.replace(temp_path, self.path)
+            return True
+        except OSError as e:
+            logger.warning(f"Could not write ledger: {e}")
+            return False
+
+    def is_loaded(self, label: str, checksums: Dict[str, str], destination: str) -> bool:
+        """Whether a destination already has the quarter loaded from these files"""
+        entry = self.quarters.get(label)
+        return bool(entry) and entry["files"] == checksums and destination in entry["destinations"]
+
+    def record(self, label: str, checksums: Dict[str, str], destination: str, rows: int) -> None:
+        """Record that a destination was loaded with the quarter from these files, and save"""
+        entry = self.quarters.get(label)
+        if not entry or entry["files"] != checksums:
+            entry = self.quarters[label] = {"files": checksums, "destinations": {}}
+        entry["destinations"][destination] = {
+            "rows": rows,
+            "loaded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        }
+        self.save()
+
+
+def load_quarter_database(target: LoadTarget, label: str, files: List[str], workers: int = 4,
+                          chunk_mb: int = CHUNK_MB) -> int:
+    """
+    Stage the files of a quarter and replace the quarter partition with them.
+
+    Args:
+        target: Database target
+        label: Quarter label (e.g. "2024Q4")
+        files: CSV files of the quarter
+        workers: Parallel connections
+        chunk_mb: Size of the byte range of each task in MB
+
+    Returns:
+        Number of rows of the quarter
+
+    Raises:
+        ValueError: When rows of the files are dated outside the quarter
+    """
+    tasks = []
+    for path in files:
+        encoding = detect_encoding(path)
+        tasks.extend((path, start, end, encoding) for start, end in split_byte_ranges(path, chunk_mb * 1024 * 1024))
+
+    target.prepare()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="loader") as executor:
+        for _ in executor.map(lambda task: target.load_range(*task), tasks):
+            pass
+
+    start, end = period_range(label)
+    return target.replace_period(label, start, end)
+
+
+def _quarter_batches(files: List[str], label: str, start: date, end: date, workers: int) -> Iterator[pa.Table]:
+    """
+    Batches of the files of a quarter (rows without a valid date are left out, as in build_store).
+
+    Raises:
+        ValueError: When rows are dated outside [start, end)
+    """
+    for batch in read_accounting_batches(files, workers):
+        dates = batch.column("data")
+        inside = pc.and_(pc.greater_equal(dates, pa.scalar(start, pa.date32())),
+                         pc.less(dates, pa.scalar(end, pa.date32())))
+        outside = pc.sum(pc.invert(inside)).as_py()
+        if outside:
+            raise ValueError(f"{outside} rows of the {label} files are dated outside {label}, "
+                             f"load these files with columnar_store.py and expense_rollups.py")
+        yield batch.filter(inside)
+
+
+def load_quarter_files(code: int, files: List[str], store: Optional[AccountingStore] = None,
+                       rollups: Optional[ExpenseRollups] = None, workers: int = 4) -> int:
+    """
+    Replace the partition of a quarter in the store and its rollup, in a single read of the files.
+
+    Args:
+        code: Quarter code (e.g. 20244)
+        files: CSV files of the quarter
+        store: Columnar store to update, if any
+        rollups: Rollups to update, if any
+        workers: Parser threads
+
+    Returns:
+        Number of rows of the quarter
+
+    Raises:
+        ValueError: When rows of the files are dated outside the quarter (nothing is replaced)
+    """
+    label = quarter_label(code)
+    start, end = period_range(label)
+    partials: List[pa.Table] = []
+    rows = 0
+
+    def tap(batches: Iterable[pa.Table]) -> Iterator[pa.Table]:
+        nonlocal rows
+        for batch in batches:
+            rows += batch.num_rows
+            if rollups is not None:
+                partials.append(aggregate_batch(batch))
+            yield batch
+
+    batches = tap(_quarter_batches(files, label, start, end, workers))
+    if store is not None:
+        store.ingest(batches)
+    else:
+        for _ in batches:
+            pass
+
+    if rollups is not None:
+        rollups.replace_quarter(code, merge_partials(partials))
+        rollups.save()
+    return rows
+
+
+def run_incremental(files: List[str], ledger: IngestionLedger, target: Optional[LoadTarget] = None,
+                    store: Optional[AccountingStore] = None, rollups: Optional[ExpenseRollups] = None,
+                    workers: int = 4, force: bool = False) -> Optional[Dict[str, List[str]]]:
+    """
+    Load the quarters whose files are not in the ledger yet.
+
+    Args:
+        files: Quarterly accounting CSV files
+        ledger: Ingestion ledger
+        target: Database target to update, if any
+        store: Columnar store to update, if any
+        rollups: Rollups to update, if any
+        workers: Parallel connections / parser threads
+        force: Reload every quarter, even the ones already in the ledger
+
+    Returns:
+        Quarter label -> destinations updated (quarters skipped are not included),
+        or None if a load failed
+    """
+    updated: Dict[str, List[str]] = {}
+    failed: List[str] = []
+    try:
+        for code, quarter_files in sorted(group_by_quarter(files).items()):
+            label = quarter_label(code)
+            checksums = {os.path.basename(path): file_checksum(path) for path in sorted(quarter_files)}
+            pending = [destination for destination, selected in zip(DESTINATIONS, (target, store, rollups))
+                       if selected is not None and (force or not ledger.is_loaded(label, checksums, destination))]
+            if not pending:
+                logger.info(f"{label}: up to date ({', '.join(checksums)})")
+                continue
+
+            began = time.perf_counter()
+            try:
+                if "database" in pending:
+                    rows = load_quarter_database(target, label, quarter_files, workers)
+                    ledger.record(label, checksums, "database", rows)
+
+                files_pending = [destination for destination in ("store", "rollups") if destination in pending]
+                if files_pending:
+                    rows = load_quarter_files(code, quarter_files, store if "store" in pending else None,
+                                              rollups if "rollups" in pending else None, workers)
+                    for destination in files_pending:
+                        ledger.record(label, checksums, destination, rows)
+            except ValueError as e:
+                # Files that do not fit the quarter: the other quarters are still loaded
+                logger.error(f"{label}: {e}")
+                failed.append(label)
+                continue
+
+            updated[label] = pending
+            logger.info(f"{label}: loaded into {', '.join(pending)} in {time.perf_counter() - began:.1f}s")
+    except Exception as e:
+        logger.error(f"Error loading quarters: {e}")
+        return None
+    finally:
+        if target is not None:
+            try:
+                target.drop_staging()
+            except Exception as e:
+                logger.warning(f"Could not drop the staging table: {e}")
+            target.close()
+
+    if failed:
+        logger.error(f"Quarters not loaded: {', '.join(failed)}")
+        return None
+    return updated
+
+
+def main() -> int:
+    """
+    Main function to run the incremental load.
+
+    Returns:
+        Exit code (0 for success, non-zero for error)
+    """
+    parser = argparse.ArgumentParser(description="Load new or changed quarters of demonstracoes_contabeis")
+    parser.add_argument("source", nargs="?", default="demonstracoes_contabeis",
+                        help="Directory of the quarterly CSV files or glob pattern")
+    parser.add_argument("--destinations", nargs="+", choices=DESTINATIONS, default=DESTINATIONS,
+                        help="What to update")
+    parser.add_argument("--ledger", default=LEDGER_FILE, help="Ledger of the loaded files")
+    parser.add_argument("--target", default="postgres", choices=["postgres", "sqlite", "duckdb"],
+                        help="Database to load into")
+    parser.add_argument("--dsn", default=os.environ.get("DATABASE_URL", "dbname=ans"),
+                        help="PostgreSQL connection string (defaults to $DATABASE_URL)")
+    parser.add_argument("--database", help="Database file of the sqlite and duckdb targets")
+    parser.add_argument("--store-dir", default=STORE_DIR, help="Directory of the columnar store")
+    parser.add_argument("--rollups-dir", default=ROLLUPS_DIR, help="Directory of the rollup files")
+    parser.add_argument("-k", type=int, default=TOP_K, help="Rollup entries kept per quarter and account")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Parallel connections / threads")
+    parser.add_argument("--force", action="store_true", help="Reload every quarter")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+                        force=True)
+
+    files = find_csv_files(args.source)
+    if not files:
+        logger.error(f"No CSV files found in {args.source}")
+        return 1
+
+    target = create_target(args.target, args.dsn, args.database) if "database" in args.destinations else None
+    store = AccountingStore(args.store_dir) if "store" in args.destinations else None
+    rollups = ExpenseRollups(args.rollups_dir, args.k) if "rollups" in args.destinations else None
+
+    began = time.perf_counter()
+    updated = run_incremental(files, IngestionLedger(args.ledger), target, store, rollups, args.workers, args.force)
+    if updated is None:
+        return 1
+
+    logger.info(f"Updated {len(updated)} quarters ({', '.join(updated) or 'none'}) "
+                f"in {time.perf_counter() - began:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+ANS Open Data Fetcher
+
+This module fetches the quarterly files of the ANS open data portal
+(dadosabertos.ans.gov.br/FTP/PDA) and feeds them straight into the ingestion stage:
+    - the directory index pages are listed with the same requests/BeautifulSoup
+      approach as pdf_scrapper.py, descending into the year directories
+    - the ZIP files are downloaded concurrently, each one as a stream
+    - each CSV member is decompressed while it downloads (see utils.zip_stream) and
+      parsed block by block into typed batches (accounting_reader), so neither the
+      archive nor the CSV is ever written to disk
+    - the batches are written to the partitioned columnar store (columnar_store.py)
+
+Files that are meant to be kept as CSV (e.g. the CADOP registry used by the API)
+can be downloaded with the `download` command instead.
+
+Usage:
+    python open_data_fetcher.py list --years 2023 2024
+    python open_data_fetcher.py ingest --years 2023 2024 --store-dir store --workers 4
+    python open_data_fetcher.py download --dataset operadoras --output-dir ../Teste_de_API/API/data
+
+Author: Vitor Oliveira
+Date: 2025-03-26
+"""
+
+import io
+import os
+import sys
+import time
+import queue
+import logging
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import unquote, urljoin, urlparse
+
+import requests
+import pyarrow as pa
+from bs4 import BeautifulSoup
+
+from accounting_reader import read_accounting_stream
+from columnar_store import STORE_DIR, AccountingStore
+from utils.zip_stream import IterStream, iter_zip_members
+
+logger = logging.getLogger(__name__)
+
+BASE_URL = "https://dadosabertos.ans.gov.br/FTP/PDA/"
+DATASETS = {
+    "demonstracoes_contabeis": "demonstracoes_contabeis/",
+    "operadoras": "operadoras_de_plano_de_saude_ativas/",
+}
+FILE_SUFFIXES = (".zip", ".csv")
+
+# Bytes per chunk of a download
+CHUNK_SIZE = 1024 * 1024
+REQUEST_TIMEOUT = 60
+# Parsed batches waiting to be ingested, per download worker
+QUEUE_BATCHES = 2
+
+
+def fetch_and_parse_page_content(url: str) -> Optional[BeautifulSoup]:
+    """
+    Fetch and parse HTML content from a specified URL.
+
+    Args:
+        url: The URL to fetch content from
+
+    Returns:
+        BeautifulSoup object with parsed content or None if request fails
+    """
+    try:
+        logger.info(f"Fetching page {url}")
+        response = requests.get(url, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        return BeautifulSoup(response.content, "html.parser")
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Failed to fetch page: {e}")
+        return None
+
+
+def file_name(url: str) -> str:
+    """Name of the file a URL points to"""
+    return unquote(os.path.basename(urlparse(url).path.rstrip("/")))
+
+
+def list_directory(url: str, years: Optional[Sequence[str]] = None,
+                   suffixes: Tuple[str, ...] = FILE_SUFFIXES) -> List[str]:
+    """
+    List the files of a directory index page and of its subdirectories.
+
+    Args:
+        url: URL of the directory (ending with "/")
+        years: Only descend into the year directories (e.g. "2024") in this list
+        suffixes: Extensions of the files to list
+
+    Returns:
+        Sorted list of file URLs
+    """
+    soup = fetch_and_parse_page_content(url)
+    if soup is None:
+        return []
+
+    files = []
+    for link in soup.select("a[href]"):
+        target = urljoin(url, link["href"])
+        # Skip the parent directory, sort links and other sites
+        if not target.startswith(url) or target == url or "?" in target:
+            continue
+        name = file_name(target)
+        if target.endswith("/"):
+            if years and name.isdigit() and name not in years:
+                continue
+            files.extend(list_directory(target, years, suffixes))
+        elif name.lower().endswith(suffixes):
+            files.append(target)
+
+    return sorted(set(files))
+
+
+def iter_remote_csvs(url: str) -> Iterator[Tuple[str, io.BufferedReader]]:
+    """
+    Stream the CSV files of a remote ZIP (or a remote CSV itself).
+
+    Args:
+        url: URL of a .zip or .csv file
+
+    Yields:
+        (CSV name, binary stream of its content); each stream must be read before the next one
+    """
+    with requests.get(url, stream=True, timeout=REQUEST_TIMEOUT) as response:
+        response.raise_for_status()
+        chunks = response.iter_content(CHUNK_SIZE)
+        if not file_name(url).lower().endswith(".zip"):
+            yield file_name(url), IterStream.open(chunks)
+            return
+        for name, member in iter_zip_members(chunks):
+            if name.lower().endswith(".csv"):
+                yield os.path.basename(name), IterStream.open(member)
+
+
+def _stream_file(url: str, output: "queue.Queue", stop: threading.Event) -> int:
+    """Parse the CSVs of a remote file into the output queue; returns the row count"""
+    rows = 0
+    for name, stream in iter_remote_csvs(url):
+        for batch in read_accounting_stream(stream):
+            rows += batch.num_rows
+            while not stop.is_set():
+                try:
+                    output.put(batch, timeout=1)
+                    break
+                except queue.Full:
+                    continue
+            if stop.is_set():
+                return rows
+        logger.info(f"Parsed {name} from {file_name(url)}")
+    return rows
+
+
+def stream_accounting_batches(urls: List[str], workers: int = 4) -> Iterator[pa.Table]:
+    """
+    Download accounting files concurrently and parse them while they download.
+
+    Batches of different files are interleaved. A failed download raises, so a
+    quarter is never ingested partially.
+
+    Args:
+        urls: URLs of the quarterly ZIP (or CSV) files
+        workers: Concurrent downloads
+
+    Yields:
+        Tables with the schema of accounting_reader.ACCOUNTING_SCHEMA
+    """
+    output: "queue.Queue" = queue.Queue(maxsize=QUEUE_BATCHES * workers)
+    stop = threading.Event()
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fetcher") as executor:
+        futures = [executor.submit(_stream_file, url, output, stop) for url in urls]
+        try:
+            while True:
+                try:
+                    yield output.get(timeout=0.1)
+                except queue.Empty:
+                    for future in futures:
+                        if future.done():
+                            future.result()  # Raise the error of a failed download
+                    if all(future.done() for future in futures) and output.empty():
+                        break
+        finally:
+            stop.set()
+
+
+def ingest_remote(urls: List[str], root: str = STORE_DIR, workers: int = 4) -> List[str]:
+    """
+    Stream remote accounting files into the columnar store.
+
+    Args:
+        urls: URLs of the quarterly ZIP (or CSV) files
+        root: Directory of the store
+        workers: Concurrent downloads
+
+    Returns:
+        Labels of the written partitions
+    """
+    return AccountingStore(root).ingest(stream_accounting_batches(urls, workers))
+
+
+def download_file(url: str, output_dir: str) -> List[str]:
+    """
+    Save the CSVs of a remote ZIP (or a remote CSV) into a directory.
+
+    Each file is written under a temporary name and renamed once complete.
+
+    Args:
+        url: URL of a .zip or .csv file
+        output_dir: Directory of the CSV files
+
+    Returns:
+        Paths of the saved files
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    saved = []
+    for name, stream in iter_remote_csvs(url):
+        path = os.path.join(output_dir, name)
+        with open(path + ".part", "wb") as f:
+            while True:
+                block = stream.read(CHUNK_SIZE)
+                if not block:
+                    break
+                f.write(block)
+        os.replace(path + ".part", path)
+        saved.append(path)
+    return saved
+
+
+def download_files(urls: List[str], output_dir: str, workers: int = 4) -> List[str]:
+    """
+    Save the CSVs of remote files concurrently.
+
+    Args:
+        urls: URLs of the ZIP or CSV files
+        output_dir: Directory of the CSV files
+        workers: Concurrent downloads
+
+    Returns:
+        Paths of the saved files (failed downloads are logged and skipped)
+    """
+    saved = []
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fetcher") as executor:
+        futures = {executor.submit(download_file, url, output_dir): url for url in urls}
+        for future, url in futures.items():
+            try:
+                saved.extend(future.result())
+            except (requests.exceptions.RequestException, ValueError, OSError) as e:
+                logger.error(f"Failed to download {url}: {e}")
+    return saved
+
+
+def main() -> int:
+    """
+    Main function to list, ingest or download the open data files.
+
+    Returns:
+        Exit code (0 for success, non-zero for error)
+    """
+    # Options of every command, so they follow the command name ("ingest --years 2023")
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--base-url", default=BASE_URL, help="Root of the open data directories")
+    common.add_argument("--dataset", choices=sorted(DATASETS), default="demonstracoes_contabeis",
+                        help="Directory of the files")
+    common.add_argument("--years", nargs="*", help="Only the files of these years")
+    common.add_argument("--workers", type=int, default=4, help="Concurrent downloads")
+
+    parser = argparse.ArgumentParser(description="Fetch the ANS open data files")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("list", parents=[common], help="List the files of the dataset")
+    ingest = commands.add_parser("ingest", parents=[common],
+                                 help="Stream the accounting files into the columnar store")
+    ingest.add_argument("--store-dir", default=STORE_DIR, help="Directory of the store")
+    download = commands.add_parser("download", parents=[common], help="Save the CSV files of the dataset")
+    download.add_argument("--output-dir", default=".", help="Directory of the CSV files")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+                        force=True)
+
+    urls = list_directory(urljoin(args.base_url, DATASETS[args.dataset]), args.years)
+    if not urls:
+        logger.error(f"No files found for {args.dataset}")
+        return 1
+
+    if args.command == "list":
+        for url in urls:
+            print(url)
+        return 0
+
+    began = time.perf_counter()
+    if args.command == "download":
+        saved = download_files(urls, args.output_dir, args.workers)
+        logger.info(f"Saved {len(saved)} files in {time.perf_counter() - began:.1f}s")
+        return 0 if saved else 1
+
+    try:
+        partitions = ingest_remote(urls, args.store_dir, args.workers)
+    except (requests.exceptions.RequestException, ValueError, pa.ArrowException) as e:
+        logger.error(f"Ingestion failed: {e}")
+        return 1
+    logger.info(f"Wrote partitions {', '.join(partitions)} from {len(urls)} files "
+                f"in {time.perf_counter() - began:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
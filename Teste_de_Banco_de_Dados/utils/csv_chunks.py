@@ -0,0 +1,126 @@
+"""
+CSV Chunking
+
+This module splits large delimited files into byte ranges that start and end on
+line boundaries, so the ranges can be read, parsed and loaded independently by
+parallel workers. It also detects the encoding ANS used for a file.
+
+The ranges assume records do not contain line breaks inside quoted fields, which
+holds for the ANS open data files.
+
+Usage:
+    from utils.csv_chunks import split_byte_ranges, read_byte_range
+
+    for start, end in split_byte_ranges("1T2024.csv", 32 * 1024 * 1024):
+        data = b"".join(read_byte_range("1T2024.csv", start, end))
+"""
+
+import os
+import glob
+from typing import Iterator, List, Tuple
+
+# Bytes read per block
+READ_BLOCK = 1024 * 1024
+# Bytes sampled to detect the encoding of a file
+ENCODING_SAMPLE = 4 * 1024 * 1024
+
+
+def find_csv_files(source: str) -> List[str]:
+    """
+    List the CSV files of a directory or matched by a glob pattern.
+
+    Args:
+        source: Directory (all *.csv inside it) or glob pattern
+
+    Returns:
+        Sorted list of CSV paths
+    """
+    if os.path.isdir(source):
+        source = os.path.join(source, "*.csv")
+    return sorted(path for path in glob.glob(source) if path.lower().endswith(".csv") and os.path.isfile(path))
+
+
+def detect_encoding(path: str) -> str:
+    """
+    Detect whether a file is UTF-8 or latin-1 (ANS has published both).
+
+    Args:
+        path: Path to the file
+
+    Returns:
+        "utf-8" or "latin-1"
+    """
+    with open(path, "rb") as f:
+        return detect_sample_encoding(f.read(ENCODING_SAMPLE))
+
+
+def detect_sample_encoding(sample: bytes) -> str:
+    """
+    Detect whether the first bytes of a file are UTF-8 or latin-1.
+
+    Args:
+        sample: Leading bytes of the file (e.g. peeked from a stream)
+
+    Returns:
+        "utf-8" or "latin-1"
+    """
+    try:
+        sample.decode("utf-8")
+    except UnicodeDecodeError as e:
+        # A multi-byte character cut at the end of the sample is not an error
+        if e.start < len(sample) - 3:
+            return "latin-1"
+    return "utf-8"
+
+
+def split_byte_ranges(path: str, chunk_bytes: int) -> List[Tuple[int, int]]:
+    """
+    Split a CSV file into byte ranges of whole lines, skipping the header line.
+
+    Args:
+        path: Path to the CSV file
+        chunk_bytes: Approximate size of each range
+
+    Returns:
+        List of (start, end) offsets covering every data line once
+    """
+    size = os.path.getsize(path)
+    ranges = []
+
+    with open(path, "rb") as f:
+        first_line = f.readline()
+        start = f.tell() if b"DATA" in first_line.upper() else 0
+
+        while start < size:
+            f.seek(min(start + chunk_bytes, size))
+            if f.tell() < size:
+                f.readline()  # Move the end to the next line boundary
+            end = f.tell()
+            ranges.append((start, end))
+            start = end
+
+    return ranges
+
+
+def read_byte_range(path: str, start: int, end: int, block_size: int = READ_BLOCK) -> Iterator[bytes]:
+    """
+    Read a byte range of a file in blocks.
+
+    Args:
+        path: Path to the file
+        start: First byte
+        end: End offset (exclusive)
+        block_size: Bytes per block
+
+    Yields:
+        Blocks of the range
+    """
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            block = f.read(min(block_size, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+            yield block
@@ -0,0 +1,185 @@
+"""
+Streaming ZIP Reader
+
+This module decompresses the members of a ZIP archive while it is still being
+downloaded. The archive is read front to back through the local file headers, so
+neither the archive nor its members ever need to be written to disk or held whole
+in memory (zipfile needs a seekable file, since it starts from the central
+directory at the end).
+
+Stored and deflated members are supported, including members whose sizes follow
+the data (data descriptors) and ZIP64 sizes. The CRC of every member is checked.
+
+Usage:
+    from utils.zip_stream import iter_zip_members, IterStream
+
+    response = requests.get(url, stream=True)
+    for name, chunks in iter_zip_members(response.iter_content(1 << 20)):
+        stream = IterStream.open(chunks)
+        ...  # read the member like a file; it must be read before the next one
+"""
+
+import io
+import zlib
+import struct
+from typing import Iterable, Iterator, Optional, Tuple
+
+LOCAL_HEADER_SIGNATURE = 0x04034B50
+DATA_DESCRIPTOR_SIGNATURE = 0x08074B50
+# Fields after the signature: version, flags, method, time, date, crc, sizes, name and extra lengths
+LOCAL_HEADER = struct.Struct("<HHHHHIIIHH")
+
+METHOD_STORED = 0
+METHOD_DEFLATED = 8
+FLAG_DATA_DESCRIPTOR = 0x08
+FLAG_UTF8 = 0x800
+ZIP64_EXTRA_ID = 0x0001
+ZIP64_LIMIT = 0xFFFFFFFF
+
+READ_SIZE = 1024 * 1024
+
+
+class _ChunkReader:
+    """Reads exact byte counts from an iterator of chunks, with push back"""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._buffer = b""
+
+    def read_some(self, size: int = READ_SIZE) -> bytes:
+        """Up to size bytes (empty at the end of the stream)"""
+        if not self._buffer:
+            self._buffer = next(self._chunks, b"")
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+    def read_exact(self, size: int) -> bytes:
+        """Exactly size bytes (fewer only at the end of the stream)"""
+        parts = []
+        while size > 0:
+            data = self.read_some(size)
+            if not data:
+                break
+            parts.append(data)
+            size -= len(data)
+        return b"".join(parts)
+
+    def unread(self, data: bytes) -> None:
+        """Push data back to be read again"""
+        self._buffer = data + self._buffer
+
+
+def _zip64_sizes(extra: bytes, compressed: int, uncompressed: int) -> Tuple[int, int, bool]:
+    """Read the 64-bit sizes of the ZIP64 extra field, when the header sizes overflow"""
+    offset = 0
+    while offset + 4 <= len(extra):
+        header_id, size = struct.unpack_from("<HH", extra, offset)
+        if header_id == ZIP64_EXTRA_ID:
+            values = list(struct.unpack_from(f"<{size // 8}Q", extra, offset + 4))
+            if uncompressed == ZIP64_LIMIT and values:
+                uncompressed = values.pop(0)
+            if compressed == ZIP64_LIMIT and values:
+                compressed = values.pop(0)
+            return compressed, uncompressed, True
+        offset += 4 + size
+    return compressed, uncompressed, False
+
+
+def _member_chunks(reader: _ChunkReader, name: str, flags: int, method: int, crc: int,
+                   compressed_size: int, zip64: bool) -> Iterator[bytes]:
+    """Decompressed chunks of the member starting at the reader position"""
+    has_descriptor = bool(flags & FLAG_DATA_DESCRIPTOR)
+    checksum = 0
+
+    if method == METHOD_DEFLATED:
+        decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+        while not decompressor.eof:
+            data = reader.read_some()
+            if not data:
+                raise ValueError(f"Truncated ZIP member {name}")
+            chunk = decompressor.decompress(data)
+            if decompressor.eof:
+                reader.unread(decompressor.unused_data)
+            if chunk:
+                checksum = zlib.crc32(chunk, checksum)
+                yield chunk
+    elif method == METHOD_STORED and (not has_descriptor or name.endswith("/")):
+        remaining = 0 if name.endswith("/") else compressed_size  # Directories have no data
+        while remaining > 0:
+            chunk = reader.read_some(min(READ_SIZE, remaining))
+            if not chunk:
+                raise ValueError(f"Truncated ZIP member {name}")
+            remaining -= len(chunk)
+            checksum = zlib.crc32(chunk, checksum)
+            yield chunk
+    else:
+        raise ValueError(f"Unsupported compression of ZIP member {name} (method {method}, flags {flags:#x})")
+
+    if has_descriptor:
+        signature = reader.read_exact(4)
+        if struct.unpack("<I", signature)[0] != DATA_DESCRIPTOR_SIGNATURE:
+            reader.unread(signature)  # The descriptor signature is optional
+        crc = struct.unpack("<I", reader.read_exact(4))[0]
+        reader.read_exact(16 if zip64 else 8)  # Sizes
+
+    if checksum != crc:
+        raise ValueError(f"CRC mismatch in ZIP member {name}")
+
+
+def iter_zip_members(chunks: Iterable[bytes]) -> Iterator[Tuple[str, Iterator[bytes]]]:
+    """
+    Iterate over the members of a ZIP archive given as a stream of chunks.
+
+    Each member must be consumed before moving to the next one; what is left of a
+    member is skipped (and still checked).
+
+    Args:
+        chunks: The archive bytes, in order (e.g. response.iter_content())
+
+    Yields:
+        (member name, iterator of its decompressed chunks); directories are skipped
+    """
+    reader = _ChunkReader(chunks)
+    while True:
+        signature = reader.read_exact(4)
+        if len(signature) < 4 or struct.unpack("<I", signature)[0] != LOCAL_HEADER_SIGNATURE:
+            return  # Central directory (or end of the stream) reached
+
+        header = reader.read_exact(LOCAL_HEADER.size)
+        _, flags, method, _, _, crc, compressed, uncompressed, name_length, extra_length = LOCAL_HEADER.unpack(header)
+        raw_name = reader.read_exact(name_length)
+        name = raw_name.decode("utf-8" if flags & FLAG_UTF8 else "cp437")
+        compressed, uncompressed, zip64 = _zip64_sizes(reader.read_exact(extra_length), compressed, uncompressed)
+
+        member = _member_chunks(reader, name, flags, method, crc, compressed, zip64)
+        if not name.endswith("/"):
+            yield name, member
+        for _ in member:  # Skip the rest of the member
+            pass
+
+
+class IterStream(io.RawIOBase):
+    """Read-only binary file over an iterator of chunks"""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._pending = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._pending:
+            self._pending = next(self._chunks, None)
+            if self._pending is None:
+                self._pending = b""
+                return 0
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+    @classmethod
+    def open(cls, chunks: Iterable[bytes], buffer_size: Optional[int] = READ_SIZE) -> io.BufferedReader:
+        """Buffered file over the chunks (supports peek)"""
+        return io.BufferedReader(cls(chunks), buffer_size=buffer_size)
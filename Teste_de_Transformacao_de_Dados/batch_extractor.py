@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+Batch PDF Table Extraction
+
+This tool extracts the tables of many PDFs (the annexes downloaded by the scraper,
+historical Rol versions, ...) and writes one combined output per document plus a
+manifest (`manifest.json`) describing every document of the batch.
+
+Work is scheduled on a single process pool in two steps per document:
+    1. extraction: the pages are split into chunks; each chunk task extracts its pages
+       and saves them to the checkpoint store (see utils.extraction_checkpoint)
+    2. output: once all chunks of a document are done, one task loads its pages from
+       the checkpoint store, expands abbreviations, standardizes types and writes the
+       combined output
+
+Chunks of different documents share the pool, so one long annex does not leave the
+other workers idle. Tasks are only started while their estimated memory fits in the
+memory budget, and a batch that is interrupted resumes from the checkpoints.
+
+Usage:
+    python batch_extractor.py "downloads/*.pdf" --output-dir csv_batch --workers 4 --memory-budget-mb 4096
+
+Author: Vitor Oliveira
+Date: 2025-03-26
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import logging
+import argparse
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Dict, List
+
+# Try to set up JVM first if the module exists
+try:
+    from utils.jvm_setup import setup_jvm
+    setup_jvm()
+except ImportError:
+    print("JVM setup module not found. Continuing without explicit JVM configuration.")
+
+from table_extractor import extract_tables_from_pdf, get_pdf_metadata, parse_page_range, chunk_pages
+from extraction_backends import get_backend
+from utils.extraction_checkpoint import CheckpointStore
+from utils.pdf_analysis import analyze_pdf
+from utils.table_processing import clean_tables, iter_combined_tables, save_tables, SchemaCache, schema_cache_path
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = "manifest.json"
+
+# Memory estimate of a task: a fixed cost per worker plus a cost per page it holds
+TASK_BASE_MB = 200
+PAGE_MB = 2
+
+
+def find_pdfs(source: str) -> List[str]:
+    """
+    List the PDFs of a directory or matched by a glob pattern.
+
+    Args:
+        source: Directory (all *.pdf inside it) or glob pattern
+
+    Returns:
+        Sorted list of PDF paths
+    """
+    if os.path.isdir(source):
+        source = os.path.join(source, "*.pdf")
+    return sorted(path for path in glob.glob(source) if path.lower().endswith(".pdf") and os.path.isfile(path))
+
+
+def estimate_task_mb(pages: int) -> int:
+    """Estimated peak memory (MB) of a task that holds the tables of `pages` pages"""
+    return TASK_BASE_MB + PAGE_MB * pages
+
+
+def _init_worker(backend: str) -> None:
+    """Start the extraction backend once per worker process (e.g. a warm JVM)"""
+    get_backend(backend).start()
+
+
+def _extract_chunk(pdf: str, pages: List[int], settings: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Extract a chunk of pages into the checkpoint store (runs in a worker process).
+
+    Args:
+        pdf: Path to the PDF file
+        pages: Page numbers of the chunk
+        settings: Batch settings (see run_batch)
+
+    Returns:
+        Dictionary with 'pages', 'tables' and 'seconds'
+    """
+    start = time.perf_counter()
+    tables = extract_tables_from_pdf(
+        pdf,
+        pages=pages,
+        lattice=settings['lattice'],
+        guess=settings['guess'],
+        backend=settings['backend'],
+        classify_pages=settings['classify_pages'],
+        checkpoint=CheckpointStore(settings['checkpoint_dir'])
+    )
+    return {'pages': len(pages), 'tables': len(tables), 'seconds': time.perf_counter() - start}
+
+
+def _write_document(pdf: str, pages: List[int], settings: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Process the extracted pages of a document and write its output (runs in a worker process).
+
+    Args:
+        pdf: Path to the PDF file
+        pages: Page numbers of the document
+        settings: Batch settings (see run_batch)
+
+    Returns:
+        Statistics of the output file (see TableWriter.close) plus 'seconds', or an 'error'
+    """
+    start = time.perf_counter()
+    # Every chunk is in the checkpoint store by now: read them back as they were extracted
+    # (backends without per-page results store whole chunks), so nothing is extracted again
+    tables = []
+    for chunk in chunk_pages(pages, settings['pages_per_chunk']):
+        tables.extend(extract_tables_from_pdf(
+            pdf,
+            pages=chunk,
+            lattice=settings['lattice'],
+            guess=settings['guess'],
+            backend=settings['backend'],
+            classify_pages=settings['classify_pages'],
+            checkpoint=CheckpointStore(settings['checkpoint_dir'])
+        ))
+    if not tables:
+        return {'error': "No tables found", 'seconds': time.perf_counter() - start}
+
+    schema_cache = SchemaCache(schema_cache_path(pdf), analyze_pdf(pdf)['sha256'])
+    base_filename = os.path.splitext(os.path.basename(pdf))[0]
+    saved = save_tables(
+        iter_combined_tables(clean_tables(tables, schema_cache)),
+        settings['output_dir'],
+        base_filename,
+        output_format=settings['output_format']
+    )
+    schema_cache.save()
+
+    if not saved:
+        return {'error': "Output was not written", 'seconds': time.perf_counter() - start}
+    return {**saved[0], 'seconds': time.perf_counter() - start}
+
+
+def _write_manifest(output_dir: str, manifest: Dict[str, Any]) -> str:
+    """Atomically write the batch manifest"""
+    path = os.path.join(output_dir, MANIFEST_FILENAME)
+    fd, temp_path = tempfile.mkstemp(dir=output_dir, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, path)
+    return path
+
+
+def run_batch(
+        pdfs: List[str],
+        output_dir: str,
+        workers: int = 1,
+        memory_budget_mb: int = 4096,
+        pages_per_chunk: int = 25,
+        start_page: int = 1,
+        backend: str = "jpype",
+        extraction_method: str = "both",
+        output_format: str = "csv",
+        checkpoint_dir: str = "checkpoints"
+) -> Dict[str, Any]:
+    """
+    Extract the tables of many PDFs and write one output per document plus a manifest.
+
+    Args:
+        pdfs: PDF files to process
+        output_dir: Directory of the outputs and of the manifest
+        workers: Number of worker processes
+        memory_budget_mb: Estimated memory allowed for the running tasks; a task that
+            does not fit waits for others to finish (one task always runs)
+        pages_per_chunk: Pages extracted by each extraction task
+        start_page: First page extracted from every document
+        backend: Extraction backend (see extraction_backends)
+        extraction_method: "lattice", "stream", "both" or "auto" (chosen per page)
+        output_format: "csv", "parquet" or "arrow"
+        checkpoint_dir: Directory of the per-page checkpoint store
+
+    Returns:
+        The manifest: batch settings, totals and one entry per document
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    batch_start = time.perf_counter()
+
+    settings = {
+        'output_dir': os.path.abspath(output_dir),
+        'checkpoint_dir': os.path.abspath(checkpoint_dir),
+        'backend': backend,
+        'lattice': extraction_method in ['lattice', 'both'],
+        'guess': extraction_method in ['stream', 'both'],
+        'classify_pages': extraction_method == 'auto',
+        'output_format': output_format,
+        'pages_per_chunk': pages_per_chunk,
+    }
+
+    # Plan the documents and their extraction chunks
+    documents: Dict[str, Dict[str, Any]] = {}
+    queue = []
+    for pdf in pdfs:
+        page_count = get_pdf_metadata(pdf)['page_count']
+        pages = parse_page_range(f"{start_page}-{page_count}", page_count) if page_count >= start_page else []
+        documents[pdf] = {
+            'pdf': pdf,
+            'pages': pages,
+            'pending_chunks': 0,
+            'extraction_seconds': 0.0,
+            'started': None,
+            'result': {'error': "No pages to extract"} if not pages else None,
+        }
+        for chunk in chunk_pages(pages, pages_per_chunk):
+            documents[pdf]['pending_chunks'] += 1
+            queue.append(('extract', pdf, chunk))
+
+    logger.info(f"Batch of {len(documents)} documents in {len(queue)} extraction chunks "
+                f"with {workers} workers and a {memory_budget_mb} MB memory budget")
+
+    running: Dict[Any, Any] = {}
+    used_mb = 0
+
+    with ProcessPoolExecutor(max_workers=workers,
+                             mp_context=multiprocessing.get_context("spawn"),
+                             initializer=_init_worker,
+                             initargs=(backend,)) as executor:
+        while queue or running:
+            # Start queued tasks while they fit in the memory budget
+            while queue and len(running) < workers:
+                kind, pdf, pages = queue[0]
+                cost = estimate_task_mb(len(pages))
+                if running and used_mb + cost > memory_budget_mb:
+                    break
+                queue.pop(0)
+
+                document = documents[pdf]
+                if document['started'] is None:
+                    document['started'] = time.perf_counter()
+                function = _extract_chunk if kind == 'extract' else _write_document
+                running[executor.submit(function, pdf, pages, settings)] = (kind, pdf, pages, cost)
+                used_mb += cost
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                kind, pdf, pages, cost = running.pop(future)
+                used_mb -= cost
+                document = documents[pdf]
+
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.error(f"{kind} task of {pdf} failed: {e}")
+                    # Extraction errors are raised by extract_tables_from_pdf, so the manifest
+                    # tells a failed chunk from one without tables
+                    result = {'error': f"pages {pages[0]}-{pages[-1]}: {e}" if kind == 'extract' else str(e)}
+
+                if kind == 'extract':
+                    document['pending_chunks'] -= 1
+                    if 'error' in result:
+                        document['result'] = result
+                    else:
+                        document['extraction_seconds'] += result['seconds']
+
+                    if document['pending_chunks'] == 0 and document['result'] is None:
+                        # Output tasks go first, so finished documents release their pages
+                        queue.insert(0, ('write', pdf, document['pages']))
+                    elif document['pending_chunks'] == 0:
+                        # A chunk failed, so no output task follows: the document ends here
+                        document['seconds'] = time.perf_counter() - document['started']
+                        logger.info(f"Failed {pdf} after {document['seconds']:.2f}s")
+                else:
+                    document['result'] = result
+                    document['seconds'] = time.perf_counter() - document['started']
+                    logger.info(f"Finished {pdf} in {document['seconds']:.2f}s")
+
+    entries = []
+    for document in documents.values():
+        result = document['result'] or {}
+        entries.append({
+            'pdf': document['pdf'],
+            'status': 'error' if 'error' in result else 'ok',
+            'error': result.get('error'),
+            'output': result.get('path'),
+            'pages': len(document['pages']),
+            'rows': result.get('rows', 0),
+            'columns': result.get('columns', 0),
+            'bytes': result.get('bytes', 0),
+            'extraction_seconds': round(document['extraction_seconds'], 3),
+            'output_seconds': round(result.get('seconds', 0.0), 3),
+            'wall_seconds': round(document.get('seconds', 0.0), 3),
+        })
+
+    manifest = {
+        'created_at': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'settings': {**settings, 'workers': workers, 'memory_budget_mb': memory_budget_mb,
+                     'start_page': start_page},
+        'documents': entries,
+        'total_documents': len(entries),
+        'failed_documents': sum(1 for entry in entries if entry['status'] != 'ok'),
+        'total_rows': sum(entry['rows'] for entry in entries),
+        'seconds': round(time.perf_counter() - batch_start, 3),
+    }
+    manifest_path = _write_manifest(output_dir, manifest)
+    logger.info(f"Batch finished in {manifest['seconds']:.2f}s, manifest written to {manifest_path}")
+    return manifest
+
+
+def main() -> int:
+    """
+    Command line entry point of the batch mode.
+
+    Returns:
+        Exit code (0 if every document was processed, 1 otherwise)
+    """
+    parser = argparse.ArgumentParser(description="Extract the tables of many PDFs")
+    parser.add_argument("source", help="Directory of PDFs or glob pattern, e.g. 'downloads/*.pdf'")
+    parser.add_argument("--output-dir", default="csv_batch", help="Directory of the outputs and manifest")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--memory-budget-mb", type=int, default=4096, help="Memory budget of running tasks")
+    parser.add_argument("--pages-per-chunk", type=int, default=25, help="Pages per extraction task")
+    parser.add_argument("--start-page", type=int, default=1, help="First page extracted from each PDF")
+    parser.add_argument("--backend", default="jpype", help="Extraction backend: jpype, subprocess or python")
+    parser.add_argument("--method", default="both", choices=["lattice", "stream", "both", "auto"],
+                        help="Extraction method")
+    parser.add_argument("--format", default="csv", choices=["csv", "parquet", "arrow"], help="Output format")
+    parser.add_argument("--checkpoint-dir", default="checkpoints", help="Per-page checkpoint directory")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s", force=True)
+
+    pdfs = find_pdfs(args.source)
+    if not pdfs:
+        logger.error(f"No PDF files found in {args.source}")
+        return 1
+
+    manifest = run_batch(
+        pdfs,
+        args.output_dir,
+        workers=args.workers,
+        memory_budget_mb=args.memory_budget_mb,
+        pages_per_chunk=args.pages_per_chunk,
+        start_page=args.start_page,
+        backend=args.backend,
+        extraction_method=args.method,
+        output_format=args.format,
+        checkpoint_dir=args.checkpoint_dir
+    )
+
+    for entry in manifest['documents']:
+        logger.info(f"{os.path.basename(entry['pdf'])}: {entry['status']}, {entry['rows']} rows, "
+                    f"extraction {entry['extraction_seconds']:.2f}s, output {entry['output_seconds']:.2f}s, "
+                    f"wall {entry['wall_seconds']:.2f}s")
+
+    return 0 if manifest['failed_documents'] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Abbreviation Expansion Benchmark
+
+This script compares the previous expand_abbreviations loop (one regex replace per
+column and abbreviation) with the compiled single-pass expander, on a synthetic table
+shaped like the Rol annex: a free-text procedure column and several low-cardinality
+coverage columns. It reports the time of each approach with the default map and with
+the full map (HCO, HSO, REF, PAC, DUT enabled), and checks that both produce the same
+values.
+
+Usage:
+    python benchmarks/benchmark_abbreviations.py --rows 200000
+
+Author: Vitor Oliveira
+Date: 2025-03-26
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.table_processing import expand_abbreviations  # noqa: E402
+from utils.table_processing.abbreviations import DEFAULT_ABBREVIATIONS  # noqa: E402
+
+FULL_ABBREVIATIONS = {
+    **DEFAULT_ABBREVIATIONS,
+    'HCO': 'HOSPITALAR COM OBSTETRÍCIA',
+    'HSO': 'HOSPITALAR SEM OBSTETRÍCIA',
+    'REF': 'REFERÊNCIA',
+    'PAC': 'PRECEDIMENTO DE ALTA COMPLEXIDADE',
+    'DUT': 'DIRETRIZ DE UTILIZAÇÃO'
+}
+
+
+def make_table(rows: int) -> pd.DataFrame:
+    """Build a table with one free-text column and several coverage columns"""
+    rng = np.random.default_rng(0)
+    words = np.array(["CONSULTA", "EXAME", "OD", "AMB", "HCO", "REF", "CIRURGIA", "PAC", "TERAPIA", "DUT"])
+    procedures = [" ".join(rng.choice(words, 4)) + f" {i}" for i in range(rows)]
+    table = pd.DataFrame({"PROCEDIMENTO": procedures})
+    for column in ("OD", "AMB", "HCO", "HSO", "REF", "PAC", "DUT"):
+        table[column] = rng.choice(np.array([column, None, f"{column} / AMB"], dtype=object), rows)
+    table["SUBGRUPO"] = rng.choice(np.array(["EXAMES OD", "PROCEDIMENTOS AMB", "OUTROS"]), rows)
+    return table
+
+
+def expand_abbreviations_loop(df: pd.DataFrame, abbreviation_map: dict) -> pd.DataFrame:
+    """Previous implementation: one regex replace per text column and abbreviation"""
+    result_df = df.rename(columns={col: abbreviation_map[col] for col in df.columns if col in abbreviation_map})
+    for col in result_df.columns:
+        if result_df[col].dtype == object:
+            non_nan_mask = result_df[col].notna()
+            if non_nan_mask.any():
+                for abbr, expanded in abbreviation_map.items():
+                    result_df.loc[non_nan_mask, col] = result_df.loc[non_nan_mask, col].astype(str).str.replace(
+                        r'\b' + abbr + r'\b', expanded, regex=True)
+    return result_df
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark abbreviation expansion")
+    parser.add_argument("--rows", type=int, default=200000, help="Rows of the synthetic table")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.ERROR)
+
+    table = make_table(args.rows)
+    all_same = True
+    for name, mapping in (("default map", DEFAULT_ABBREVIATIONS), ("full map", FULL_ABBREVIATIONS)):
+        start = time.perf_counter()
+        loop_result = expand_abbreviations_loop(table, mapping)
+        loop_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = expand_abbreviations(table, mapping)
+        compiled_time = time.perf_counter() - start
+
+        same = loop_result.equals(result)
+        all_same = all_same and same
+        print(f"{name:<12} loop {loop_time:>8.2f}s  compiled {compiled_time:>8.2f}s  "
+              f"({loop_time / compiled_time:.1f}x)  same values: {same}")
+
+    return 0 if all_same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Extraction Backend Benchmark
+
+This script extracts the same pages with each table extraction backend and compares
+speed and output. Agreement is measured against the first backend listed: the share
+of its non-empty cells that the other backend returns with the same value at the same
+position (tables matched in order).
+
+Usage:
+    python benchmarks/benchmark_backends.py Anexo_1.pdf --pages 3-50 --backends jpype python
+
+Author: Vitor Oliveira
+Date: 2025-03-26
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+from typing import List, Tuple
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.jvm_setup import setup_jvm  # noqa: E402
+setup_jvm()
+
+from extraction_backends import BACKEND_NAMES  # noqa: E402
+from table_extractor import extract_tables_from_pdf  # noqa: E402
+
+
+def normalize(value) -> str:
+    """Normalize a cell value for comparison (whitespace and missing values)"""
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return ""
+    return " ".join(str(value).split())
+
+
+def table_cells(table: pd.DataFrame) -> List[List[str]]:
+    """Return the header and the rows of a table as normalized strings"""
+    header = [normalize("" if str(col).startswith("Unnamed") else col) for col in table.columns]
+    return [header] + [[normalize(value) for value in row] for row in table.itertuples(index=False)]
+
+
+def cell_agreement(reference: List[pd.DataFrame], candidate: List[pd.DataFrame]) -> Tuple[int, int]:
+    """
+    Count the non-empty reference cells that the candidate reproduces.
+
+    Args:
+        reference: Tables of the reference backend
+        candidate: Tables of the compared backend
+
+    Returns:
+        Tuple (matched cells, non-empty reference cells)
+    """
+    matched = total = 0
+    for index, table in enumerate(reference):
+        ref_cells = table_cells(table)
+        cand_cells = table_cells(candidate[index]) if index < len(candidate) else []
+        for r, row in enumerate(ref_cells):
+            for c, value in enumerate(row):
+                if not value:
+                    continue
+                total += 1
+                if r < len(cand_cells) and c < len(cand_cells[r]) and cand_cells[r][c] == value:
+                    matched += 1
+    return matched, total
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark table extraction backends")
+    parser.add_argument("pdf", help="PDF file to extract tables from")
+    parser.add_argument("--pages", default="all", help="Page selection, e.g. 3-50")
+    parser.add_argument("--backends", nargs="+", default=["jpype", "python"], choices=BACKEND_NAMES,
+                        help="Backends to compare, the first one is the reference")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    results = []
+    for backend in args.backends:
+        start = time.perf_counter()
+        tables = extract_tables_from_pdf(args.pdf, pages=args.pages, backend=backend, classify_pages=True)
+        elapsed = time.perf_counter() - start
+        results.append((backend, elapsed, tables))
+        print(f"{backend:<10} {elapsed:>9.2f}s  tables {len(tables):>5}  rows {sum(len(t) for t in tables):>8}")
+
+    reference_name, reference_time, reference_tables = results[0]
+    for backend, elapsed, tables in results[1:]:
+        matched, total = cell_agreement(reference_tables, tables)
+        print(f"{backend} vs {reference_name}: speedup {reference_time / elapsed:.2f}x, "
+              f"cell agreement {matched / total if total else 1.0:.1%} ({matched}/{total})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+JVM Session Benchmark
+
+This script compares the cost of calling tabula page by page with a fresh `java -jar`
+subprocess per call against a single in-process JVM kept warm through JPype.
+It reports the one-time JVM startup cost and the average per-page cost of each mode.
+
+The in-process mode runs first: once tabula-py has used subprocess mode it keeps
+using it for the rest of the process.
+
+Usage:
+    python benchmarks/benchmark_jvm_session.py Anexo_1.pdf --pages 3-22
+
+Author: Vitor Oliveira
+Date: 2025-03-26
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.jvm_setup import setup_jvm  # noqa: E402
+setup_jvm()
+
+from table_extractor import get_pdf_metadata, parse_page_range  # noqa: E402
+from utils.tabula_session import TabulaSession, BACKEND_JPYPE, BACKEND_SUBPROCESS  # noqa: E402
+
+
+def time_pages(session: TabulaSession, pdf: str, pages: List[int]) -> float:
+    """
+    Extract each page with a separate call and return the total elapsed time.
+
+    Args:
+        session: Session used for the calls
+        pdf: Path to the PDF file
+        pages: Pages to extract, one call per page
+
+    Returns:
+        Total elapsed seconds
+    """
+    start = time.perf_counter()
+    for page in pages:
+        session.read_pdf(pdf, pages=page, lattice=True, multiple_tables=True)
+    return time.perf_counter() - start
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark tabula JVM startup versus per-page cost")
+    parser.add_argument("pdf", help="PDF file to extract tables from")
+    parser.add_argument("--pages", default="1-10", help="Page selection, e.g. 3-22")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    pages = parse_page_range(args.pages, get_pdf_metadata(args.pdf)['page_count'])
+    if not pages:
+        print("No pages selected")
+        return 1
+
+    jpype_session = TabulaSession(BACKEND_JPYPE)
+    backend = jpype_session.start()
+    if backend != BACKEND_JPYPE:
+        print("In-process JVM is not available, only subprocess mode can be measured")
+    else:
+        elapsed = time_pages(jpype_session, args.pdf, pages)
+        print(f"jpype      startup {jpype_session.startup_seconds:>7.2f}s   "
+              f"per page {elapsed / len(pages):>7.3f}s   total {jpype_session.startup_seconds + elapsed:>7.2f}s")
+
+    subprocess_session = TabulaSession(BACKEND_SUBPROCESS)
+    elapsed = time_pages(subprocess_session, args.pdf, pages)
+    print(f"subprocess startup    (per call)   per page {elapsed / len(pages):>7.3f}s   total {elapsed:>7.2f}s")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Page Classifier Benchmark
+
+This script compares the previous extraction behavior (lattice and guess on every page,
+EXTRACTION_METHOD = "both") with per-page mode selection (EXTRACTION_METHOD = "auto").
+It reports total extraction time, tables and rows found, and the table recall of the
+"auto" run, i.e. the share of "both" tables (matched by shape) that "auto" also finds.
+
+Usage:
+    python benchmarks/benchmark_page_classifier.py Anexo_1.pdf --pages 3-200
+
+Author: Vitor Oliveira
+Date: 2025-03-26
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.jvm_setup import setup_jvm  # noqa: E402
+setup_jvm()
+
+from table_extractor import extract_tables_from_pdf  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark per-page lattice/stream selection")
+    parser.add_argument("pdf", help="PDF file to extract tables from")
+    parser.add_argument("--pages", default="all", help="Page selection, e.g. 3-200")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    results = {}
+    for name, params in (("both", {'lattice': True, 'guess': True}),
+                         ("auto", {'classify_pages': True})):
+        start = time.perf_counter()
+        tables = extract_tables_from_pdf(args.pdf, pages=args.pages, **params)
+        elapsed = time.perf_counter() - start
+        results[name] = (elapsed, Counter(table.shape for table in tables))
+        print(f"{name:<5} {elapsed:>9.2f}s  tables {len(tables):>5}  rows {sum(len(t) for t in tables):>8}")
+
+    baseline = results["both"][1]
+    found = results["auto"][1]
+    matched = sum(min(count, found[shape]) for shape, count in baseline.items())
+    total = sum(baseline.values())
+
+    print(f"speedup {results['both'][0] / results['auto'][0]:.2f}x, "
+          f"table recall {matched / total if total else 1.0:.1%} ({matched}/{total})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
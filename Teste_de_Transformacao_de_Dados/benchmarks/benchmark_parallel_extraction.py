@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Parallel Extraction Benchmark
+
+This script measures how extract_tables_from_pdf scales with the number of workers
+used to extract page chunks in parallel, and checks that every run returns the same
+tables (count and rows) as the single-worker run.
+
+Usage:
+    python benchmarks/benchmark_parallel_extraction.py Anexo_1.pdf --pages 3-200 --workers 1,2,4,8
+
+Author: Vitor Oliveira
+Date: 2025-03-26
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.jvm_setup import setup_jvm  # noqa: E402
+setup_jvm()
+
+from table_extractor import extract_tables_from_pdf  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark parallel table extraction")
+    parser.add_argument("pdf", help="PDF file to extract tables from")
+    parser.add_argument("--pages", default="all", help="Page selection, e.g. 3-200")
+    parser.add_argument("--workers", default="1,2,4", help="Comma separated worker counts")
+    parser.add_argument("--pages-per-chunk", type=int, default=10, help="Pages per worker call")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    baseline = None
+    baseline_time = None
+    print(f"{'workers':>8} {'time':>10} {'speedup':>8} {'tables':>7} {'rows':>8}")
+
+    for workers in [int(w) for w in args.workers.split(",")]:
+        start = time.perf_counter()
+        tables = extract_tables_from_pdf(
+            args.pdf,
+            pages=args.pages,
+            workers=workers,
+            pages_per_chunk=args.pages_per_chunk
+        )
+        elapsed = time.perf_counter() - start
+
+        signature = [len(table) for table in tables]
+        if baseline is None:
+            baseline, baseline_time = signature, elapsed
+        elif signature != baseline:
+            print(f"Warning: {workers} workers returned different tables than the first run")
+
+        print(f"{workers:>8} {elapsed:>9.2f}s {baseline_time / elapsed:>7.2f}x {len(tables):>7} {sum(signature):>8}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
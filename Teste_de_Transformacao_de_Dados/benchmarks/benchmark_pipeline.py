@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Pipeline Benchmark Suite
+
+This script generates synthetic table PDFs of increasing size (see synthetic_pdf.py)
+and runs the whole PDF-to-CSV pipeline on each one under the stage profiler:
+PDF analysis, extraction, abbreviation expansion, type standardization, combining
+and writing. It prints the self time of every stage per document size, so the
+scaling of each stage can be read at a glance, and writes the results as JSON.
+
+With --baseline, the results are compared to a previous JSON run and the script
+exits with an error when a stage got slower than the allowed tolerance, so it can
+catch regressions in CI.
+
+Checkpoints and the schema cache are disabled, so every run does the full work.
+
+Usage:
+    python benchmarks/benchmark_pipeline.py --sizes 10,50,200 --backend python --output bench.json
+    python benchmarks/benchmark_pipeline.py --sizes 10,50,200 --baseline bench.json --tolerance 0.25
+
+Author: Vitor Oliveira
+Date: 2025-03-26
+"""
+
+import os
+import sys
+import json
+import logging
+import argparse
+import tempfile
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.jvm_setup import setup_jvm  # noqa: E402
+setup_jvm()
+
+from synthetic_pdf import generate_pdf  # noqa: E402
+from table_extractor import extract_tables_from_pdf, get_pdf_metadata  # noqa: E402
+from utils.profiling import StageProfiler  # noqa: E402
+from utils.table_processing import clean_tables, iter_combined_tables, save_tables  # noqa: E402
+
+STAGES = ["pdf_analysis", "extraction", "expand_abbreviations", "standardize_data_types",
+          "combine_tables", "write_output"]
+
+# Stages faster than this (in seconds) are too noisy to flag as regressions
+MIN_REGRESSION_SECONDS = 0.05
+
+
+def run_pipeline(pdf: str, output_dir: str, backend: str, workers: int, output_format: str) -> Dict[str, Any]:
+    """
+    Run the pipeline of main.py on a PDF under the profiler.
+
+    Args:
+        pdf: Path to the PDF file
+        output_dir: Directory of the output file
+        backend: Extraction backend
+        workers: Extraction worker processes
+        output_format: "csv", "parquet" or "arrow"
+
+    Returns:
+        Run report (see StageProfiler.report)
+    """
+    profiler = StageProfiler()
+
+    with profiler.stage("pdf_analysis"):
+        page_count = get_pdf_metadata(pdf)['page_count']
+
+    with profiler.stage("extraction"):
+        tables = extract_tables_from_pdf(pdf, pages=f"1-{page_count}", backend=backend, workers=workers,
+                                         classify_pages=True)
+
+    combined = profiler.iterate("combine_tables", iter_combined_tables(clean_tables(tables, None, profiler)))
+    with profiler.stage("write_output"):
+        saved = save_tables(combined, output_dir, os.path.splitext(os.path.basename(pdf))[0], output_format)
+
+    profiler.count("pages", page_count)
+    profiler.count("tables", len(tables))
+    profiler.count("rows", saved[0]['rows'] if saved else 0)
+    return profiler.report()
+
+
+def compare(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]], tolerance: float) -> List[str]:
+    """
+    Find the stages that got slower than the baseline.
+
+    Args:
+        results: Results of this run
+        baseline: Results of the baseline run
+        tolerance: Allowed slowdown (0.25 = 25%)
+
+    Returns:
+        Description of each regression
+    """
+    previous = {(entry['pages'], stage['name']): stage['self_seconds']
+                for entry in baseline for stage in entry['report']['stages']}
+
+    regressions = []
+    for entry in results:
+        for stage in entry['report']['stages']:
+            before = previous.get((entry['pages'], stage['name']))
+            if before is None or max(before, stage['self_seconds']) < MIN_REGRESSION_SECONDS:
+                continue
+            if stage['self_seconds'] > before * (1 + tolerance):
+                regressions.append(f"{stage['name']} at {entry['pages']} pages: "
+                                   f"{before:.3f}s -> {stage['self_seconds']:.3f}s")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the PDF-to-CSV pipeline on synthetic PDFs")
+    parser.add_argument("--sizes", default="10,50,200", help="Comma separated page counts")
+    parser.add_argument("--rows", type=int, default=30, help="Data rows per table page")
+    parser.add_argument("--layout", default="text,lattice,lattice,stream", help="Page kinds cycled in each PDF")
+    parser.add_argument("--backend", default="python", help="Extraction backend: python, jpype or subprocess")
+    parser.add_argument("--workers", type=int, default=1, help="Extraction worker processes")
+    parser.add_argument("--format", default="csv", choices=["csv", "parquet", "arrow"], help="Output format")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare with the results of a previous run")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown against the baseline")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for pages in (int(size) for size in args.sizes.split(",")):
+            pdf = generate_pdf(os.path.join(tmp, f"synthetic_{pages}.pdf"), pages, args.rows, args.layout.split(","))
+            report = run_pipeline(pdf, os.path.join(tmp, "output"), args.backend, args.workers, args.format)
+            results.append({'pages': pages, 'report': report})
+
+    stage_names = [name for name in STAGES if any(s['name'] == name for r in results for s in r['report']['stages'])]
+    print(f"{'pages':>6} {'rows':>8} {'total':>8} " + " ".join(f"{name[:14]:>14}" for name in stage_names))
+    for entry in results:
+        report = entry['report']
+        self_times = {stage['name']: stage['self_seconds'] for stage in report['stages']}
+        print(f"{entry['pages']:>6} {report['counters']['rows']:>8} {report['total_seconds']:>7.2f}s "
+              + " ".join(f"{self_times.get(name, 0.0):>13.3f}s" for name in stage_names))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({'settings': vars(args), 'results': results}, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f)['results'], args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        print("No regressions against the baseline")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Form XObject Pages Check
+
+This script writes the same synthetic document twice, once drawing each page directly
+and once drawing it from a Form XObject (every page stream is then the same
+"q /X1 Do Q", only the form it paints differs), and checks that:
+    - the page analysis (text, rulings, table boxes) is the same for both documents
+    - pages with identical streams but different forms get different content hashes
+    - the page classifier picks the same modes for both documents and skips no table page
+    - those pages get different checkpoint keys, so no page reuses another page's tables
+
+It needs no JVM and exits with a non-zero code when a check fails.
+
+Usage:
+    python benchmarks/check_form_xobject_pages.py
+
+Author: Vitor Oliveira
+Date: 2025-03-26
+"""
+
+import os
+import sys
+import shutil
+import logging
+import tempfile
+from typing import Any, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic_pdf import PAGE_LATTICE, PAGE_STREAM, PAGE_TEXT, generate_pdf  # noqa: E402
+from utils.extraction_checkpoint import page_key, settings_key  # noqa: E402
+from utils.page_classifier import MODE_SKIP, classify_page  # noqa: E402
+from utils.pdf_analysis import analyze_pdf  # noqa: E402
+
+LAYOUT = [PAGE_LATTICE, PAGE_LATTICE, PAGE_STREAM, PAGE_TEXT]
+
+
+def _statistics(page: Dict[str, Any]) -> Dict[str, Any]:
+    """Page statistics without the content hash (which covers the forms too)"""
+    return {key: value for key, value in page.items() if key != "content_hash"}
+
+
+def run_checks(work_dir: str) -> List[Tuple[str, bool]]:
+    """
+    Generate the documents and run every check.
+
+    Args:
+        work_dir: Directory for the generated PDFs
+
+    Returns:
+        List of (check description, passed)
+    """
+    direct_pdf = generate_pdf(os.path.join(work_dir, "direct.pdf"), len(LAYOUT), 10, LAYOUT)
+    forms_pdf = generate_pdf(os.path.join(work_dir, "forms.pdf"), len(LAYOUT), 10, LAYOUT, form_xobjects=True)
+    direct = analyze_pdf(direct_pdf, force=True)["pages"]
+    forms_analysis = analyze_pdf(forms_pdf, force=True)
+    forms = forms_analysis["pages"]
+    settings = settings_key({'lattice': True, 'guess': True}, "jpype")
+    forms_keys = {page_key(page, settings, forms_analysis["sha256"]) for page in forms}
+    direct_modes = [classify_page(page) for page in direct]
+    forms_modes = [classify_page(page) for page in forms]
+    table_pages = [i for i, kind in enumerate(LAYOUT) if kind != PAGE_TEXT]
+
+    return [
+        ("analysis follows Form XObjects",
+         [_statistics(page) for page in direct] == [_statistics(page) for page in forms]),
+        ("identical page streams drawing different forms have different content hashes",
+         len({page["content_hash"] for page in forms}) == len(forms)),
+        ("pages drawn from forms are classified like pages drawn directly", direct_modes == forms_modes),
+        ("no table page is skipped", all(forms_modes[i] != MODE_SKIP for i in table_pages)),
+        ("identical page streams drawing different forms have different checkpoint keys",
+         len(forms_keys) == len(forms)),
+    ]
+
+
+def main() -> int:
+    """
+    Main function to run the checks.
+
+    Returns:
+        Exit code (0 when every check passes)
+    """
+    logging.basicConfig(level=logging.WARNING)
+
+    work_dir = tempfile.mkdtemp(prefix="form_xobjects_")
+    try:
+        results = run_checks(work_dir)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    for description, passed in results:
+        print(f"{'OK  ' if passed else 'FAIL'} {description}")
+    return 0 if all(passed for _, passed in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Synthetic Table PDF Generator
+
+This script writes multi-page PDFs shaped like the Rol de Procedimentos annex, so the
+pipeline can be benchmarked locally at any size without downloading anything. Each
+table page repeats the header row and holds procedure names, coverage abbreviations
+(OD, AMB, HCO, ...), dates and numbers. Pages can be bordered (lattice), borderless
+(stream) or plain text, cycling through the given layout.
+
+The PDF is written directly (Helvetica text and line operators), no PDF library needed.
+With --form-xobjects each page only paints a Form XObject holding its content
+(q /X1 Do Q), as PDFs produced by some report generators do.
+
+Usage:
+    python benchmarks/synthetic_pdf.py synthetic.pdf --pages 200 --rows 30 --layout text,lattice,lattice,stream
+
+Author: Vitor Oliveira
+Date: 2025-03-26
+"""
+
+import sys
+import random
+import argparse
+from typing import List
+
+PAGE_WIDTH = 842  # A4 landscape, like the annex
+PAGE_HEIGHT = 595
+MARGIN = 30
+ROW_HEIGHT = 16
+FONT_SIZE = 7
+# Data rows that fit on a page below the header row
+MAX_ROWS = (PAGE_HEIGHT - 2 * MARGIN) // ROW_HEIGHT - 1
+
+COLUMNS = ["PROCEDIMENTO", "RN", "VIGENCIA", "OD", "AMB", "HCO", "HSO", "REF", "PAC", "DUT", "SUBGRUPO"]
+COLUMN_WIDTHS = [200, 50, 70, 35, 35, 35, 35, 35, 35, 40, 160]
+
+PROCEDURE_WORDS = ["CONSULTA", "EXAME", "CIRURGIA", "TERAPIA", "BIOPSIA", "RADIOGRAFIA", "SESSAO", "TESTE",
+                   "DOSAGEM", "PUNCAO", "CURATIVO", "ANESTESIA"]
+SUBGROUPS = ["PROCEDIMENTOS DIAGNOSTICOS", "PROCEDIMENTOS CLINICOS AMB", "PROCEDIMENTOS CIRURGICOS",
+             "EXAMES OD", "TERAPIAS"]
+
+PAGE_LATTICE = "lattice"
+PAGE_STREAM = "stream"
+PAGE_TEXT = "text"
+
+
+def _escape(text: str) -> str:
+    """Escape a string for a PDF literal"""
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _row_values(rng: random.Random, index: int) -> List[str]:
+    """Values of one table row"""
+    procedure = " ".join(rng.sample(PROCEDURE_WORDS, 3)) + f" {index}"
+    date = f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/20{rng.randint(10, 24)}"
+    values = [procedure, str(rng.choice([439, 465, 469, 500])), date]
+    for abbreviation in COLUMNS[3:9]:
+        values.append(abbreviation if rng.random() < 0.6 else "")
+    values.append(rng.choice(["", f"{rng.randint(1, 150)}"]))
+    values.append(rng.choice(SUBGROUPS))
+    return values
+
+
+def _table_page(rng: random.Random, rows: int, bordered: bool, first_index: int) -> str:
+    """Content stream of a table page"""
+    ops = []
+    top = PAGE_HEIGHT - MARGIN
+    table_rows = [COLUMNS] + [_row_values(rng, first_index + r) for r in range(rows)]
+
+    for r, values in enumerate(table_rows):
+        x = MARGIN
+        for value, width in zip(values, COLUMN_WIDTHS):
+            if value:
+                ops.append(f"BT /F1 {FONT_SIZE} Tf {x + 2} {top - (r + 1) * ROW_HEIGHT + 5} Td ({_escape(value)}) Tj ET")
+            x += width
+
+    if bordered:
+        right = MARGIN + sum(COLUMN_WIDTHS)
+        bottom = top - len(table_rows) * ROW_HEIGHT
+        for r in range(len(table_rows) + 1):
+            ops.append(f"{MARGIN} {top - r * ROW_HEIGHT} m {right} {top - r * ROW_HEIGHT} l S")
+        x = MARGIN
+        for width in [0] + COLUMN_WIDTHS:
+            x += width
+            ops.append(f"{x} {top} m {x} {bottom} l S")
+
+    return "\n".join(ops)
+
+
+def _text_page(rng: random.Random) -> str:
+    """Content stream of a page of running text"""
+    lines = [" ".join(rng.choice(PROCEDURE_WORDS).lower() for _ in range(12)) for _ in range(20)]
+    body = " Tj 0 -14 Td ".join(f"({_escape(line)})" for line in lines)
+    return f"BT /F1 10 Tf {MARGIN} {PAGE_HEIGHT - MARGIN - 20} Td {body} Tj ET"
+
+
+def generate_pdf(path: str, pages: int, rows: int = 30, layout: List[str] = None, seed: int = 0,
+                 form_xobjects: bool = False) -> str:
+    """
+    Write a synthetic table PDF.
+
+    Args:
+        path: Output file path
+        pages: Number of pages
+        rows: Data rows per table page (at most MAX_ROWS)
+        layout: Page kinds cycled through the document ("lattice", "stream", "text")
+        seed: Random seed, the same arguments always produce the same file
+        form_xobjects: Whether each page draws its content from a Form XObject
+
+    Returns:
+        The output path
+    """
+    layout = layout or [PAGE_LATTICE]
+    rows = min(rows, MAX_ROWS)
+    rng = random.Random(seed)
+
+    objects: List[bytes] = []
+
+    def add(data: bytes) -> int:
+        objects.append(data)
+        return len(objects)
+
+    font = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+    # Each page adds a content and a page object (and a form), the page tree comes right after them
+    pages_id = len(objects) + (3 if form_xobjects else 2) * pages + 1
+
+    kids = []
+    for number in range(pages):
+        kind = layout[number % len(layout)]
+        if kind == PAGE_TEXT:
+            content = _text_page(rng)
+        else:
+            content = _table_page(rng, rows, kind == PAGE_LATTICE, number * rows)
+
+        data = content.encode("latin-1")
+        resources = b"/Font << /F1 %d 0 R >>" % font
+        if form_xobjects:
+            form_id = add(b"<< /Type /XObject /Subtype /Form /BBox [0 0 %d %d] /Resources << %s >> /Length %d >>"
+                          b"\nstream\n" % (PAGE_WIDTH, PAGE_HEIGHT, resources, len(data)) + data + b"\nendstream")
+            data = b"q /X1 Do Q"
+            resources = b"/XObject << /X1 %d 0 R >>" % form_id
+        content_id = add(b"<< /Length %d >>\nstream\n" % len(data) + data + b"\nendstream")
+        kids.append(add(b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %d %d] /Contents %d 0 R "
+                        b"/Resources << %s >> >>"
+                        % (pages_id, PAGE_WIDTH, PAGE_HEIGHT, content_id, resources)))
+
+    add(b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % kid for kid in kids) + b"] /Count %d >>" % len(kids))
+    catalog = add(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id)
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, data in enumerate(objects, 1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n" % number + data + b"\nendobj\n"
+
+    xref = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        output += b"%010d 00000 n \n" % offset
+    output += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, catalog, xref)
+
+    with open(path, "wb") as f:
+        f.write(output)
+    return path
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Generate a synthetic table PDF")
+    parser.add_argument("output", help="Output PDF path")
+    parser.add_argument("--pages", type=int, default=50, help="Number of pages")
+    parser.add_argument("--rows", type=int, default=30, help="Data rows per table page")
+    parser.add_argument("--layout", default="lattice", help="Comma separated page kinds: lattice, stream, text")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--form-xobjects", action="store_true", help="Draw each page from a Form XObject")
+    args = parser.parse_args()
+
+    generate_pdf(args.output, args.pages, args.rows, args.layout.split(","), args.seed, args.form_xobjects)
+    print(f"Wrote {args.pages} pages to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
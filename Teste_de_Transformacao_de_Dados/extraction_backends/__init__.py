@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+"""
+Table Extraction Backends
+
+This package provides the interchangeable engines used by table_extractor to turn
+PDF pages into pandas DataFrames. Every backend implements the same interface and
+returns the same list of DataFrames, so they can be swapped and compared.
+
+Modules:
+    base: Interface shared by all backends
+    tabula_backend: tabula-py (Java), in-process JVM or subprocess per call
+    python_backend: Pure-Python word clustering (pdfplumber/pdfminer), no JVM needed
+"""
+
+from .base import TableExtractionBackend
+from .registry import BACKEND_NAMES, get_backend
+
+__all__ = [
+    'TableExtractionBackend',
+    'BACKEND_NAMES',
+    'get_backend'
+]
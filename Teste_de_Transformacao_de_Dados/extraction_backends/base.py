@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Backend Interface Module
+
+This module defines the interface implemented by every table extraction backend.
+
+Classes:
+    TableExtractionBackend: Base class for table extraction engines
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Tuple
+
+import pandas as pd
+
+
+class TableExtractionBackend(ABC):
+    """Base class for table extraction engines"""
+
+    # Name used to select the backend (see extraction_backends.get_backend)
+    name = "base"
+
+    # Whether parallel mode should schedule one page per task (cheap startup per call)
+    per_page_tasks = False
+
+    # Whether extract_pages gets the tables of all its pages in one call (tabula output
+    # does not tell which page a table comes from, so it needs a call per page)
+    tables_by_page = False
+
+    def start(self) -> None:
+        """
+        Prepare the backend in the current process (e.g. start a JVM).
+
+        Called once per worker process, before any extraction.
+        """
+
+    @abstractmethod
+    def extract(self, filepath: str, pages: List[int], options: Dict[str, Any]) -> List[pd.DataFrame]:
+        """
+        Extract the tables of the given pages.
+
+        Args:
+            filepath: Path to the PDF file
+            pages: Sorted list of 1-based page numbers
+            options: Extraction options, as accepted by tabula.read_pdf
+                (area, guess, lattice, stream, multiple_tables)
+
+        Returns:
+            List of DataFrames, in page order
+        """
+
+    def extract_pages(self, filepath: str, pages: List[int],
+                      options: Dict[str, Any]) -> List[Tuple[int, List[pd.DataFrame]]]:
+        """
+        Extract the tables of the given pages, grouped by page.
+
+        Args:
+            filepath: Path to the PDF file
+            pages: Sorted list of 1-based page numbers
+            options: Extraction options (see extract)
+
+        Returns:
+            List of (page, tables) tuples, one per page, in page order
+        """
+        return [(page, self.extract(filepath, [page], options)) for page in pages]
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Pure-Python Backend Module
+
+This module extracts tables without a JVM: words are read with pdfplumber (pdfminer)
+and clustered into rows and columns.
+
+    - lattice pages: the ruling lines of each detected table (see utils.pdf_analysis)
+      define the cell boundaries, and words are assigned to the cell they fall in
+    - stream pages: words are grouped into rows by their vertical position, and columns
+      are the x ranges covered by words, separated by vertical gaps of white space
+
+As with tabula, the first row of each table is used as the header.
+
+Classes:
+    PythonBackend: Table extraction by word clustering
+"""
+
+import bisect
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+import pdfplumber
+
+from utils.pdf_analysis import analyze_pdf
+from .base import TableExtractionBackend
+
+logger = logging.getLogger(__name__)
+
+# Vertical distance (in points) under which words belong to the same text line
+ROW_TOLERANCE = 3.0
+# Distance (in points) under which two ruling lines are the same boundary
+EDGE_TOLERANCE = 2.0
+# Margin (in points) added around detected table boxes
+BBOX_MARGIN = 3.0
+
+Word = Dict[str, Any]
+
+
+def _merge_positions(positions: List[float], tolerance: float = EDGE_TOLERANCE) -> List[float]:
+    """Sort positions and merge the ones closer than the tolerance"""
+    merged: List[float] = []
+    for position in sorted(positions):
+        if not merged or position - merged[-1] > tolerance:
+            merged.append(position)
+    return merged
+
+
+def _group_rows(words: List[Word]) -> List[List[Word]]:
+    """Group words into text lines by their top coordinate"""
+    rows: List[List[Word]] = []
+    for word in sorted(words, key=lambda w: (w["top"], w["x0"])):
+        if rows and word["top"] - rows[-1][0]["top"] <= ROW_TOLERANCE:
+            rows[-1].append(word)
+        else:
+            rows.append([word])
+    return [sorted(row, key=lambda w: w["x0"]) for row in rows]
+
+
+def _to_dataframe(rows: List[List[str]]) -> Optional[pd.DataFrame]:
+    """Build a DataFrame using the first row as header, like tabula does"""
+    rows = [row for row in rows if any(cell for cell in row)]
+    if len(rows) < 2:
+        return None
+
+    header = [cell if cell else f"Unnamed: {i}" for i, cell in enumerate(rows[0])]
+    return pd.DataFrame([[cell if cell else None for cell in row] for row in rows[1:]], columns=header)
+
+
+def _lattice_table(words: List[Word], x_edges: List[float], y_edges: List[float]) -> Optional[pd.DataFrame]:
+    """
+    Assign words to the cells delimited by ruling lines.
+
+    Args:
+        words: Words inside the table area
+        x_edges: Sorted x positions of the vertical rulings
+        y_edges: Sorted top positions of the horizontal rulings
+
+    Returns:
+        DataFrame of the table or None if it has no data rows
+    """
+    if len(x_edges) < 2 or len(y_edges) < 2:
+        return None
+
+    cells: List[List[List[str]]] = [[[] for _ in range(len(x_edges) - 1)] for _ in range(len(y_edges) - 1)]
+    for row in _group_rows(words):
+        for word in row:
+            column = bisect.bisect_right(x_edges, (word["x0"] + word["x1"]) / 2) - 1
+            line = bisect.bisect_right(y_edges, (word["top"] + word["bottom"]) / 2) - 1
+            if 0 <= column < len(x_edges) - 1 and 0 <= line < len(y_edges) - 1:
+                cells[line][column].append(word["text"])
+
+    return _to_dataframe([[" ".join(cell) for cell in row] for row in cells])
+
+
+def _stream_table(words: List[Word]) -> Optional[pd.DataFrame]:
+    """
+    Cluster words into columns separated by vertical white space.
+
+    Args:
+        words: Words inside the table area
+
+    Returns:
+        DataFrame of the table or None if it has no data rows
+    """
+    rows = _group_rows(words)
+    # Single-word lines (titles, notes) would bridge the column gaps, so they are ignored
+    table_rows = [row for row in rows if len(row) > 1]
+    if len(table_rows) < 2:
+        return None
+
+    # Columns are the merged x ranges covered by words
+    columns: List[List[float]] = []
+    for x0, x1 in sorted((w["x0"], w["x1"]) for row in table_rows for w in row):
+        if columns and x0 <= columns[-1][1] + ROW_TOLERANCE:
+            columns[-1][1] = max(columns[-1][1], x1)
+        else:
+            columns.append([x0, x1])
+
+    starts = [column[0] for column in columns]
+    cells = []
+    for row in table_rows:
+        values = [[] for _ in columns]
+        for word in row:
+            values[max(bisect.bisect_right(starts, word["x0"]) - 1, 0)].append(word["text"])
+        cells.append([" ".join(value) for value in values])
+
+    return _to_dataframe(cells)
+
+
+class PythonBackend(TableExtractionBackend):
+    """Table extraction by word clustering, without a JVM"""
+
+    name = "python"
+
+    # Opening a page is cheap, so parallel mode spreads single pages across workers
+    per_page_tasks = True
+
+    tables_by_page = True
+
+    def extract(self, filepath: str, pages: List[int], options: Dict[str, Any]) -> List[pd.DataFrame]:
+        return [table for _, tables in self.extract_pages(filepath, pages, options) for table in tables]
+
+    def extract_pages(self, filepath: str, pages: List[int],
+                      options: Dict[str, Any]) -> List[Tuple[int, List[pd.DataFrame]]]:
+        analysis = analyze_pdf(filepath)
+        page_stats = {entry["page"]: entry for entry in analysis.get("pages", [])}
+        lattice = options.get("lattice", False)
+        multiple_tables = options.get("multiple_tables", True)
+        area = options.get("area")
+
+        results = []
+        with pdfplumber.open(filepath) as pdf:
+            for number in pages:
+                page = pdf.pages[number - 1]
+                page_height = float(page.height)
+                if area:
+                    top, left, bottom, right = area
+                    page = page.crop((left, top, right, bottom))
+
+                page_tables = self._extract_page(page, page_height, page_stats.get(number, {}), lattice)
+                results.append((number, page_tables if multiple_tables else page_tables[:1]))
+
+        return results
+
+    def _extract_page(self, page: Any, page_height: float, stats: Dict[str, Any],
+                      lattice: bool) -> List[pd.DataFrame]:
+        """Extract the tables of a single pdfplumber page"""
+        words = page.extract_words(x_tolerance=ROW_TOLERANCE, y_tolerance=ROW_TOLERANCE)
+        if not words:
+            return []
+
+        bboxes = self._table_areas(page_height, stats) if lattice else []
+        if not bboxes:
+            if lattice:
+                table = _lattice_table(
+                    words,
+                    _merge_positions([edge["x0"] for edge in page.vertical_edges]),
+                    _merge_positions([edge["top"] for edge in page.horizontal_edges])
+                )
+            else:
+                table = _stream_table(words)
+            return [table] if table is not None else []
+
+        tables = []
+        for x0, top, x1, bottom in bboxes:
+            area_words = [w for w in words
+                          if x0 <= w["x0"] and w["x1"] <= x1 and top <= w["top"] and w["bottom"] <= bottom]
+            table = _lattice_table(
+                area_words,
+                _merge_positions([e["x0"] for e in page.vertical_edges if x0 <= e["x0"] <= x1]),
+                _merge_positions([e["top"] for e in page.horizontal_edges if top <= e["top"] <= bottom])
+            )
+            if table is not None:
+                tables.append(table)
+        return tables
+
+    @staticmethod
+    def _table_areas(page_height: float, stats: Dict[str, Any]) -> List[Tuple[float, float, float, float]]:
+        """Convert the table boxes of the analysis (PDF coordinates) to top-based page coordinates"""
+        return [(x0 - BBOX_MARGIN, page_height - y1 - BBOX_MARGIN, x1 + BBOX_MARGIN, page_height - y0 + BBOX_MARGIN)
+                for x0, y0, x1, y1 in stats.get("table_bboxes", [])]
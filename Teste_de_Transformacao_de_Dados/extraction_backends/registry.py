@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Backend Registry Module
+
+This module maps backend names to their implementations and keeps one instance
+of each backend per process.
+
+Functions:
+    get_backend: Get the backend registered under a name
+"""
+
+from typing import Callable, Dict
+
+from .base import TableExtractionBackend
+from .tabula_backend import TabulaBackend, BACKEND_JPYPE, BACKEND_SUBPROCESS
+
+
+def _python_backend() -> TableExtractionBackend:
+    # Imported lazily so pdfplumber is only required when the backend is used
+    from .python_backend import PythonBackend
+    return PythonBackend()
+
+
+_FACTORIES: Dict[str, Callable[[], TableExtractionBackend]] = {
+    BACKEND_JPYPE: lambda: TabulaBackend(BACKEND_JPYPE),
+    BACKEND_SUBPROCESS: lambda: TabulaBackend(BACKEND_SUBPROCESS),
+    "python": _python_backend,
+}
+
+BACKEND_NAMES = list(_FACTORIES)
+
+_instances: Dict[str, TableExtractionBackend] = {}
+
+
+def get_backend(name: str) -> TableExtractionBackend:
+    """
+    Get the backend registered under a name, creating it on first use.
+
+    Args:
+        name: "jpype" or "subprocess" (tabula-java), or "python" (pure Python)
+
+    Returns:
+        The process-wide backend instance
+    """
+    if name not in _FACTORIES:
+        raise ValueError(f"Unknown extraction backend '{name}'. Options: {', '.join(BACKEND_NAMES)}")
+
+    if name not in _instances:
+        _instances[name] = _FACTORIES[name]()
+    return _instances[name]
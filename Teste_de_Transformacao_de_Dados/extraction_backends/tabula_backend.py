@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Tabula Backend Module
+
+This module extracts tables with tabula-py, either through one in-process JVM
+kept warm for all calls (JPype) or with a `java -jar` subprocess per call.
+
+Classes:
+    TabulaBackend: Table extraction through tabula-java
+"""
+
+from typing import Any, Dict, List
+
+import pandas as pd
+
+from utils.tabula_session import get_session, BACKEND_JPYPE, BACKEND_SUBPROCESS
+from .base import TableExtractionBackend
+
+
+class TabulaBackend(TableExtractionBackend):
+    """Table extraction through tabula-java"""
+
+    def __init__(self, jvm_mode: str = BACKEND_JPYPE):
+        self.name = jvm_mode
+        self.jvm_mode = jvm_mode
+
+    def start(self) -> None:
+        get_session(self.jvm_mode).start()
+
+    def extract(self, filepath: str, pages: List[int], options: Dict[str, Any]) -> List[pd.DataFrame]:
+        return get_session(self.jvm_mode).read_pdf(filepath, pages=pages, **options)
+
+
+__all__ = ['TabulaBackend', 'BACKEND_JPYPE', 'BACKEND_SUBPROCESS']
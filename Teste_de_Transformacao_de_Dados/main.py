@@ -15,7 +15,6 @@ Date: 2025-03-26
 import os
 import sys
 import logging
-import pandas as pd
 from datetime import datetime
 
 # Try to set up JVM first if the module exists
@@ -28,14 +27,20 @@ except ImportError:
 # Import main extraction functions
 from table_extractor import (
     extract_tables_from_pdf,
-    get_pdf_metadata
+    get_pdf_metadata,
+    resolve_pdf_path
 )
+from utils.pdf_analysis import analyze_pdf
+from utils.extraction_checkpoint import CheckpointStore
 
-from utils.table_processing import save_tables_to_csv
-from utils.table_processing import combine_tables
-from utils.table_processing import standardize_data_types, expand_abbreviations
+from utils.table_processing import save_tables
+from utils.table_processing import combine_tables, iter_combined_tables
+from utils.table_processing import clean_tables
+from utils.table_processing import SchemaCache, schema_cache_path
 
 from utils.file_compressor import compress_files
+from utils.content_store import ContentStore, DEFAULT_STORE_DIR
+from utils.profiling import StageProfiler
 
 # Configuration constants
 INPUT_PDF = "Anexo_1.pdf"  # PDF file path
@@ -43,8 +48,19 @@ OUTPUT_DIR = "csv_table"
 COMPRESSED_FILE_DIRECTORY = "compressed_file"
 START_PAGE = 3  # Start from page 3
 END_PAGE = None  # None means process until the end of the document
-EXTRACTION_METHOD = "both"  # Options: "lattice", "stream", "both"
+EXTRACTION_METHOD = "both"  # Options: "lattice", "stream", "both", "auto" (chosen per page, see
+                            # benchmarks/benchmark_page_classifier.py for its recall against "both")
+EXTRACTION_WORKERS = os.cpu_count() or 1  # Parallel workers for page chunks (1 disables parallel mode)
+PAGES_PER_CHUNK = 10  # Pages handed to each worker call
+EXTRACTION_BACKEND = "jpype"  # Options: "jpype" (tabula, one warm in-process JVM),
+                              # "subprocess" (tabula, java -jar per call), "python" (no JVM)
 VERBOSE_LOGGING = True  # Set to True for more detailed logs
+CONTENT_STORE_DIR = DEFAULT_STORE_DIR  # Shared with the scraper, None disables it
+STREAM_OUTPUT = True  # Write each processed table straight to the CSV instead of combining in memory
+OUTPUT_FORMAT = "csv"  # Options: "csv", "parquet", "arrow" (Parquet/Arrow need pyarrow)
+CHECKPOINT_DIR = "checkpoints"  # Per-page extraction results reused by reruns, None disables it
+CACHE_SCHEMAS = True  # Reuse inferred column types next to the PDF (<file>.schema.json) across runs
+PROFILE_REPORT = True  # Write a JSON report with the time and memory of each stage to logs/
 
 
 def setup_logging(log_level: int = logging.INFO) -> None:
@@ -95,6 +111,8 @@ def main() -> int:
     Returns:
         Exit code (0 for success, non-zero for error)
     """
+    profiler = StageProfiler(enabled=PROFILE_REPORT)
+
     try:
         # Setup logging
         log_level = logging.DEBUG if VERBOSE_LOGGING else logging.INFO
@@ -103,13 +121,15 @@ def main() -> int:
 
         logger.info("Starting PDF Table Extraction Tool")
 
-        # Validate input file
-        if not os.path.exists(INPUT_PDF):
+        # Validate input file (looking it up in the content store if needed)
+        store = ContentStore(CONTENT_STORE_DIR) if CONTENT_STORE_DIR else None
+        if resolve_pdf_path(INPUT_PDF, store) is None:
             logger.error(f"Input file does not exist: {INPUT_PDF}")
             return 1
 
-        # Get PDF metadata to determine total pages
-        metadata = get_pdf_metadata(INPUT_PDF)
+        # Get PDF metadata to determine total pages (parses the PDF once, see utils.pdf_analysis)
+        with profiler.stage("pdf_analysis"):
+            metadata = get_pdf_metadata(INPUT_PDF)
         total_pages = metadata['page_count']
         logger.info(f"PDF has {total_pages} pages")
 
@@ -125,14 +145,23 @@ def main() -> int:
         extraction_params = {
             'lattice': EXTRACTION_METHOD in ['lattice', 'both'],
             'guess': EXTRACTION_METHOD in ['stream', 'both'],
-            'pages': page_range
+            'pages': page_range,
+            'workers': EXTRACTION_WORKERS,
+            'pages_per_chunk': PAGES_PER_CHUNK,
+            'backend': EXTRACTION_BACKEND,
+            'classify_pages': EXTRACTION_METHOD == 'auto'
         }
 
         logger.info(f"Extracting tables using {EXTRACTION_METHOD} method")
-        tables = extract_tables_from_pdf(
-            INPUT_PDF,
-            **extraction_params
-        )
+        with profiler.stage("extraction"):
+            tables = extract_tables_from_pdf(
+                INPUT_PDF,
+                store=store,
+                checkpoint=CheckpointStore(CHECKPOINT_DIR) if CHECKPOINT_DIR else None,
+                **extraction_params
+            )
+        profiler.count("pages", end_page - START_PAGE + 1)
+        profiler.count("tables", len(tables))
 
         if not tables:
             logger.warning("No tables found in the PDF")
@@ -146,56 +175,60 @@ def main() -> int:
             logger.info(f"First table has {len(first_table)} rows and {len(first_table.columns)} columns")
             logger.info(f"Columns: {', '.join(str(c) for c in first_table.columns)}")
 
-        # Process tables - standardize data types and expand abbreviations in column names and cells
-        processed_tables = []
-        for i, table in enumerate(tables):
-            # Expand abbreviations in column names and cells only if requested
-            expanded_table = expand_abbreviations(df = table, expand_cell_values= True)
-
-            # Standardize data types
-            standard_table = standardize_data_types(expanded_table)
+        # Column types are inferred once per table header and reused by the other tables
+        schema_cache = SchemaCache(
+            schema_cache_path(INPUT_PDF) if CACHE_SCHEMAS else None,
+            analyze_pdf(INPUT_PDF)['sha256']
+        )
 
-            processed_tables.append(standard_table)
-            logger.info(f"Processed table {i + 1}: {len(table)} rows")
+        # Process tables - standardize data types and expand abbreviations in column names and cells
+        processed_tables = clean_tables(tables, schema_cache, profiler)
 
         # Create base filename from input file
         base_filename = os.path.splitext(os.path.basename(INPUT_PDF))[0]
 
-        combined_tables = combine_tables(processed_tables)
-
-        if combined_tables is None:
-            logger.warning("The tables were not combined")
-            return 0
-
-        # Save tables to CSV
-        saved_file = save_tables_to_csv(
-            combined_tables,
-            OUTPUT_DIR,
-            base_filename,
-            encoding='utf-8',
-            clean_headers=True  # Already cleaned above, but param is required
-        )
-
-        if not saved_file:
+        if STREAM_OUTPUT:
+            # Tables are processed, aligned and written one at a time
+            combined_tables = profiler.iterate("combine_tables", iter_combined_tables(processed_tables))
+        else:
+            with profiler.stage("combine_tables"):
+                combined_tables = combine_tables(processed_tables)
+
+            if combined_tables is None:
+                logger.warning("The tables were not combined")
+                return 0
+
+        # Save tables (the writer reports the stats, so the file is not read back)
+        with profiler.stage("write_output"):
+            saved_files = save_tables(
+                combined_tables,
+                OUTPUT_DIR,
+                base_filename,
+                output_format=OUTPUT_FORMAT,
+                encoding='utf-8'
+            )
+        schema_cache.save()
+
+        if not saved_files:
             logger.warning("No tables were saved")
             return 0
 
-        logger.info(f"Successfully saved {len(saved_file)} tables to {OUTPUT_DIR}")
-        for file in saved_file:
-            logger.info(f"  - {os.path.basename(file)}")
+        logger.info(f"Successfully saved {len(saved_files)} tables to {OUTPUT_DIR}")
+        for stats in saved_files:
+            logger.info(f"  - {os.path.basename(stats['path'])}")
 
             # Show stats about the combined result
-            combined_path = saved_file[0]
-            combined_df = pd.read_csv(combined_path)
-            logger.info(f"Combined table has {len(combined_df)} rows and {len(combined_df.columns)} columns")
+            logger.info(f"Combined table has {stats['rows']} rows and {stats['columns']} columns")
+            profiler.count("rows", stats['rows'])
 
         # Compress downloaded files
         logger.info("Starting compression process")
-        success = compress_files(
-            source_dir=OUTPUT_DIR,
-            output_dir=COMPRESSED_FILE_DIRECTORY,
-            output_filename="Teste_Vitor_Oliveira"
-        )
+        with profiler.stage("compression"):
+            success = compress_files(
+                source_dir=OUTPUT_DIR,
+                output_dir=COMPRESSED_FILE_DIRECTORY,
+                output_filename="Teste_Vitor_Oliveira"
+            )
 
         if success:
             logger.info("Compression process completed successfully")
@@ -210,6 +243,10 @@ def main() -> int:
     except Exception as e:
         logging.exception(f"Unhandled error in main process: {e}")
         return 1
+    finally:
+        if PROFILE_REPORT:
+            profiler.log_summary()
+            profiler.write_report(f"logs/run_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
 
 
 if __name__ == "__main__":
@@ -2,8 +2,9 @@
 """
 PDF Table Extractor
 
-This module extracts tables from PDF files using tabula-py and converts them
-to structured pandas DataFrames which can then be exported to CSV.
+This module extracts tables from PDF files using tabula-py (or the JVM-free
+backend, see extraction_backends) and converts them to structured pandas
+DataFrames which can then be exported to CSV.
 
 Usage:
     from table_extractor import extract_tables_from_pdf
@@ -15,7 +16,10 @@ Usage:
 Dependencies:
     - tabula-py
     - pandas
+    - PyPDF2 (page count, metadata and page structure, see utils.pdf_analysis)
     - Java Runtime Environment (JRE) for tabula-py
+    - JPype1 (optional) to keep one JVM running in-process instead of a subprocess per call
+    - pdfplumber (optional) for the pure-Python backend
 
 Author: Vitor Oliveira
 Date: 2025-03-26
@@ -23,19 +27,36 @@ Date: 2025-03-26
 
 import os
 import logging
-from typing import List, Optional, Dict, Any, Union
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Dict, Any, Tuple, Union
 import pandas as pd
-import tabula
-import PyPDF2
+
+from utils.content_store import ContentStore
+from utils.pdf_analysis import analyze_pdf
+from utils.page_classifier import MODE_BOTH, MODE_LATTICE, MODE_STREAM, group_pages_by_mode
+from utils.extraction_checkpoint import CheckpointStore, chunk_key, page_key, settings_key
+from extraction_backends import get_backend
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Tabula options used for each page mode when pages are classified
+MODE_OPTIONS = {
+    MODE_LATTICE: {'lattice': True, 'stream': False, 'guess': False},
+    MODE_STREAM: {'lattice': False, 'stream': True, 'guess': True},
+    # Pages the classifier cannot tell apart get the same options as EXTRACTION_METHOD = "both"
+    MODE_BOTH: {'lattice': True, 'guess': True},
+}
+
 
 def get_pdf_metadata(filepath: str) -> Dict[str, Any]:
     """
     Extract metadata from a PDF file.
 
+    The PDF is parsed only once: the metadata comes from the cached analysis kept
+    next to the file (see utils.pdf_analysis), which later calls and reruns reuse.
+
     Args:
         filepath: Path to the PDF file
 
@@ -43,20 +64,9 @@ def get_pdf_metadata(filepath: str) -> Dict[str, Any]:
         Dictionary containing PDF metadata
     """
     try:
-        with open(filepath, 'rb') as file:
-            reader = PyPDF2.PdfReader(file)
-            info = reader.metadata
-
-            # Create a normalized metadata dictionary
-            metadata = {
-                'page_count': len(reader.pages),
-                'title': info.title if info.title else 'Unknown',
-                'author': info.author if info.author else 'Unknown',
-                'creator': info.creator if info.creator else 'Unknown',
-                'producer': info.producer if info.producer else 'Unknown'
-            }
-
-        logger.info(f"Extracted metadata from {filepath}: {len(reader.pages)} pages")
+        metadata = dict(analyze_pdf(filepath)['metadata'])
+
+        logger.info(f"Extracted metadata from {filepath}: {metadata['page_count']} pages")
         return metadata
 
     except Exception as e:
@@ -70,16 +80,303 @@ def get_pdf_metadata(filepath: str) -> Dict[str, Any]:
         }
 
 
+def resolve_pdf_path(filepath: str, store: Optional[ContentStore] = None) -> Optional[str]:
+    """
+    Make sure a PDF is available locally, using the shared content store.
+
+    A missing file is materialized from the store by its file name (e.g. the
+    "Anexo_1.pdf" downloaded by the scraper). An existing file that the store
+    does not know yet is added to it, so both tools keep a single copy. The file
+    digest comes from its analysis (cached, and needed for the extraction anyway),
+    so a file already in the store is not copied or hashed again.
+
+    Args:
+        filepath: Expected path of the PDF file
+        store: Optional content store shared with the scraper
+
+    Returns:
+        Path to the PDF file or None if it is not available
+    """
+    digest = store.lookup_name(filepath) if store else None
+
+    if os.path.exists(filepath):
+        if store and (digest is None or analyze_pdf(filepath)['sha256'] != digest or not store.contains(digest)):
+            store.put_file(filepath)
+        return filepath
+
+    if digest and store.materialize(digest, filepath):
+        return filepath
+
+    return None
+
+
+def parse_page_range(pages: Union[str, List[int]], page_count: int) -> List[int]:
+    """
+    Expand a tabula-style page selection into a sorted list of page numbers.
+
+    Args:
+        pages: 'all', a range string such as "3-120" or "1,3,5-7", or a list of page numbers
+        page_count: Number of pages in the document (used for 'all' and open ranges)
+
+    Returns:
+        Sorted list of 1-based page numbers within the document
+    """
+    if isinstance(pages, int):
+        pages = [pages]
+
+    if isinstance(pages, (list, tuple)):
+        selected = set(int(page) for page in pages)
+    elif str(pages).strip().lower() == 'all':
+        selected = set(range(1, page_count + 1))
+    else:
+        selected = set()
+        for part in str(pages).split(','):
+            part = part.strip()
+            if not part:
+                continue
+            if '-' in part:
+                start, end = part.split('-', 1)
+                start = int(start) if start.strip() else 1
+                end = int(end) if end.strip() else page_count
+                selected.update(range(start, end + 1))
+            else:
+                selected.add(int(part))
+
+    return sorted(page for page in selected if 1 <= page <= page_count)
+
+
+def chunk_pages(pages: List[int], pages_per_chunk: int) -> List[List[int]]:
+    """
+    Split a list of pages into consecutive chunks.
+
+    Args:
+        pages: Sorted list of page numbers
+        pages_per_chunk: Maximum number of pages in each chunk
+
+    Returns:
+        List of page chunks, in page order
+    """
+    pages_per_chunk = max(1, pages_per_chunk)
+    return [pages[i:i + pages_per_chunk] for i in range(0, len(pages), pages_per_chunk)]
+
+
+def _init_worker(backend: str) -> None:
+    """Start the extraction backend once per worker process (e.g. a warm JVM)"""
+    get_backend(backend).start()
+
+
+def _extract_page_chunk(filepath: str, pages: List[int], options: Dict[str, Any],
+                        backend: str) -> List[pd.DataFrame]:
+    """
+    Extract the tables of a chunk of pages (runs inside a worker process).
+
+    Args:
+        filepath: Path to the PDF file
+        pages: Page numbers of the chunk
+        options: Extraction options (tabula.read_pdf keyword arguments)
+        backend: Name of the extraction backend
+
+    Returns:
+        List of DataFrames found in the chunk, in page order
+    """
+    return get_backend(backend).extract(filepath, pages, options)
+
+
+def _extract_checkpointed_chunk(filepath: str, pages: List[int], options: Dict[str, Any], backend: str,
+                                checkpoint_root: str, keys: List[str]) -> List[Tuple[int, List[pd.DataFrame]]]:
+    """
+    Extract a chunk in one backend call and store its result.
+
+    Backends with tables_by_page store one result per page; the others store the
+    tables of the whole chunk under a single key.
+
+    Args:
+        filepath: Path to the PDF file
+        pages: Page numbers of the chunk
+        options: Extraction options (tabula.read_pdf keyword arguments)
+        backend: Name of the extraction backend
+        checkpoint_root: Directory of the checkpoint store
+        keys: Checkpoint key of each page, or the single key of the chunk
+
+    Returns:
+        List of (first page, tables) tuples, in page order
+    """
+    checkpoint = CheckpointStore(checkpoint_root)
+    extraction_backend = get_backend(backend)
+
+    if extraction_backend.tables_by_page:
+        results = extraction_backend.extract_pages(filepath, pages, options)
+    else:
+        results = [(pages[0], extraction_backend.extract(filepath, pages, options))]
+    for (_, tables), key in zip(results, keys):
+        checkpoint.put(key, tables)
+    return results
+
+
+def _run_tasks(filepath: str, tasks: List[Tuple[List[int], Dict[str, Any]]], workers: int, backend: str,
+               function: Any, extra_args: List[Tuple[Any, ...]]) -> List[Any]:
+    """
+    Run one extraction function per task, in parallel worker processes when useful.
+
+    Args:
+        filepath: Path to the PDF file
+        tasks: List of (pages, options) tuples
+        workers: Number of worker processes
+        backend: Name of the extraction backend
+        function: _extract_page_chunk or _extract_checkpointed_chunk
+        extra_args: Additional arguments of each call, after the backend
+
+    Returns:
+        Result of each task, in task order
+    """
+    if workers > 1 and len(tasks) > 1:
+        # Spawned (not forked) workers, a JVM does not survive a fork
+        with ProcessPoolExecutor(max_workers=workers,
+                                 mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=_init_worker,
+                                 initargs=(backend,)) as executor:
+            # executor.map keeps the results in task (page) order
+            return list(executor.map(
+                function,
+                [filepath] * len(tasks),
+                [chunk for chunk, _ in tasks],
+                [chunk_options for _, chunk_options in tasks],
+                [backend] * len(tasks),
+                *zip(*extra_args) if extra_args else []
+            ))
+
+    return [function(filepath, chunk, chunk_options, backend, *args)
+            for (chunk, chunk_options), args in zip(tasks, extra_args or [()] * len(tasks))]
+
+
+def _extract_with_checkpoint(filepath: str, tasks: List[Tuple[List[int], Dict[str, Any]]], workers: int,
+                             backend: str, checkpoint: CheckpointStore,
+                             chunk_size: Optional[int]) -> List[pd.DataFrame]:
+    """
+    Extract the planned tasks, reusing the results already in the checkpoint store.
+
+    With a backend that has tables_by_page, results are reused page by page and the
+    pages still to extract are regrouped in tasks of chunk_size pages. Otherwise each
+    task is reused or extracted as a whole.
+
+    Args:
+        filepath: Path to the PDF file
+        tasks: List of (pages, options) tuples returned by build_extraction_tasks
+        workers: Number of worker processes
+        backend: Name of the extraction backend
+        checkpoint: Store of per-page (or per-task) results
+        chunk_size: Maximum pages per task for the pages still to extract
+
+    Returns:
+        Tables of all pages, in page order
+    """
+    analysis = analyze_pdf(filepath)
+    page_stats = {entry["page"]: entry for entry in analysis.get("pages", [])}
+    tables_by_page = get_backend(backend).tables_by_page
+
+    # Tables by the first page of the result they belong to (a page, or a whole task)
+    results: Dict[int, List[pd.DataFrame]] = {}
+    reused = 0
+    pending_tasks = []
+    pending_keys = []
+    for chunk, chunk_options in tasks:
+        settings = settings_key(chunk_options, backend)
+        keys = [page_key(page_stats.get(page, {"page": page}), settings, analysis["sha256"]) for page in chunk]
+
+        if not tables_by_page:
+            key = chunk_key(keys)
+            tables = checkpoint.get(key)
+            if tables is None:
+                pending_tasks.append((chunk, chunk_options))
+                pending_keys.append([key])
+            else:
+                results[chunk[0]] = tables
+                reused += len(chunk)
+            continue
+
+        pending = []
+        for page, key in zip(chunk, keys):
+            tables = checkpoint.get(key)
+            if tables is None:
+                pending.append((page, key))
+            else:
+                results[page] = tables
+                reused += 1
+
+        if pending:
+            size = chunk_size or len(pending)
+            for start in range(0, len(pending), size):
+                part = pending[start:start + size]
+                pending_tasks.append(([page for page, _ in part], chunk_options))
+                pending_keys.append([key for _, key in part])
+
+    total = reused + sum(len(chunk) for chunk, _ in pending_tasks)
+    logger.info(f"Reusing {reused} of {total} pages from checkpoint {checkpoint.root}")
+
+    if pending_tasks:
+        extra_args = [(checkpoint.root, keys) for keys in pending_keys]
+        for chunk_results in _run_tasks(filepath, pending_tasks, workers, backend,
+                                        _extract_checkpointed_chunk, extra_args):
+            results.update(chunk_results)
+
+    return [table for page in sorted(results) for table in results[page]]
+
+
+def build_extraction_tasks(
+        filepath: str,
+        pages: List[int],
+        options: Dict[str, Any],
+        classify_pages: bool = False,
+        pages_per_chunk: Optional[int] = None
+) -> List[Tuple[List[int], Dict[str, Any]]]:
+    """
+    Plan the tabula calls needed to extract a page selection.
+
+    With classify_pages, each page is classified from the cached PDF analysis and
+    only the mode it needs is run: lattice pages without table guessing (the ruling
+    lines define the cells), stream pages with guessing, pages the classifier cannot
+    tell apart with both, and pages without tables are skipped.
+
+    Args:
+        filepath: Path to the PDF file
+        pages: Sorted list of page numbers to extract
+        options: Keyword arguments for tabula.read_pdf (used as is without classify_pages)
+        classify_pages: Whether to choose lattice/stream/skip per page
+        pages_per_chunk: Maximum pages per call (None keeps each group in a single call)
+
+    Returns:
+        List of (pages, tabula options) tuples, in page order
+    """
+    if classify_pages:
+        groups = [(pages_group, {**options, **MODE_OPTIONS[mode]})
+                  for mode, pages_group in group_pages_by_mode(analyze_pdf(filepath), pages)]
+    else:
+        groups = [(pages, options)] if pages else []
+
+    if not pages_per_chunk:
+        return groups
+
+    return [(chunk, group_options)
+            for pages_group, group_options in groups
+            for chunk in chunk_pages(pages_group, pages_per_chunk)]
+
+
 def extract_tables_from_pdf(
         filepath: str,
         pages: Union[str, List[int]] = 'all',
         area: Optional[List[float]] = None,
         guess: bool = True,
         lattice: bool = True,
-        multiple_tables: bool = True
+        multiple_tables: bool = True,
+        store: Optional[ContentStore] = None,
+        workers: int = 1,
+        pages_per_chunk: int = 10,
+        backend: str = "jpype",
+        classify_pages: bool = False,
+        checkpoint: Optional[CheckpointStore] = None
 ) -> List[pd.DataFrame]:
     """
-    Extract tables from a PDF file using tabula-py.
+    Extract tables from a PDF file using the selected extraction backend.
 
     Args:
         filepath: Path to the PDF file
@@ -88,45 +385,73 @@ def extract_tables_from_pdf(
         guess: Whether to guess table structure from non-bordered tables
         lattice: Whether to use lattice mode for bordered tables
         multiple_tables: Whether to extract multiple tables per page
+        store: Optional content store used to find PDFs that are not in the working directory
+        workers: Number of worker processes; with more than one, the page range is split
+            into chunks that are extracted in parallel and reassembled in page order
+        pages_per_chunk: Number of pages handed to each worker call in parallel mode
+        backend: Extraction backend (see extraction_backends): "jpype" to keep one
+            in-process JVM warm for all tabula calls (falls back to subprocess mode if
+            unavailable), "subprocess" to run `java -jar` per call, or "python" for the
+            JVM-free word clustering backend
+        classify_pages: Whether to choose lattice, stream or skip per page from its ruling
+            lines and text alignment (guess and lattice are then set per page group)
+        checkpoint: Optional store of per-page results; pages already extracted with the
+            same content and settings are reused, and every extracted page is saved as
+            soon as it is done, so an interrupted run resumes where it stopped
 
     Returns:
-        List of pandas DataFrames containing extracted tables
+        List of pandas DataFrames containing extracted tables (empty if the PDF is
+        missing or has no pages). Extraction errors are raised, so a failed page range
+        is not mistaken for one without tables.
     """
-    if not os.path.exists(filepath):
+    if resolve_pdf_path(filepath, store) is None:
         logger.error(f"PDF file not found: {filepath}")
         return []
 
-    try:
-        logger.info(f"Extracting tables from {filepath} (pages: {pages})")
+    logger.info(f"Extracting tables from {filepath} (pages: {pages})")
 
-        # Get page count for validation
-        metadata = get_pdf_metadata(filepath)
-        page_count = metadata['page_count']
+    # Get page count for validation
+    metadata = get_pdf_metadata(filepath)
+    page_count = metadata['page_count']
 
-        if page_count == 0:
-            logger.error(f"Invalid or empty PDF: {filepath}")
-            return []
+    if page_count == 0:
+        logger.error(f"Invalid or empty PDF: {filepath}")
+        return []
 
-        # Extract tables using tabula
-        tables = tabula.read_pdf(
-            filepath,
-            pages=pages,
-            area=area,
-            guess=guess,
-            lattice=lattice,
-            multiple_tables=multiple_tables
-        )
+    options = {
+        'area': area,
+        'guess': guess,
+        'lattice': lattice,
+        'multiple_tables': multiple_tables
+    }
 
-        logger.info(f"Extracted {len(tables)} tables from {filepath}")
+    page_list = parse_page_range(pages, page_count)
+    extraction_backend = get_backend(backend)
+    if workers > 1:
+        chunk_size = 1 if extraction_backend.per_page_tasks else pages_per_chunk
+    else:
+        chunk_size = None
+    tasks = build_extraction_tasks(filepath, page_list, options, classify_pages, chunk_size)
 
-        # Filter out empty tables
-        non_empty_tables = [table for table in tables if not table.empty]
+    if checkpoint is not None:
+        tables = _extract_with_checkpoint(filepath, tasks, workers, backend, checkpoint, chunk_size)
+    elif workers > 1 and len(tasks) > 1:
+        # Extract page chunks in parallel and reassemble them in page order
+        logger.info(f"Extracting {len(page_list)} pages in {len(tasks)} chunks with {workers} workers")
+        chunk_tables = _run_tasks(filepath, tasks, workers, backend, _extract_page_chunk, [])
+        tables = [table for chunk in chunk_tables for table in chunk]
+    else:
+        tables = []
+        for chunk, chunk_options in tasks:
+            tables.extend(extraction_backend.extract(filepath, chunk, chunk_options))
 
-        if len(non_empty_tables) < len(tables):
-            logger.warning(f"Filtered out {len(tables) - len(non_empty_tables)} empty tables")
+    logger.info(f"Extracted {len(tables)} tables from {filepath}")
 
-        return non_empty_tables
+    # Filter out empty tables
+    non_empty_tables = [table for table in tables if not table.empty]
+
+    if len(non_empty_tables) < len(tables):
+        logger.warning(f"Filtered out {len(tables) - len(non_empty_tables)} empty tables")
+
+    return non_empty_tables
 
-    except Exception as e:
-        logger.exception(f"Error extracting tables: {e}")
-        return []
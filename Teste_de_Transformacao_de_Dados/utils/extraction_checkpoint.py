@@ -0,0 +1,148 @@
+"""
+Extraction Checkpoints
+
+This module persists the tables extracted from each page, so an interrupted run
+resumes where it stopped and reruns skip the pages already extracted.
+
+Each page result is keyed by the content hash of the page (from the cached PDF
+analysis, see utils.pdf_analysis) and the extraction settings (tabula options and
+backend). The content hash covers everything the page draws: its content stream,
+the Form XObjects it paints, the resolved resources (fonts, images) and the page
+boxes, so two pages only share a key when they show the same thing. The key does
+not include the hash of the whole document: when a new version of an annex
+arrives, the pages whose content did not change keep their key and only the
+changed pages are extracted again. Pages without a content hash (no content, or
+the analysis failed) are keyed by the document hash and the page number.
+
+Results are written one file per page, atomically, as soon as the page is done.
+Backends that cannot tell which page a table comes from (tabula) extract a chunk of
+pages in one call, and its result is stored under a key built from the keys of its
+pages (see chunk_key): it is reused when the same pages are extracted again with
+the same chunking.
+
+Usage:
+    from utils.extraction_checkpoint import CheckpointStore
+
+    checkpoint = CheckpointStore("checkpoints")
+    tables = extract_tables_from_pdf("Anexo_1.pdf", checkpoint=checkpoint)
+"""
+
+import os
+import json
+import hashlib
+import logging
+import tempfile
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Bump when the extraction output changes for the same settings, so old results are ignored
+CHECKPOINT_VERSION = 2
+
+
+def settings_key(options: Dict[str, Any], backend: str) -> str:
+    """
+    Hash the settings that affect the tables extracted from a page.
+
+    Args:
+        options: Extraction options of the page (tabula.read_pdf keyword arguments)
+        backend: Name of the extraction backend
+
+    Returns:
+        Hex digest of the settings
+    """
+    settings = {"version": CHECKPOINT_VERSION, "backend": backend, "options": options}
+    return hashlib.sha256(json.dumps(settings, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def page_key(page: Dict[str, Any], settings: str, document_sha256: str) -> str:
+    """
+    Build the checkpoint key of a page.
+
+    Args:
+        page: Page entry of the analysis returned by analyze_pdf
+        settings: Digest returned by settings_key
+        document_sha256: Hash of the PDF, used when the page content could not be hashed
+
+    Returns:
+        Hex digest identifying the page content and the settings
+    """
+    if page.get("content_hash"):
+        content = f"page:{page['content_hash']}"
+    else:
+        content = f"document:{document_sha256}:{page.get('page')}"
+    return hashlib.sha256(f"{content}:{settings}".encode("utf-8")).hexdigest()
+
+
+def chunk_key(page_keys: List[str]) -> str:
+    """
+    Build the checkpoint key of a chunk of pages extracted in one call.
+
+    Args:
+        page_keys: Key of each page of the chunk, in page order
+
+    Returns:
+        Hex digest identifying the pages of the chunk, their content and the settings
+    """
+    return hashlib.sha256(f"chunk:{':'.join(page_keys)}".encode("utf-8")).hexdigest()
+
+
+class CheckpointStore:
+    """Directory of per-page (and per-chunk) extraction results"""
+
+    def __init__(self, root: str):
+        """
+        Open (and create if needed) the checkpoint directory.
+
+        Args:
+            root: Directory where page results are kept
+        """
+        self.root = os.path.abspath(root)
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.pkl")
+
+    def get(self, key: str) -> Optional[List[pd.DataFrame]]:
+        """
+        Load the tables stored for a page or a chunk.
+
+        Args:
+            key: Key returned by page_key or chunk_key
+
+        Returns:
+            List of DataFrames (possibly empty), or None if the page is not stored
+        """
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            return pd.read_pickle(path)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable checkpoint {path}: {e}")
+            return None
+
+    def put(self, key: str, tables: List[pd.DataFrame]) -> bool:
+        """
+        Atomically store the tables extracted from a page or a chunk.
+
+        Args:
+            key: Key returned by page_key or chunk_key
+            tables: Tables found (an empty list is stored as well)
+
+        Returns:
+            True if stored, False otherwise
+        """
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                pd.to_pickle(list(tables), f)
+            os.replace(temp_path, path)
+            return True
+        except OSError as e:
+            logger.warning(f"Could not write checkpoint {path}: {e}")
+            return False
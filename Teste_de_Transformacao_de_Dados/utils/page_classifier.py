@@ -0,0 +1,117 @@
+"""
+Page Classifier
+
+This module decides, for each page, which tabula extraction mode is worth running,
+based on the drawing operators summarized by utils.pdf_analysis:
+
+    - lattice: the page has a grid of ruling lines (bordered table)
+    - stream:  no grid, but text runs line up in several columns (borderless table)
+    - skip:    the page is blank, or only holds running text in a single column
+    - both:    none of the above can be told from the statistics (e.g. no text was
+               counted but the page draws images or paths, or the page could not be
+               analyzed), so both modes run, as with EXTRACTION_METHOD = "both"
+
+A page is only skipped on positive evidence that it has no table; anything else
+that is not recognized falls back to both modes rather than being dropped.
+
+Consecutive pages with the same mode are grouped, so each group is extracted with a
+single tabula call using only the mode it needs.
+
+Usage:
+    from utils.page_classifier import group_pages_by_mode
+
+    for mode, pages in group_pages_by_mode(analysis, [3, 4, 5]):
+        ...
+"""
+
+import logging
+from typing import Any, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+MODE_LATTICE = "lattice"
+MODE_STREAM = "stream"
+MODE_SKIP = "skip"
+MODE_BOTH = "both"
+
+# Ruling lines needed in each direction to treat a page as bordered without a detected grid
+MIN_RULINGS = 3
+# Text runs that must start at the same x for it to count as a column
+MIN_RUNS_PER_COLUMN = 3
+# Aligned columns needed for a borderless table
+MIN_ALIGNED_COLUMNS = 2
+# Text lines needed for a borderless table
+MIN_TEXT_LINES = 3
+# Share of the text runs starting at the margin for a page to count as running text
+MIN_MARGIN_SHARE = 0.8
+
+
+def classify_page(page: Dict[str, Any]) -> str:
+    """
+    Choose the extraction mode of a page from its analysis statistics.
+
+    Args:
+        page: Page entry of the analysis returned by analyze_pdf
+
+    Returns:
+        "lattice", "stream", "skip" or "both"
+    """
+    if not page or page.get("unreadable"):
+        return MODE_BOTH
+
+    if page.get("table_bboxes") or (page.get("horizontal_rulings", 0) >= MIN_RULINGS
+                                    and page.get("vertical_rulings", 0) >= MIN_RULINGS):
+        return MODE_LATTICE
+
+    text_chars = page.get("text_chars", 0)
+    rulings = page.get("horizontal_rulings", 0) + page.get("vertical_rulings", 0)
+    drawn = page.get("paths_painted", 0) + page.get("images", 0)
+    if text_chars == 0:
+        # Blank page, or content the statistics cannot see (images, outlined text)
+        return MODE_SKIP if drawn == 0 else MODE_BOTH
+
+    aligned_columns = sum(1 for _, count in page.get("text_x", []) if count >= MIN_RUNS_PER_COLUMN)
+    if aligned_columns >= MIN_ALIGNED_COLUMNS and page.get("text_lines", 0) >= MIN_TEXT_LINES:
+        return MODE_STREAM
+
+    runs = [count for _, count in page.get("text_x", [])]
+    if aligned_columns == 1 and max(runs) >= MIN_MARGIN_SHARE * sum(runs) \
+            and rulings == 0 and page.get("images", 0) == 0:
+        # Running text: (almost) every text run starts at the same margin and nothing else is drawn
+        return MODE_SKIP
+
+    return MODE_BOTH
+
+
+def group_pages_by_mode(analysis: Dict[str, Any], pages: List[int]) -> List[Tuple[str, List[int]]]:
+    """
+    Classify the selected pages and group consecutive pages that share a mode.
+
+    Skipped pages are left out (a group may span them), so the groups only cover
+    pages worth extracting.
+
+    Args:
+        analysis: Document analysis returned by analyze_pdf
+        pages: Sorted list of 1-based page numbers to classify
+
+    Returns:
+        List of (mode, pages) tuples in page order
+    """
+    page_stats = {entry["page"]: entry for entry in analysis.get("pages", [])}
+    groups: List[Tuple[str, List[int]]] = []
+    counts = {MODE_LATTICE: 0, MODE_STREAM: 0, MODE_BOTH: 0, MODE_SKIP: 0}
+
+    for page in pages:
+        mode = classify_page(page_stats.get(page, {}))
+        counts[mode] += 1
+
+        if mode == MODE_SKIP:
+            continue
+        if groups and groups[-1][0] == mode:
+            groups[-1][1].append(page)
+        else:
+            groups.append((mode, [page]))
+
+    logger.info(f"Page classification: {counts[MODE_LATTICE]} lattice, {counts[MODE_STREAM]} stream, "
+                f"{counts[MODE_BOTH]} both, {counts[MODE_SKIP]} skipped")
+    return groups
@@ -0,0 +1,447 @@
+"""
+PDF Analysis Cache
+
+This module parses a PDF once and keeps a per-file analysis next to it
+(`<file>.analysis.json`), keyed by the SHA-256 of the PDF content. Every later
+stage (metadata lookup, page selection, extraction) and every rerun reads the
+cached analysis instead of parsing the document again. Within a process, the
+analysis is also kept in memory while the file keeps its size and modification
+time, so repeated calls (one per extraction chunk) do not read the cache file again.
+
+The analysis holds the document metadata, the page count and, for each page:
+    - text statistics (characters, text lines, how many text runs start at each x)
+    - ruling statistics (horizontal and vertical line segments drawn on the page)
+    - table bounding boxes detected from clusters of ruling lines
+    - drawing counts (paths painted, images drawn), telling blank pages from pages
+      whose content the statistics above do not capture (e.g. scanned tables)
+    - a hash of what the page draws: its content stream, the Form XObjects it paints
+      and the resources (fonts, images) they use (changes when the page changes)
+
+Form XObjects are followed like the page stream itself, so pages whose content is
+drawn from forms get the same statistics as pages that draw it directly.
+
+Usage:
+    from utils.pdf_analysis import analyze_pdf
+
+    analysis = analyze_pdf("Anexo_1.pdf")
+    print(analysis['page_count'], analysis['pages'][0]['table_bboxes'])
+"""
+
+import os
+import json
+import hashlib
+import logging
+import tempfile
+from typing import Any, Dict, List, Optional, Tuple
+
+import PyPDF2
+from PyPDF2.generic import ContentStream, IndirectObject, StreamObject
+
+from utils.content_store import hash_file
+
+logger = logging.getLogger(__name__)
+
+# Bump when the analysis format changes, so older cache files are recomputed
+ANALYSIS_VERSION = 4
+
+# Segments shorter than this (in points) are not considered ruling lines
+MIN_RULING_LENGTH = 10.0
+# Maximum thickness (in points) of a filled rectangle that is drawn as a ruling line
+MAX_RULING_THICKNESS = 2.0
+# Distance (in points) under which two ruling segments belong to the same table
+RULING_TOLERANCE = 3.0
+# Nesting limits when following forms drawn inside forms and when describing resources
+MAX_FORM_DEPTH = 8
+MAX_DESCRIBE_DEPTH = 6
+
+_PATH_PAINT_OPERATORS = {b"S", b"s", b"f", b"F", b"f*", b"B", b"B*", b"b", b"b*"}
+_TEXT_SHOW_OPERATORS = {b"Tj", b"TJ", b"'", b'"'}
+_NUMERIC_OPERATORS = {b"cm", b"Tm", b"Td", b"TD", b"m", b"l", b"re", b"TL"}
+
+Matrix = Tuple[float, float, float, float, float, float]
+Segment = Tuple[float, float, float, float]
+
+# Analyses already loaded by this process: absolute path -> ((size, mtime_ns), analysis)
+_loaded: Dict[str, Tuple[Tuple[int, int], Dict[str, Any]]] = {}
+
+
+def analysis_path(filepath: str) -> str:
+    """Path of the analysis cache file kept next to a PDF"""
+    return f"{filepath}.analysis.json"
+
+
+def _multiply(m1: Matrix, m2: Matrix) -> Matrix:
+    """Multiply two PDF transformation matrices (m1 applied first)"""
+    a1, b1, c1, d1, e1, f1 = m1
+    a2, b2, c2, d2, e2, f2 = m2
+    return (
+        a1 * a2 + b1 * c2,
+        a1 * b2 + b1 * d2,
+        c1 * a2 + d1 * c2,
+        c1 * b2 + d1 * d2,
+        e1 * a2 + f1 * c2 + e2,
+        e1 * b2 + f1 * d2 + f2,
+    )
+
+
+def _apply(matrix: Matrix, x: float, y: float) -> Tuple[float, float]:
+    """Transform a point with a PDF transformation matrix"""
+    a, b, c, d, e, f = matrix
+    return a * x + c * y + e, b * x + d * y + f
+
+
+def _text_length(operands: List[Any]) -> int:
+    """Count the characters shown by a text operator"""
+    length = 0
+    for operand in operands:
+        if isinstance(operand, (str, bytes)):
+            length += len(operand)
+        elif isinstance(operand, list):
+            length += sum(len(item) for item in operand if isinstance(item, (str, bytes)))
+    return length
+
+
+def _cluster_table_bboxes(horizontal: List[Segment], vertical: List[Segment]) -> List[List[float]]:
+    """
+    Group ruling segments that touch each other and return the bounding box of each
+    group with at least two horizontal and two vertical rulings (i.e. a grid).
+
+    Args:
+        horizontal: Horizontal segments as (x0, y0, x1, y1)
+        vertical: Vertical segments as (x0, y0, x1, y1)
+
+    Returns:
+        List of [x0, y0, x1, y1] boxes, ordered from the top of the page
+    """
+    segments = [(seg, True) for seg in horizontal] + [(seg, False) for seg in vertical]
+    parent = list(range(len(segments)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    boxes = [(min(s[0], s[2]) - RULING_TOLERANCE, min(s[1], s[3]) - RULING_TOLERANCE,
+              max(s[0], s[2]) + RULING_TOLERANCE, max(s[1], s[3]) + RULING_TOLERANCE)
+             for s, _ in segments]
+
+    # Sweep on x0 so only segments overlapping horizontally are compared
+    order = sorted(range(len(segments)), key=lambda i: boxes[i][0])
+    active: List[int] = []
+    for i in order:
+        active = [j for j in active if boxes[j][2] >= boxes[i][0]]
+        for j in active:
+            if boxes[j][1] <= boxes[i][3] and boxes[i][1] <= boxes[j][3]:
+                parent[find(i)] = find(j)
+        active.append(i)
+
+    groups: Dict[int, Dict[str, Any]] = {}
+    for i, (seg, is_horizontal) in enumerate(segments):
+        group = groups.setdefault(find(i), {"h": 0, "v": 0, "bbox": [seg[0], seg[1], seg[2], seg[3]]})
+        group["h" if is_horizontal else "v"] += 1
+        bbox = group["bbox"]
+        bbox[0] = min(bbox[0], seg[0], seg[2])
+        bbox[1] = min(bbox[1], seg[1], seg[3])
+        bbox[2] = max(bbox[2], seg[0], seg[2])
+        bbox[3] = max(bbox[3], seg[1], seg[3])
+
+    tables = [[round(v, 1) for v in g["bbox"]] for g in groups.values() if g["h"] >= 2 and g["v"] >= 2]
+    return sorted(tables, key=lambda bbox: -bbox[3])
+
+
+def _describe(obj: Any, depth: int = 0) -> str:
+    """
+    Deterministic text of a PDF object, with indirect references resolved.
+
+    Streams are summarized by the hash of their data, and nesting is limited so that
+    parent links (e.g. /Parent) cannot make the description grow without bound.
+    """
+    if isinstance(obj, IndirectObject):
+        obj = obj.get_object()
+    if isinstance(obj, StreamObject):
+        return f"stream:{hashlib.sha256(obj.get_data()).hexdigest()}:{_describe(dict(obj), depth)}"
+    if depth >= MAX_DESCRIBE_DEPTH:
+        return "..."
+    if isinstance(obj, dict):
+        return "{" + ",".join(f"{key}:{_describe(value, depth + 1)}" for key, value in sorted(obj.items())
+                              if key != "/Parent") + "}"
+    if isinstance(obj, list):
+        return "[" + ",".join(_describe(item, depth + 1) for item in obj) + "]"
+    return repr(obj)
+
+
+def _resource(resources: Any, category: str, name: Any) -> Any:
+    """Resolve a named resource (e.g. an /XObject) from a resource dictionary"""
+    if resources is None:
+        return None
+    entries = resources.get_object().get(category)
+    if entries is None:
+        return None
+    entry = entries.get_object().get(name)
+    return entry.get_object() if entry is not None else None
+
+
+def analyze_page(page: PyPDF2.PageObject, reader: PyPDF2.PdfReader) -> Dict[str, Any]:
+    """
+    Collect text and ruling statistics of a single page from its drawing operators.
+
+    Form XObjects painted with Do are followed (with their /Matrix applied to the current
+    transformation), so pages whose content lives in forms are measured like any other.
+    The content hash covers the page stream, every form drawn, the fonts and other
+    resources they use and the page boxes and rotation, so it changes whenever what
+    the page shows changes.
+
+    Args:
+        page: Page to analyze
+        reader: Reader the page belongs to
+
+    Returns:
+        Dictionary with the page statistics
+    """
+    stats: Dict[str, Any] = {
+        "text_chars": 0,
+        "text_lines": 0,
+        "text_x": [],
+        "horizontal_rulings": 0,
+        "vertical_rulings": 0,
+        "table_bboxes": [],
+        "paths_painted": 0,
+        "images": 0,
+        "content_hash": None,
+    }
+
+    contents = page.get_contents()
+    if contents is None:
+        return stats
+    if not isinstance(contents, ContentStream):
+        contents = ContentStream(contents, reader)
+
+    content_hash = hashlib.sha256(contents.get_data())
+    resources = page.get("/Resources")
+    content_hash.update(_describe(resources).encode("utf-8"))
+    # Page geometry changes where the same drawing falls (and what tabula extracts)
+    content_hash.update(repr([[float(v) for v in page.mediabox], [float(v) for v in page.cropbox],
+                              page.rotation]).encode("utf-8"))
+
+    identity: Matrix = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+    horizontal: List[Segment] = []
+    vertical: List[Segment] = []
+    line_keys = set()
+    text_x: Dict[int, int] = {}
+
+    def scan(operations: List[Tuple[List[Any], bytes]], resources: Any, ctm: Matrix, forms: List[int]) -> None:
+        """Walk the operators of a content stream (the page or a form drawn with Do)"""
+        ctm_stack: List[Matrix] = []
+        text_matrix = line_matrix = identity
+        leading = 0.0
+        current = start = (0.0, 0.0)
+        path: List[Segment] = []
+
+        def add_segment(x0: float, y0: float, x1: float, y1: float) -> None:
+            (x0, y0), (x1, y1) = _apply(ctm, x0, y0), _apply(ctm, x1, y1)
+            path.append((x0, y0, x1, y1))
+
+        def add_rect(x: float, y: float, w: float, h: float) -> None:
+            if abs(h) <= MAX_RULING_THICKNESS or abs(w) <= MAX_RULING_THICKNESS:
+                # Thin filled rectangles are drawn as ruling lines
+                if abs(h) <= MAX_RULING_THICKNESS:
+                    add_segment(x, y + h / 2, x + w, y + h / 2)
+                else:
+                    add_segment(x + w / 2, y, x + w / 2, y + h)
+            else:
+                add_segment(x, y, x + w, y)
+                add_segment(x + w, y, x + w, y + h)
+                add_segment(x + w, y + h, x, y + h)
+                add_segment(x, y + h, x, y)
+
+        for operands, operator in operations:
+            try:
+                values = [float(v) for v in operands] if operator in _NUMERIC_OPERATORS else []
+            except (TypeError, ValueError):
+                continue
+
+            if operator == b"q":
+                ctm_stack.append(ctm)
+            elif operator == b"Q":
+                ctm = ctm_stack.pop() if ctm_stack else identity
+            elif operator == b"cm" and len(values) == 6:
+                ctm = _multiply(tuple(values), ctm)
+            elif operator == b"m" and len(values) == 2:
+                current = start = (values[0], values[1])
+            elif operator == b"l" and len(values) == 2:
+                add_segment(current[0], current[1], values[0], values[1])
+                current = (values[0], values[1])
+            elif operator == b"h":
+                add_segment(current[0], current[1], start[0], start[1])
+                current = start
+            elif operator == b"re" and len(values) == 4:
+                add_rect(*values)
+            elif operator in _PATH_PAINT_OPERATORS:
+                stats["paths_painted"] += 1
+                for x0, y0, x1, y1 in path:
+                    if abs(y1 - y0) < 1 and abs(x1 - x0) >= MIN_RULING_LENGTH:
+                        horizontal.append((x0, y0, x1, y1))
+                    elif abs(x1 - x0) < 1 and abs(y1 - y0) >= MIN_RULING_LENGTH:
+                        vertical.append((x0, y0, x1, y1))
+                path = []
+            elif operator == b"n":
+                path = []
+            elif operator == b"BT":
+                text_matrix = line_matrix = identity
+            elif operator == b"TL" and values:
+                leading = values[0]
+            elif operator == b"Tm" and len(values) == 6:
+                text_matrix = line_matrix = tuple(values)
+            elif operator in (b"Td", b"TD") and len(values) == 2:
+                if operator == b"TD":
+                    leading = -values[1]
+                text_matrix = line_matrix = _multiply((1.0, 0.0, 0.0, 1.0, values[0], values[1]), line_matrix)
+            elif operator in (b"T*", b"'", b'"'):
+                text_matrix = line_matrix = _multiply((1.0, 0.0, 0.0, 1.0, 0.0, -leading), line_matrix)
+            elif operator == b"INLINE IMAGE":
+                stats["images"] += 1
+            elif operator == b"Do" and operands:
+                form = _resource(resources, "/XObject", operands[0])
+                if form is not None and form.get("/Subtype") == "/Image":
+                    stats["images"] += 1
+                if form is None or form.get("/Subtype") != "/Form" or id(form) in forms \
+                        or len(forms) >= MAX_FORM_DEPTH:
+                    continue
+                content_hash.update(form.get_data())
+                form_resources = form.get("/Resources") or resources
+                if form_resources is not resources:
+                    content_hash.update(_describe(form_resources).encode("utf-8"))
+                try:
+                    matrix = tuple(float(v) for v in form.get("/Matrix", identity))
+                except (TypeError, ValueError):
+                    matrix = identity
+                # A form is painted inside its own q/Q, with its matrix applied first
+                scan(ContentStream(form, reader).operations, form_resources,
+                     _multiply(matrix, ctm) if len(matrix) == 6 else ctm, forms + [id(form)])
+
+            if operator in _TEXT_SHOW_OPERATORS:
+                x, y = _apply(_multiply(text_matrix, ctm), 0.0, 0.0)
+                stats["text_chars"] += _text_length(operands)
+                line_keys.add(round(y))
+                text_x[round(x)] = text_x.get(round(x), 0) + 1
+
+    scan(contents.operations, resources, identity, [])
+
+    stats["content_hash"] = content_hash.hexdigest()
+    stats["text_lines"] = len(line_keys)
+    # [x, number of text runs starting at x] pairs, used to detect aligned columns
+    stats["text_x"] = sorted([x, count] for x, count in text_x.items())
+    stats["horizontal_rulings"] = len(horizontal)
+    stats["vertical_rulings"] = len(vertical)
+    stats["table_bboxes"] = _cluster_table_bboxes(horizontal, vertical)
+    return stats
+
+
+def _read_cached(filepath: str, sha256: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Load the cached analysis if it matches the current file"""
+    try:
+        with open(analysis_path(filepath), "r", encoding="utf-8") as f:
+            analysis = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if analysis.get("version") != ANALYSIS_VERSION:
+        return None
+
+    stat = os.stat(filepath)
+    if sha256 is None:
+        # Fast path: same size and modification time as when the analysis was written
+        if analysis.get("size") == stat.st_size and analysis.get("mtime_ns") == stat.st_mtime_ns:
+            return analysis
+        return None
+
+    return analysis if analysis.get("sha256") == sha256 else None
+
+
+def _write_cache(filepath: str, analysis: Dict[str, Any]) -> None:
+    """Atomically write the analysis next to the PDF"""
+    target = analysis_path(filepath)
+    try:
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(target)), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(analysis, f)
+        os.replace(temp_path, target)
+    except OSError as e:
+        logger.warning(f"Could not persist PDF analysis to {target}: {e}")
+
+
+def analyze_pdf(filepath: str, force: bool = False) -> Dict[str, Any]:
+    """
+    Analyze a PDF, reusing the cached analysis when the file content has not changed.
+
+    Args:
+        filepath: Path to the PDF file
+        force: Whether to ignore the cache and parse the document again
+
+    Returns:
+        Dictionary with 'sha256', 'page_count', 'metadata' and a 'pages' list
+        (shared by the callers in this process, so it must not be modified)
+    """
+    key = os.path.abspath(filepath)
+    stat = os.stat(filepath)
+    if not force:
+        loaded = _loaded.get(key)
+        if loaded and loaded[0] == (stat.st_size, stat.st_mtime_ns):
+            return loaded[1]
+        cached = _read_cached(filepath)
+        if cached is not None:
+            logger.debug(f"Using cached analysis of {filepath}")
+            _loaded[key] = ((stat.st_size, stat.st_mtime_ns), cached)
+            return cached
+
+    sha256 = hash_file(filepath)
+    if not force:
+        cached = _read_cached(filepath, sha256)
+        if cached is not None:
+            # Content unchanged (e.g. file was copied), refresh the fast-path keys
+            cached["size"], cached["mtime_ns"] = stat.st_size, stat.st_mtime_ns
+            _write_cache(filepath, cached)
+            _loaded[key] = ((stat.st_size, stat.st_mtime_ns), cached)
+            return cached
+
+    logger.info(f"Analyzing {filepath}")
+    with open(filepath, "rb") as file:
+        reader = PyPDF2.PdfReader(file)
+        info = reader.metadata
+
+        pages = []
+        for number, page in enumerate(reader.pages, 1):
+            try:
+                page_stats = analyze_page(page, reader)
+            except Exception as e:
+                logger.warning(f"Could not analyze page {number}: {e}")
+                page_stats = {"text_chars": 0, "text_lines": 0, "text_x": [], "horizontal_rulings": 0,
+                              "vertical_rulings": 0, "table_bboxes": [], "paths_painted": 0, "images": 0,
+                              "content_hash": None, "unreadable": True}
+            page_stats["page"] = number
+            pages.append(page_stats)
+
+        metadata = {
+            'page_count': len(reader.pages),
+            'title': info.title if info and info.title else 'Unknown',
+            'author': info.author if info and info.author else 'Unknown',
+            'creator': info.creator if info and info.creator else 'Unknown',
+            'producer': info.producer if info and info.producer else 'Unknown'
+        }
+
+    stat = os.stat(filepath)
+    analysis = {
+        "version": ANALYSIS_VERSION,
+        "sha256": sha256,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "page_count": metadata['page_count'],
+        "metadata": metadata,
+        "pages": pages,
+    }
+
+    _write_cache(filepath, analysis)
+    _loaded[key] = ((stat.st_size, stat.st_mtime_ns), analysis)
+    logger.info(f"Analyzed {len(pages)} pages of {filepath}")
+    return analysis
@@ -9,15 +9,32 @@ Modules:
     table_operations: Functions for manipulating tables
     data_cleaning: Functions for standardizing and cleaning data
     csv_operations: Functions for saving tables to CSV files
+    table_writer: Incremental CSV, Parquet and Arrow writer returning file statistics
+    abbreviations: Compiled single-pass abbreviation expansion
+    schema_inference: Sample-based column type inference with a schema cache
 """
 
-from .table_operations import combine_tables
-from .data_cleaning import standardize_data_types, expand_abbreviations
-from .csv_operations import save_tables_to_csv, table_to_csv
+from .table_operations import combine_tables, iter_combined_tables
+from .data_cleaning import standardize_data_types, expand_abbreviations, clean_tables
+from .abbreviations import AbbreviationExpander, get_expander
+from .schema_inference import SchemaCache, schema_cache_path
+from .csv_operations import save_tables_to_csv, table_to_csv, stream_tables_to_csv
+from .table_writer import TableWriter, save_tables, write_tables
 
 __all__ = [
     'combine_tables',
+    'iter_combined_tables',
     'standardize_data_types',
+    'expand_abbreviations',
+    'clean_tables',
+    'AbbreviationExpander',
+    'get_expander',
+    'SchemaCache',
+    'schema_cache_path',
     'save_tables_to_csv',
-    'table_to_csv'
+    'table_to_csv',
+    'stream_tables_to_csv',
+    'TableWriter',
+    'save_tables',
+    'write_tables'
 ]
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Abbreviations Module
+
+This module expands abbreviations in text with a single compiled pattern: the whole
+abbreviation map becomes one alternation (longest abbreviations first, delimited by
+word boundaries), so every value is scanned once whatever the size of the map.
+
+Columns with few distinct values (categories such as segment or coverage codes)
+are expanded once per distinct value and mapped back to the rows.
+
+Classes:
+    AbbreviationExpander: Compiled expansion of an abbreviation map
+
+Functions:
+    get_expander: Get the cached expander of an abbreviation map
+"""
+
+import re
+import logging
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Default healthcare abbreviations of the Rol de Procedimentos
+DEFAULT_ABBREVIATIONS = {
+    'OD': 'ODONTOLÓGICA',
+    'AMB': 'AMBULATORIAL',
+    #'HCO': 'HOSPITALAR COM OBSTETRÍCIA',
+    #'HSO': 'HOSPITALAR SEM OBSTETRÍCIA',
+    #'REF': 'REFERÊNCIA',
+    #'PAC': 'PRECEDIMENTO DE ALTA COMPLEXIDADE',
+    #'DUT': 'DIRETRIZ DE UTILIZAÇÃO'
+}
+
+# Columns whose distinct values are at most this share of the rows are expanded per value
+UNIQUE_RATIO = 0.5
+
+
+class AbbreviationExpander:
+    """Expands every abbreviation of a map in a single pass over each value"""
+
+    def __init__(self, abbreviation_map: Dict[str, str]):
+        """
+        Compile the abbreviation map.
+
+        Args:
+            abbreviation_map: Dictionary mapping abbreviations to their expanded forms
+        """
+        self.abbreviation_map = dict(abbreviation_map)
+        self.pattern: Optional[re.Pattern] = None
+
+        if self.abbreviation_map:
+            # Longest first, so an abbreviation never shadows a longer one it prefixes
+            alternatives = sorted(self.abbreviation_map, key=len, reverse=True)
+            self.pattern = re.compile(r'\b(?:' + '|'.join(re.escape(a) for a in alternatives) + r')\b')
+
+    def _replace(self, match: re.Match) -> str:
+        return self.abbreviation_map[match.group(0)]
+
+    def expand_text(self, text: str) -> str:
+        """
+        Expand the abbreviations of a single string.
+
+        Args:
+            text: Text containing abbreviations
+
+        Returns:
+            Text with every abbreviation replaced by its expanded form
+        """
+        if self.pattern is None:
+            return text
+        return self.pattern.sub(self._replace, text)
+
+    def expand_series(self, series: pd.Series) -> pd.Series:
+        """
+        Expand the abbreviations of a text column.
+
+        Missing values are kept, every other value is converted to string.
+
+        Args:
+            series: Column to expand
+
+        Returns:
+            New Series with the expanded values
+        """
+        mask = series.notna()
+        if self.pattern is None or not mask.any():
+            return series
+
+        values = series[mask].astype(str)
+        codes, uniques = pd.factorize(values)
+
+        if len(uniques) <= len(values) * UNIQUE_RATIO:
+            # Low cardinality: expand each distinct value once and map back
+            expanded_uniques = np.array([self.expand_text(value) for value in uniques], dtype=object)
+            expanded = pd.Series(expanded_uniques[codes], index=values.index)
+        else:
+            expanded = values.str.replace(self.pattern, self._replace, regex=True)
+
+        result = series.astype(object)
+        result[mask] = expanded
+        return result
+
+
+@lru_cache(maxsize=32)
+def _cached_expander(items: Tuple[Tuple[str, str], ...]) -> AbbreviationExpander:
+    return AbbreviationExpander(dict(items))
+
+
+def get_expander(abbreviation_map: Optional[Dict[str, str]] = None) -> AbbreviationExpander:
+    """
+    Get the compiled expander of an abbreviation map, compiling it only once.
+
+    Args:
+        abbreviation_map: Dictionary mapping abbreviations to their expanded forms
+            If None, DEFAULT_ABBREVIATIONS is used
+
+    Returns:
+        AbbreviationExpander for the map
+    """
+    if abbreviation_map is None:
+        abbreviation_map = DEFAULT_ABBREVIATIONS
+    return _cached_expander(tuple(abbreviation_map.items()))
@@ -4,21 +4,23 @@ CSV Operations Module
 
 This module contains functions for exporting pandas DataFrames to CSV files
 and handling CSV-related operations for PDF table extraction results.
+Streaming and the Parquet/Arrow formats are handled by table_writer.
 
 Functions:
     save_tables_to_csv: Save multiple tables to CSV files
     table_to_csv: Convert a single table to CSV format with enhanced options
+    stream_tables_to_csv: Append a stream of tables to one CSV file in bounded memory
 """
 
 import os
 import pandas as pd
 import logging
-from typing import List
+from typing import Iterable, List, Union
 
 from pandas import DataFrame
-import csv
 
 from utils.ensure_directory_exists import ensure_directory_exists
+from .table_writer import CSV_OPTIONS, FORMAT_CSV, ROWS_PER_WRITE, normalize_newlines, save_tables, write_tables
 
 logger = logging.getLogger(__name__)
 
@@ -50,23 +52,10 @@ def table_to_csv(
         ensure_directory_exists(os.path.dirname(os.path.abspath(output_path)))
 
         # Process text columns to handle newlines
-        for col in df.columns:
-            if df[col].dtype == object:  # Only process string columns
-                # Replace newlines with spaces in text fields
-                df[col] = df[col].apply(
-                    lambda x: x.replace('\n', ' ').replace('\r', ' ') if isinstance(x, str) else x
-                )
+        normalize_newlines(df)
 
         # Save to CSV with proper quoting and NaN handling
-        df.to_csv(
-            output_path,
-            index=index,
-            encoding=encoding,
-            na_rep='',  # Replace NaN with empty string
-            quoting=csv.QUOTE_ALL,  # Quote all fields
-            quotechar='"',  # Use double quotes
-            doublequote=True,  # Properly escape quotes within fields
-        )
+        df.to_csv(output_path, index=index, encoding=encoding, **CSV_OPTIONS)
 
         logger.info(f"Successfully saved table to {output_path}")
         return True
@@ -75,8 +64,33 @@ def table_to_csv(
         return False
 
 
+def stream_tables_to_csv(
+        tables: Iterable[pd.DataFrame],
+        output_path: str,
+        encoding: str = 'utf-8',
+        rows_per_write: int = ROWS_PER_WRITE,
+) -> bool:
+    """
+    Write a stream of tables with the same columns to a single CSV file.
+
+    The header is written once and tables are appended as they arrive. Small tables
+    are buffered up to `rows_per_write` rows and written with one call, so memory
+    stays bounded by the buffer instead of the whole document (see iter_combined_tables).
+
+    Args:
+        tables: Iterable of DataFrames sharing the columns of the first one
+        output_path: Path where the CSV file will be saved
+        encoding: Character encoding for the CSV file
+        rows_per_write: Rows buffered before they are written to the file
+
+    Returns:
+        True if at least one row was written, False otherwise
+    """
+    return write_tables(tables, output_path, FORMAT_CSV, encoding, rows_per_write) is not None
+
+
 def save_tables_to_csv(
-        tables: DataFrame,
+        tables: Union[DataFrame, Iterable[DataFrame]],
         output_dir: str,
         base_filename: str,
         clean_headers: bool = True,
@@ -86,7 +100,8 @@ def save_tables_to_csv(
     Save combined table to CSV file.
 
     Args:
-        tables: DataFrame
+        tables: Combined DataFrame, or an iterable of aligned tables
+            (see iter_combined_tables) to be streamed to the file
         output_dir: Directory to save CSV files
         base_filename: Base name for CSV files
         clean_headers: Whether to clean table headers
@@ -98,19 +113,4 @@ def save_tables_to_csv(
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
 
-    saved_files = []
-
-    # Create filename for combined table
-    filename = f"{base_filename}_combined.csv"
-    filepath = os.path.join(output_dir, filename)
-
-    # Save to CSV
-    if table_to_csv(tables, filepath,index=False, encoding=encoding):
-        saved_files.append(filepath)
-
-    if saved_files:
-        logger.info(f"Saved {len(saved_files)} CSV files to {output_dir}")
-    else:
-        logger.warning("No CSV files were saved")
-
-    return saved_files
+    return [stats['path'] for stats in save_tables(tables, output_dir, base_filename, FORMAT_CSV, encoding)]
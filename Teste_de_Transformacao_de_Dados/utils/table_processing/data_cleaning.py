@@ -8,22 +8,32 @@ from PDF tables to ensure consistency and usability.
 Functions:
     standardize_data_types: Convert columns to appropriate data types
     expand_abbreviations: Expand abbreviations in column names and in cell values to their full form.
+    clean_tables: Expand abbreviations and standardize the types of a stream of tables
 """
 
 import pandas as pd
 import logging
+from contextlib import nullcontext
+from typing import Any, Iterable, Iterator, Optional
+
+from .abbreviations import get_expander
+from .schema_inference import SchemaCache, apply_schema, infer_schema
 
 logger = logging.getLogger(__name__)
 
 
-def standardize_data_types(df: pd.DataFrame) -> pd.DataFrame:
+def standardize_data_types(df: pd.DataFrame, schema_cache: Optional[SchemaCache] = None) -> pd.DataFrame:
     """
     Attempt to convert DataFrame columns to appropriate data types based on content.
 
-    This helps with sorting, filtering, and analysis of the extracted data.
+    This helps with sorting, filtering, and analysis of the extracted data. Types are
+    inferred from a sample of each column (see schema_inference) and applied with one
+    cast per column.
 
     Args:
         df: DataFrame with raw column types
+        schema_cache: Cache of schemas by table header; tables sharing a header
+            reuse the schema inferred for the first one
 
     Returns:
         DataFrame with standardized column types
@@ -31,42 +41,8 @@ def standardize_data_types(df: pd.DataFrame) -> pd.DataFrame:
     if df.empty:
         return df
 
-    # Create a copy to avoid modifying the original
-    result_df = df.copy()
-
-    # Try to convert numeric columns
-    for col in result_df.columns:
-        # Skip columns that are already numeric
-        if pd.api.types.is_numeric_dtype(result_df[col]):
-            continue
-
-        # Try to convert to numeric
-        try:
-            numeric_series = pd.to_numeric(result_df[col], errors='coerce')
-            # Only apply if most values were successfully converted (>50%)
-            if numeric_series.notna().sum() / len(numeric_series) > 0.5:
-                result_df[col] = numeric_series
-        except Exception:
-            pass
-
-    # Try to convert date columns
-    date_patterns = ['%d/%m/%Y']
-
-    for col in result_df.columns:
-        # Skip numeric columns
-        if pd.api.types.is_numeric_dtype(result_df[col]):
-            continue
-
-        # Look for date-like patterns
-        if result_df[col].astype(str).str.contains(r'\d{1,4}[-/]\d{1,2}[-/]\d{1,4}').any():
-            for pattern in date_patterns:
-                try:
-                    date_col = pd.to_datetime(result_df[col], format=pattern, errors='coerce')
-                    if date_col.notna().sum() / len(date_col) > 0.5:
-                        result_df[col] = date_col
-                        break
-                except Exception:
-                    continue
+    schema = schema_cache.get_schema(df) if schema_cache is not None else infer_schema(df)
+    result_df = apply_schema(df, schema)
 
     logger.info(f"Standardized data types for {len(result_df.columns)} columns")
     return result_df
@@ -80,6 +56,7 @@ def expand_abbreviations(df: pd.DataFrame, abbreviation_map: dict = None, expand
         df: pandas DataFrame with columns or values containing abbreviations
         abbreviation_map: Dictionary mapping abbreviations to their expanded forms
             If None, default healthcare abbreviations will be used
+        expand_cell_values: Whether to also expand abbreviations inside text cells
 
     Returns:
         DataFrame with expanded abbreviations
@@ -90,17 +67,9 @@ def expand_abbreviations(df: pd.DataFrame, abbreviation_map: dict = None, expand
     # Create a copy to avoid modifying the original
     result_df = df.copy()
 
-    # Default abbreviation mapping if none provided
-    if abbreviation_map is None:
-        abbreviation_map = {
-            'OD': 'ODONTOLÓGICA',
-            'AMB': 'AMBULATORIAL',
-            #'HCO': 'HOSPITALAR COM OBSTETRÍCIA',
-            #'HSO': 'HOSPITALAR SEM OBSTETRÍCIA',
-            #'REF': 'REFERÊNCIA',
-            #'PAC': 'PRECEDIMENTO DE ALTA COMPLEXIDADE',
-            #'DUT': 'DIRETRIZ DE UTILIZAÇÃO'
-        }
+    # Compiled once per abbreviation map (default healthcare abbreviations if None)
+    expander = get_expander(abbreviation_map)
+    abbreviation_map = expander.abbreviation_map
 
     # Rename columns that exactly match abbreviations
     columns_to_rename = {}
@@ -117,17 +86,33 @@ def expand_abbreviations(df: pd.DataFrame, abbreviation_map: dict = None, expand
         logger.info("Expanding abbreviations in cell values")
         for col in result_df.columns:
             if result_df[col].dtype == object:  # Only process text columns
-                # Create a mask for non-NaN values
-                non_nan_mask = result_df[col].notna()
-
-                # Only process non-NaN values
-                if non_nan_mask.any():  # Only proceed if there are non-NaN values
-                    for abbr, expanded in abbreviation_map.items():
-                        # Apply replacement only to non-NaN values
-                        result_df.loc[non_nan_mask, col] = result_df.loc[non_nan_mask, col].astype(str).str.replace(
-                            r'\b' + abbr + r'\b',
-                            expanded,
-                            regex=True
-                        )
+                # One pass over each value, whatever the number of abbreviations
+                result_df[col] = expander.expand_series(result_df[col])
 
     return result_df
+
+
+def clean_tables(tables: Iterable[pd.DataFrame], schema_cache: Optional[SchemaCache] = None,
+                 profiler: Optional[Any] = None) -> Iterator[pd.DataFrame]:
+    """
+    Expand abbreviations and standardize data types of each table, one at a time.
+
+    Args:
+        tables: Iterable of extracted tables
+        schema_cache: Cache of schemas by table header (see standardize_data_types)
+        profiler: Optional StageProfiler (see utils.profiling) timing each step
+
+    Yields:
+        Processed tables, in input order
+    """
+    for i, table in enumerate(tables):
+        # Expand abbreviations in column names and cells
+        with profiler.stage("expand_abbreviations") if profiler else nullcontext():
+            expanded_table = expand_abbreviations(df=table, expand_cell_values=True)
+
+        # Standardize data types
+        with profiler.stage("standardize_data_types") if profiler else nullcontext():
+            standard_table = standardize_data_types(expanded_table, schema_cache)
+
+        logger.info(f"Processed table {i + 1}: {len(table)} rows")
+        yield standard_table
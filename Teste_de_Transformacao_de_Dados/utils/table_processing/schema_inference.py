@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Schema Inference Module
+
+This module infers the column types of extracted tables from a bounded sample of
+each column and caches the result by table header. The tables of one PDF share a
+few headers, so the inference runs once per header and every table with that header
+is converted with one vectorized cast per column.
+
+The cache can be persisted next to the PDF (`<file>.schema.json`), keyed by the
+SHA-256 of the document, so reruns on the same document skip the inference entirely.
+
+Classes:
+    SchemaCache: Inferred schemas keyed by table header
+
+Functions:
+    infer_schema: Infer the type of each column from a sample
+    apply_schema: Convert the columns of a table to an inferred schema
+    schema_cache_path: Path of the schema cache kept next to a PDF
+"""
+
+import os
+import json
+import logging
+import tempfile
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Bump when the schema format or the inference rules change
+SCHEMA_VERSION = 1
+
+# Rows sampled per column for inference (evenly spaced over the column)
+SAMPLE_SIZE = 200
+# Share of sampled values that must convert for the type to be chosen
+NUMERIC_CONFIDENCE = 0.5
+DATE_CONFIDENCE = 0.5
+# Share of values that must convert when the cast is applied to a full column;
+# below it the column is left unchanged (the sample was not representative)
+APPLY_CONFIDENCE = 0.5
+
+DATE_PATTERN = r'\d{1,4}[-/]\d{1,2}[-/]\d{1,4}'
+DATE_FORMATS = ['%d/%m/%Y']
+
+TYPE_NUMERIC = "numeric"
+TYPE_TEXT = "text"
+DATE_PREFIX = "datetime:"
+
+Schema = Dict[str, str]
+
+
+def schema_cache_path(filepath: str) -> str:
+    """Path of the schema cache kept next to a PDF"""
+    return f"{filepath}.schema.json"
+
+
+def header_key(df: pd.DataFrame) -> str:
+    """Key identifying the header (column names, in order) of a table"""
+    return json.dumps([str(col) for col in df.columns], ensure_ascii=False)
+
+
+def _sample(series: pd.Series, size: int = SAMPLE_SIZE) -> pd.Series:
+    """Take up to `size` evenly spaced values of a column"""
+    if len(series) <= size:
+        return series
+    return series.iloc[np.linspace(0, len(series) - 1, size).astype(int)]
+
+
+def infer_column_type(series: pd.Series) -> str:
+    """
+    Infer the type of a column from a sample of its values.
+
+    Args:
+        series: Column to inspect
+
+    Returns:
+        "numeric", "datetime:<format>" or "text"
+    """
+    if pd.api.types.is_numeric_dtype(series):
+        return TYPE_NUMERIC
+    if pd.api.types.is_datetime64_any_dtype(series) or len(series) == 0:
+        return TYPE_TEXT
+
+    sample = _sample(series)
+
+    numeric = pd.to_numeric(sample, errors='coerce')
+    if numeric.notna().sum() / len(sample) > NUMERIC_CONFIDENCE:
+        return TYPE_NUMERIC
+
+    if sample.astype(str).str.contains(DATE_PATTERN).any():
+        for pattern in DATE_FORMATS:
+            dates = pd.to_datetime(sample, format=pattern, errors='coerce')
+            if dates.notna().sum() / len(sample) > DATE_CONFIDENCE:
+                return DATE_PREFIX + pattern
+
+    return TYPE_TEXT
+
+
+def infer_schema(df: pd.DataFrame) -> Schema:
+    """
+    Infer the type of each column of a table.
+
+    Args:
+        df: Table with raw column types
+
+    Returns:
+        Dictionary mapping column names to "numeric", "datetime:<format>" or "text"
+    """
+    return {str(col): infer_column_type(df[col]) for col in df.columns}
+
+
+def apply_schema(df: pd.DataFrame, schema: Schema) -> pd.DataFrame:
+    """
+    Convert the columns of a table to an inferred schema.
+
+    Each column is cast once. A cast that converts less than APPLY_CONFIDENCE of the
+    values is discarded and the column is kept as it was.
+
+    Args:
+        df: Table with raw column types
+        schema: Schema returned by infer_schema
+
+    Returns:
+        New DataFrame with converted columns
+    """
+    result_df = df.copy()
+
+    for col in result_df.columns:
+        column_type = schema.get(str(col), TYPE_TEXT)
+        column = result_df[col]
+        if column_type == TYPE_TEXT or len(column) == 0:
+            continue
+
+        if column_type == TYPE_NUMERIC:
+            if pd.api.types.is_numeric_dtype(column):
+                continue
+            converted = pd.to_numeric(column, errors='coerce')
+        else:
+            if pd.api.types.is_datetime64_any_dtype(column):
+                continue
+            converted = pd.to_datetime(column, format=column_type[len(DATE_PREFIX):], errors='coerce')
+
+        if converted.notna().sum() / len(converted) > APPLY_CONFIDENCE:
+            result_df[col] = converted
+
+    return result_df
+
+
+class SchemaCache:
+    """Inferred schemas keyed by table header, optionally persisted to a JSON file"""
+
+    def __init__(self, path: Optional[str] = None, document_sha256: Optional[str] = None):
+        """
+        Create the cache, loading the schemas saved for the same document.
+
+        Args:
+            path: JSON file used to persist the schemas (None keeps them in memory)
+            document_sha256: Hash of the source document; saved schemas of another
+                document (or another SCHEMA_VERSION) are ignored
+        """
+        self.path = path
+        self.document_sha256 = document_sha256
+        self.schemas: Dict[str, Schema] = {}
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+
+        if path:
+            self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        if data.get("version") == SCHEMA_VERSION and data.get("sha256") == self.document_sha256:
+            self.schemas = data.get("schemas", {})
+            logger.info(f"Loaded {len(self.schemas)} cached table schemas from {self.path}")
+
+    def get_schema(self, df: pd.DataFrame) -> Schema:
+        """
+        Get the schema of a table, inferring it on the first table with its header.
+
+        Args:
+            df: Table with raw column types
+
+        Returns:
+            Schema of the table header
+        """
+        key = header_key(df)
+        schema = self.schemas.get(key)
+        if schema is not None:
+            self.hits += 1
+            return schema
+
+        self.misses += 1
+        schema = infer_schema(df)
+        self.schemas[key] = schema
+        self._dirty = True
+        return schema
+
+    def save(self) -> bool:
+        """
+        Atomically write the schemas to the cache file, if anything changed.
+
+        Returns:
+            True if the cache is up to date on disk, False otherwise
+        """
+        if not self.path or not self._dirty:
+            return True
+
+        data = {"version": SCHEMA_VERSION, "sha256": self.document_sha256, "schemas": self.schemas}
+        try:
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)), suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Could not persist table schemas to {self.path}: {e}")
+            return False
+
+        self._dirty = False
+        logger.info(f"Saved {len(self.schemas)} table schemas to {self.path} "
+                    f"({self.hits} cache hits, {self.misses} inferred)")
+        return True
@@ -5,26 +5,114 @@ Table Operations Module
 This module contains functions for manipulating and combining pandas DataFrames
 extracted from tabular data in PDFs.
 
+Tables are combined in a single pass: each table is aligned to the schema of the
+first one and its repeated header rows are dropped as it arrives, so the result can
+either be concatenated once (combine_tables) or written chunk by chunk to an output
+file without holding every table in memory (iter_combined_tables).
+
 Functions:
+    iter_combined_tables: Align tables to a common schema one at a time
     combine_tables: Merge multiple tables into a single table
 """
 
 import pandas as pd
 import logging
-from typing import List, Optional
+from typing import Iterable, Iterator, List, Optional
 
 logger = logging.getLogger(__name__)
 
 
-def combine_tables(tables_list: List[pd.DataFrame], keep_headers: bool = False) -> Optional[pd.DataFrame]:
+def _align_columns(table: pd.DataFrame, columns: pd.Index) -> pd.DataFrame:
+    """
+    Align a table to the given columns without modifying it.
+
+    Missing columns are filled with None, extra columns are dropped and the
+    column order follows `columns`.
+
+    Args:
+        table: Table to align
+        columns: Target column labels
+
+    Returns:
+        The table itself if it already matches, otherwise an aligned copy
+    """
+    if table.columns.equals(columns):
+        return table
+
+    if table.columns.has_duplicates:
+        table = table.loc[:, ~table.columns.duplicated()]
+    return table.reindex(columns=columns, fill_value=None)
+
+
+def _header_rows(table: pd.DataFrame, header: str) -> pd.Series:
+    """
+    Flag the rows of a table that repeat the header.
+
+    Args:
+        table: Aligned table
+        header: Name of the first column of the combined table
+
+    Returns:
+        Boolean Series, True for rows whose first cell contains the header
+    """
+    return table.iloc[:, 0].astype(str).str.contains(header, regex=False)
+
+
+def iter_combined_tables(tables: Iterable[pd.DataFrame], keep_headers: bool = False) -> Iterator[pd.DataFrame]:
+    """
+    Align a stream of tables to the schema of the first one.
+
+    Tables are consumed one at a time and never modified, so this can feed a writer
+    that appends each chunk to a file in bounded memory.
+
+    Args:
+        tables: Iterable of pandas DataFrames, in document order
+        keep_headers: How to handle headers in subsequent tables
+            - If False (default): Rows repeating the header in tables after the
+              first are removed
+            - If True: All rows from all tables are kept
+
+    Yields:
+        The first table, then each following table aligned to its columns
+    """
+    columns = None
+    header = None
+    count = 0
+
+    for table in tables:
+        count += 1
+        if columns is None:
+            columns = table.columns
+            header = str(columns[0]) if len(columns) else None
+            yield table
+            continue
+
+        if not table.columns.equals(columns):
+            logger.warning(f"Table {count} has different columns than the first table")
+        aligned = _align_columns(table, columns)
+
+        if not keep_headers and header is not None and not aligned.empty:
+            mask = _header_rows(aligned, header)
+            if mask.any():
+                aligned = aligned[~mask.to_numpy()]
+
+        yield aligned
+
+    if count == 0:
+        logger.warning("No tables to combine")
+
+
+def combine_tables(tables_list: Iterable[pd.DataFrame], keep_headers: bool = False) -> Optional[pd.DataFrame]:
     """
     Combine multiple pandas DataFrames into a single DataFrame vertically.
 
     This function handles tables that may have different column structures by
-    aligning columns and handling missing or extra columns appropriately.
+    aligning columns and handling missing or extra columns appropriately. The
+    aligned tables are concatenated once, so the cost grows linearly with the
+    number of tables.
 
     Args:
-        tables_list: List of pandas DataFrames to combine vertically
+        tables_list: List (or any iterable) of pandas DataFrames to combine vertically
         keep_headers: How to handle headers in subsequent tables
             - If False (default): Headers from tables after the first are removed
               to prevent duplicate headers in the combined data
@@ -39,45 +127,18 @@ def combine_tables(tables_list: List[pd.DataFrame], keep_headers: bool = False)
         - Missing columns will be filled with None values
         - Extra columns not in the first table will be dropped
         - Column order is preserved based on the first table
+        - The input tables are not modified
     """
-    if not tables_list:
-        logger.warning("No tables to combine")
+    aligned: List[pd.DataFrame] = list(iter_combined_tables(tables_list, keep_headers))
+
+    if not aligned:
         return None
 
-    if len(tables_list) == 1:
+    if len(aligned) == 1:
         logger.info("Only one table found, no need to combine")
-        return tables_list[0]
-
-    # Check that all tables have the same columns
-    first_columns = set(tables_list[0].columns)
-    for i, table in enumerate(tables_list[1:], 2):
-        table_columns = set(table.columns)
-        if table_columns != first_columns:
-            logger.warning(f"Table {i} has different columns than the first table")
-            # Try to align columns
-            missing_cols = first_columns - table_columns
-            extra_cols = table_columns - first_columns
-            if missing_cols:
-                for col in missing_cols:
-                    table[col] = None
-            if extra_cols:
-                table = table.drop(columns=extra_cols)
-
-    # Match column order to first table
-    for i in range(1, len(tables_list)):
-        tables_list[i] = tables_list[i][tables_list[0].columns]
-
-    # Combine tables
-    if keep_headers:
-        combined = pd.concat(tables_list, ignore_index=True)
-    else:
-        # Remove header rows (which often get included as data rows) from subsequent tables
-        combined = tables_list[0].copy()
-        for table in tables_list[1:]:
-            # Skip rows that match the header pattern
-            header_pattern = combined.columns.tolist()
-            mask = ~table.iloc[:, 0].astype(str).str.contains(header_pattern[0], regex=False)
-            combined = pd.concat([combined, table[mask]], ignore_index=True)
-
-    logger.info(f"Combined {len(tables_list)} tables into one with {len(combined)} rows")
+        return aligned[0]
+
+    combined = pd.concat(aligned, ignore_index=True)
+
+    logger.info(f"Combined {len(aligned)} tables into one with {len(combined)} rows")
     return combined
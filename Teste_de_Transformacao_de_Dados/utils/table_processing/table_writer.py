@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Table Writer Module
+
+This module writes a stream of tables (chunks sharing the same columns) to a single
+output file in CSV, Parquet or Arrow IPC format. Chunks are buffered up to a row
+budget and written with one call, text columns are cleaned with vectorized string
+operations, and the writer returns the row/column statistics of the file so callers
+never need to read it back.
+
+Parquet and Arrow output require pyarrow.
+
+Classes:
+    TableWriter: Incremental writer for table chunks
+
+Functions:
+    normalize_newlines: Replace newlines in text columns with spaces
+    write_tables: Write a stream of tables to one file
+    save_tables: Save combined tables to the output directory
+"""
+
+import os
+import csv
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+import pandas as pd
+
+from utils.ensure_directory_exists import ensure_directory_exists
+
+logger = logging.getLogger(__name__)
+
+FORMAT_CSV = "csv"
+FORMAT_PARQUET = "parquet"
+FORMAT_ARROW = "arrow"
+
+FILE_EXTENSIONS = {
+    FORMAT_CSV: ".csv",
+    FORMAT_PARQUET: ".parquet",
+    FORMAT_ARROW: ".arrow",
+}
+
+# Options shared by every CSV written by this package
+CSV_OPTIONS = {
+    'na_rep': '',  # Replace NaN with empty string
+    'quoting': csv.QUOTE_ALL,  # Quote all fields
+    'quotechar': '"',  # Use double quotes
+    'doublequote': True,  # Properly escape quotes within fields
+}
+
+# Rows buffered before a write
+ROWS_PER_WRITE = 50000
+
+_NEWLINES = r'[\r\n]'
+
+
+def normalize_newlines(df: pd.DataFrame) -> None:
+    """
+    Replace newlines with spaces in the text columns of a DataFrame (in place).
+
+    Non-string values (numbers, timestamps, None) of mixed columns are left untouched,
+    and object columns without any string are skipped.
+
+    Args:
+        df: DataFrame to clean
+    """
+    for col in df.columns:
+        column = df[col]
+        if column.dtype != object:  # Only process string columns
+            continue
+        if pd.api.types.infer_dtype(column, skipna=True) == "string":
+            df[col] = column.str.replace(_NEWLINES, ' ', regex=True)
+            continue
+
+        # Mixed column: replace only in the values that are strings
+        is_text = column.map(lambda value: isinstance(value, str)).astype(bool)
+        if is_text.any():
+            cleaned = column.copy()
+            cleaned[is_text] = column[is_text].astype(str).str.replace(_NEWLINES, ' ', regex=True)
+            df[col] = cleaned
+
+
+def _import_pyarrow():
+    """Import pyarrow, which is only needed for Parquet and Arrow output"""
+    import pyarrow
+    import pyarrow.ipc  # noqa: F401
+    import pyarrow.parquet  # noqa: F401
+    return pyarrow
+
+
+class TableWriter:
+    """Incremental writer for table chunks that share the same columns"""
+
+    def __init__(self, path: str, output_format: str = FORMAT_CSV, encoding: str = 'utf-8',
+                 rows_per_write: int = ROWS_PER_WRITE):
+        """
+        Create the writer; the file is opened on the first write.
+
+        Args:
+            path: Output file path
+            output_format: "csv", "parquet" or "arrow" (Arrow IPC file)
+            encoding: Character encoding (CSV only)
+            rows_per_write: Rows buffered before they are written
+        """
+        if output_format not in FILE_EXTENSIONS:
+            raise ValueError(f"Unknown output format '{output_format}'. Options: {', '.join(FILE_EXTENSIONS)}")
+
+        self.path = path
+        self.output_format = output_format
+        self.encoding = encoding
+        self.rows_per_write = rows_per_write
+
+        self.rows = 0
+        self.chunks = 0
+        self.columns: List[str] = []
+
+        self._buffer: List[pd.DataFrame] = []
+        self._buffered_rows = 0
+        self._handle = None
+        self._arrow_writer = None
+        self._arrow_schema = None
+
+    def __enter__(self) -> "TableWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def write(self, df: pd.DataFrame) -> None:
+        """
+        Add a chunk of rows to the file.
+
+        Args:
+            df: Chunk with the columns of the first chunk written
+        """
+        if self.chunks and df.empty:
+            return
+
+        if not self.chunks:
+            self.columns = [str(col) for col in df.columns]
+
+        self._buffer.append(df)
+        self._buffered_rows += len(df)
+        self.chunks += 1
+        self.rows += len(df)
+
+        if self._buffered_rows >= self.rows_per_write:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the buffered chunks"""
+        if not self._buffer:
+            return
+
+        # A fresh frame, so cleaning leaves the caller's tables untouched
+        chunk = pd.concat(self._buffer, ignore_index=True) if len(self._buffer) > 1 else self._buffer[0].copy()
+        self._buffer, self._buffered_rows = [], 0
+
+        normalize_newlines(chunk)
+
+        if self.output_format == FORMAT_CSV:
+            self._write_csv(chunk)
+        else:
+            self._write_arrow(chunk)
+
+    def _write_csv(self, chunk: pd.DataFrame) -> None:
+        header = self._handle is None
+        if header:
+            ensure_directory_exists(os.path.dirname(os.path.abspath(self.path)))
+            self._handle = open(self.path, 'w', encoding=self.encoding, newline='')
+        chunk.to_csv(self._handle, index=False, header=header, **CSV_OPTIONS)
+
+    def _write_arrow(self, chunk: pd.DataFrame) -> None:
+        pa = _import_pyarrow()
+
+        chunk.columns = [str(col) for col in chunk.columns]
+        for col in chunk.columns:
+            column = chunk[col]
+            if column.dtype == object:
+                # Text columns may mix strings and numbers after concatenation
+                chunk[col] = column.astype(str).where(column.notna(), None)
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+
+        if self._arrow_writer is None:
+            # Columns without any value in the first chunk are typed as text
+            self._arrow_schema = pa.schema([
+                pa.field(field.name, pa.string()) if pa.types.is_null(field.type) else field
+                for field in table.schema
+            ])
+            ensure_directory_exists(os.path.dirname(os.path.abspath(self.path)))
+            if self.output_format == FORMAT_PARQUET:
+                self._arrow_writer = pa.parquet.ParquetWriter(self.path, self._arrow_schema)
+            else:
+                self._arrow_writer = pa.ipc.new_file(self.path, self._arrow_schema)
+
+        self._arrow_writer.write_table(self._conform(table, chunk))
+
+    def _conform(self, table: Any, chunk: pd.DataFrame) -> Any:
+        """Cast a chunk to the schema of the first chunk (types may differ between tables)"""
+        pa = _import_pyarrow()
+        if table.schema.equals(self._arrow_schema):
+            return table
+
+        arrays = []
+        for field in self._arrow_schema:
+            column = table.column(field.name)
+            if column.type.equals(field.type):
+                arrays.append(column)
+                continue
+            try:
+                arrays.append(column.cast(field.type))
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+                # Values that do not fit the column type are converted through pandas
+                values = chunk[field.name]
+                if pa.types.is_string(field.type):
+                    values = values.map(lambda x: x if x is None or isinstance(x, str) else str(x))
+                elif pa.types.is_timestamp(field.type):
+                    values = pd.to_datetime(values, errors='coerce')
+                else:
+                    values = pd.to_numeric(values, errors='coerce')
+                lost = int(values.isna().sum() - chunk[field.name].isna().sum())
+                if lost > 0:
+                    logger.warning(f"{lost} values of column '{field.name}' do not fit type {field.type}")
+                arrays.append(pa.array(values, type=field.type, from_pandas=True))
+        return pa.Table.from_arrays(arrays, schema=self._arrow_schema)
+
+    def close(self) -> Dict[str, Any]:
+        """
+        Write the remaining chunks and close the file.
+
+        Returns:
+            Statistics of the file: 'path', 'format', 'rows', 'columns',
+            'column_names', 'tables' and 'bytes'
+        """
+        self.flush()
+
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+        if self._arrow_writer is not None:
+            self._arrow_writer.close()
+            self._arrow_writer = None
+
+        return {
+            'path': self.path,
+            'format': self.output_format,
+            'rows': self.rows,
+            'columns': len(self.columns),
+            'column_names': self.columns,
+            'tables': self.chunks,
+            'bytes': os.path.getsize(self.path) if os.path.exists(self.path) else 0,
+        }
+
+
+def _remove(path: str) -> None:
+    """Delete a file if it exists"""
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def write_tables(
+        tables: Iterable[pd.DataFrame],
+        output_path: str,
+        output_format: str = FORMAT_CSV,
+        encoding: str = 'utf-8',
+        rows_per_write: int = ROWS_PER_WRITE,
+) -> Optional[Dict[str, Any]]:
+    """
+    Write a stream of tables with the same columns to a single file.
+
+    The file is written under a temporary name and moved into place once complete,
+    so a failure never leaves a partial output behind.
+
+    Args:
+        tables: Iterable of DataFrames sharing the columns of the first one
+        output_path: Path of the output file
+        output_format: "csv", "parquet" or "arrow"
+        encoding: Character encoding (CSV only)
+        rows_per_write: Rows buffered before they are written
+
+    Returns:
+        Statistics of the file (see TableWriter.close), or None if nothing was written
+    """
+    temp_path = f"{output_path}.{os.getpid()}.tmp"
+    try:
+        with TableWriter(temp_path, output_format, encoding, rows_per_write) as writer:
+            for table in tables:
+                writer.write(table)
+        stats = writer.close()
+    except ImportError as e:
+        logger.error(f"{output_format} output requires pyarrow: {e}")
+        _remove(temp_path)
+        return None
+    except Exception as e:
+        logger.error(f"Error saving tables to {output_path}: {e}")
+        _remove(temp_path)
+        return None
+
+    if stats['rows'] == 0:
+        logger.warning(f"Cannot save empty table stream to {output_path}")
+        _remove(temp_path)
+        return None
+
+    os.replace(temp_path, output_path)
+    stats['path'] = output_path
+
+    logger.info(f"Successfully saved {stats['rows']} rows and {stats['columns']} columns "
+                f"from {stats['tables']} tables to {output_path}")
+    return stats
+
+
+def save_tables(
+        tables: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+        output_dir: str,
+        base_filename: str,
+        output_format: str = FORMAT_CSV,
+        encoding: str = 'utf-8',
+) -> List[Dict[str, Any]]:
+    """
+    Save combined tables to `<output_dir>/<base_filename>_combined.<ext>`.
+
+    Args:
+        tables: Combined DataFrame, or an iterable of aligned tables
+            (see iter_combined_tables) to be streamed to the file
+        output_dir: Directory to save the file
+        base_filename: Base name for the file
+        output_format: "csv", "parquet" or "arrow"
+        encoding: Character encoding (CSV only)
+
+    Returns:
+        List with the statistics of each saved file
+    """
+    if output_format not in FILE_EXTENSIONS:
+        logger.error(f"Unknown output format '{output_format}'. Options: {', '.join(FILE_EXTENSIONS)}")
+        return []
+
+    filepath = os.path.join(output_dir, f"{base_filename}_combined{FILE_EXTENSIONS[output_format]}")
+    if isinstance(tables, pd.DataFrame):
+        tables = [tables]
+
+    stats = write_tables(tables, filepath, output_format, encoding)
+    saved = [stats] if stats else []
+
+    if saved:
+        logger.info(f"Saved {len(saved)} files to {output_dir}")
+    else:
+        logger.warning("No files were saved")
+
+    return saved
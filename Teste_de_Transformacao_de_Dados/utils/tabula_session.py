@@ -0,0 +1,118 @@
+"""
+Tabula JVM Session
+
+This module keeps a single in-process JVM (started through JPype) warm for all
+tabula-py calls made by a process, instead of paying the `java -jar` startup cost
+on every extraction (tabula-py >= 2.8). When JPype is not available, or the JVM
+cannot be started, it falls back to subprocess mode.
+
+Each process has one session (see get_session); parallel workers start their own
+session once, when the worker process is created.
+
+Usage:
+    from utils.tabula_session import get_session
+
+    session = get_session()
+    tables = session.read_pdf("document.pdf", pages="3-10", lattice=True)
+"""
+
+import time
+import logging
+from typing import List, Optional
+
+import pandas as pd
+import tabula
+
+logger = logging.getLogger(__name__)
+
+BACKEND_JPYPE = "jpype"
+BACKEND_SUBPROCESS = "subprocess"
+
+
+class TabulaSession:
+    """One tabula backend per process, with the JVM kept warm between calls"""
+
+    def __init__(self, backend: str = BACKEND_JPYPE, java_options: Optional[List[str]] = None):
+        self.requested_backend = backend
+        self.java_options = java_options or []
+        self.backend = None
+        self.startup_seconds = 0.0
+
+    def start(self) -> str:
+        """
+        Start the JVM if the JPype backend was requested and is available.
+
+        Returns:
+            The backend in use ("jpype" or "subprocess")
+        """
+        if self.backend is not None:
+            return self.backend
+
+        if self.requested_backend != BACKEND_JPYPE:
+            self.backend = BACKEND_SUBPROCESS
+            return self.backend
+
+        start = time.perf_counter()
+        try:
+            import jpype
+            import jpype.imports
+            from tabula.backend import jar_path
+
+            if not jpype.isJVMStarted():
+                jpype.addClassPath(jar_path())
+                jpype.startJVM(*self.java_options, convertStrings=False)
+
+            # Load tabula classes now so the first extraction does not pay for it
+            import technology.tabula  # noqa: F401
+
+            self.backend = BACKEND_JPYPE
+            self.startup_seconds = time.perf_counter() - start
+            logger.info(f"Started in-process JVM for tabula in {self.startup_seconds:.2f}s")
+        except Exception as e:
+            logger.warning(f"In-process JVM not available ({e}). Falling back to subprocess mode.")
+            self.backend = BACKEND_SUBPROCESS
+
+        return self.backend
+
+    def read_pdf(self, filepath: str, **kwargs) -> List[pd.DataFrame]:
+        """
+        Run tabula.read_pdf with the session backend.
+
+        Args:
+            filepath: Path to the PDF file
+            kwargs: Keyword arguments passed to tabula.read_pdf
+
+        Returns:
+            List of DataFrames returned by tabula
+        """
+        backend = self.start()
+
+        try:
+            return tabula.read_pdf(filepath, force_subprocess=backend == BACKEND_SUBPROCESS, **kwargs)
+        except Exception as e:
+            if backend != BACKEND_JPYPE:
+                raise
+            logger.warning(f"In-process tabula call failed ({e}). Retrying in subprocess mode.")
+            tables = tabula.read_pdf(filepath, force_subprocess=True, **kwargs)
+            # The JVM was the problem (tabula-py also sticks to subprocess mode from now on)
+            self.backend = BACKEND_SUBPROCESS
+            return tables
+
+
+_session: Optional[TabulaSession] = None
+
+
+def get_session(backend: str = BACKEND_JPYPE) -> TabulaSession:
+    """
+    Get the tabula session of the current process, creating it on first use.
+
+    Args:
+        backend: Requested backend ("jpype" or "subprocess")
+
+    Returns:
+        The process-wide TabulaSession
+    """
+    global _session
+    if _session is None or _session.requested_backend != backend:
+        _session = TabulaSession(backend)
+    return _session
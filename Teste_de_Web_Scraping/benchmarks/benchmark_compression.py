@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Compression Benchmark
+
+This script measures the time and output size of compress_files in its different modes
+(serial vs parallel, deflate levels, storing already compressed content) on a synthetic
+data set of configurable size.
+
+The data set mixes incompressible ".pdf" files (random bytes, like the embedded Flate
+streams of real annexes) with highly compressible ".csv" text files.
+
+Usage:
+    python benchmarks/benchmark_compression.py --size-gb 4 --files 16 --workers 8
+
+Author: Vitor Oliveira
+Date: 2025-03-25
+"""
+
+import os
+import sys
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pdf_compressor import compress_files  # noqa: E402
+
+
+CHUNK_SIZE = 16 * 1024 * 1024
+CSV_LINE = b'"10101012";"CONSULTA EM CONSULTORIO";"OD";"AMB";"2024-01-01"\n'
+
+
+def generate_dataset(target_dir: str, total_bytes: int, file_count: int) -> None:
+    """
+    Write half PDF-like (random) and half CSV-like (repetitive) files to a directory.
+
+    Args:
+        target_dir: Directory where files are written
+        total_bytes: Approximate total size of the data set
+        file_count: Number of files to write
+    """
+    file_size = max(total_bytes // file_count, 1)
+    csv_block = CSV_LINE * (CHUNK_SIZE // len(CSV_LINE))
+
+    for i in range(file_count):
+        is_pdf = i % 2 == 0
+        path = os.path.join(target_dir, f"file_{i:03d}.{'pdf' if is_pdf else 'csv'}")
+        with open(path, "wb") as f:
+            written = 0
+            while written < file_size:
+                size = min(CHUNK_SIZE, file_size - written)
+                f.write(os.urandom(size) if is_pdf else csv_block[:size])
+                written += size
+
+
+def run_case(name: str, source_dir: str, output_dir: str, **options) -> None:
+    """
+    Run compress_files once and print elapsed time, throughput and ratio.
+
+    Args:
+        name: Label printed for the case
+        source_dir: Directory with the data set
+        output_dir: Directory where the archive is written
+        options: Keyword arguments passed to compress_files
+    """
+    input_bytes = sum(os.path.getsize(os.path.join(root, f))
+                      for root, _, files in os.walk(source_dir) for f in files)
+
+    start = time.perf_counter()
+    success = compress_files(source_dir, output_dir, f"{name}.zip", **options)
+    elapsed = time.perf_counter() - start
+
+    if not success:
+        print(f"{name:<28} FAILED")
+        return
+
+    output_bytes = os.path.getsize(os.path.join(output_dir, f"{name}.zip"))
+    throughput = input_bytes / elapsed / (1024 * 1024)
+    print(f"{name:<28} {elapsed:>9.2f}s {throughput:>10.1f} MB/s {output_bytes / input_bytes:>8.3f}")
+    os.remove(os.path.join(output_dir, f"{name}.zip"))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark compress_files modes")
+    parser.add_argument("--size-gb", type=float, default=1.0, help="Total size of the data set in GB")
+    parser.add_argument("--files", type=int, default=8, help="Number of files in the data set")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Workers for parallel mode")
+    parser.add_argument("--work-dir", default=None, help="Directory for the data set (default: temp dir)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    work_dir = tempfile.mkdtemp(prefix="compress_bench_", dir=args.work_dir)
+    source_dir = os.path.join(work_dir, "source")
+    output_dir = os.path.join(work_dir, "output")
+    os.makedirs(source_dir)
+    os.makedirs(output_dir)
+
+    try:
+        print(f"Generating {args.size_gb:.2f} GB in {args.files} files...")
+        generate_dataset(source_dir, int(args.size_gb * 1024 ** 3), args.files)
+
+        print(f"{'case':<28} {'time':>10} {'throughput':>15} {'ratio':>8}")
+        run_case("serial_deflate_all", source_dir, output_dir, store_compressed_content=False)
+        run_case("serial_deflate", source_dir, output_dir)
+        run_case("serial_deflate_level1", source_dir, output_dir, compression_level=1)
+        run_case("parallel_deflate", source_dir, output_dir, parallel=True, max_workers=args.workers)
+        run_case("parallel_deflate_level1", source_dir, output_dir, parallel=True,
+                 max_workers=args.workers, compression_level=1)
+        run_case("parallel_zstd", source_dir, output_dir, parallel=True,
+                 max_workers=args.workers, compression="zstd")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,6 +9,7 @@ workflow, orchestrating the scraping and compression processes.
 The application uses modular architecture with separate components for:
 - PDF downloading (pdf_downloader module)
 - File compression (pdf_compressor module)
+- Download/compression pipeline (pdf_pipeline module)
 - Shared utilities (utils package)
 
 Usage:
@@ -25,6 +26,8 @@ from datetime import datetime
 
 from pdf_scrapper import scrape_pdfs
 from pdf_compressor import compress_files
+from pdf_pipeline import scrape_and_compress
+from utils.content_store import ContentStore, DEFAULT_STORE_DIR
 
 
 # Default configuration
@@ -34,6 +37,11 @@ CONFIG = {
     "compress_dir": "compressed_files",
     "keywords": ["anexo"],
     "max_downloads": 2,
+    "compression": "deflate",  # Options: "stored", "deflate", "bzip2", "lzma", "zstd"
+    "compression_level": None,  # None uses the default level of the chosen method
+    "parallel_compression": True,
+    "pipeline": True,  # Compress each PDF while the next one is still downloading
+    "content_store_dir": DEFAULT_STORE_DIR,  # Shared with the table extractor, None disables it
     "log_level": logging.INFO
 }
 
@@ -81,25 +89,49 @@ def main() -> int:
 
         logger.info("Starting ANS PDF Document Manager")
 
-        # Download PDFs
-        logger.info("Starting PDF scraping process")
-        download_count = scrape_pdfs(
-            url=CONFIG["url"],
-            download_dir=CONFIG["download_dir"],
-            keywords=CONFIG["keywords"],
-            max_downloads=CONFIG["max_downloads"]
-        )
-
-        if download_count == 0:
-            logger.warning("No PDFs were scraped. Skipping compression.")
-            return 0
-
-        # Compress downloaded files
-        logger.info("Starting compression process")
-        success = compress_files(
-            source_dir=CONFIG["download_dir"],
-            output_dir=CONFIG["compress_dir"]
-        )
+        store = ContentStore(CONFIG["content_store_dir"]) if CONFIG["content_store_dir"] else None
+
+        if CONFIG["pipeline"]:
+            # Download and compress PDFs in a single pass
+            logger.info("Starting PDF scraping and compression pipeline")
+            download_count, success = scrape_and_compress(
+                url=CONFIG["url"],
+                download_dir=CONFIG["download_dir"],
+                output_dir=CONFIG["compress_dir"],
+                keywords=CONFIG["keywords"],
+                max_downloads=CONFIG["max_downloads"],
+                compression=CONFIG["compression"],
+                compression_level=CONFIG["compression_level"],
+                store=store
+            )
+
+            if download_count == 0:
+                logger.warning("No PDFs were scraped. Skipping compression.")
+                return 0
+        else:
+            # Download PDFs
+            logger.info("Starting PDF scraping process")
+            download_count = scrape_pdfs(
+                url=CONFIG["url"],
+                download_dir=CONFIG["download_dir"],
+                keywords=CONFIG["keywords"],
+                max_downloads=CONFIG["max_downloads"],
+                store=store
+            )
+
+            if download_count == 0:
+                logger.warning("No PDFs were scraped. Skipping compression.")
+                return 0
+
+            # Compress downloaded files
+            logger.info("Starting compression process")
+            success = compress_files(
+                source_dir=CONFIG["download_dir"],
+                output_dir=CONFIG["compress_dir"],
+                compression=CONFIG["compression"],
+                compression_level=CONFIG["compression_level"],
+                parallel=CONFIG["parallel_compression"]
+            )
 
         if success:
             logger.info("Document management process completed successfully")
@@ -5,6 +5,13 @@ File Compressor Module
 This module provides functionality to compress files into ZIP archives.
 It can be used as a standalone tool or imported into other Python scripts.
 
+Members can be compressed serially or concurrently in a process pool (parallel mode).
+In parallel mode each worker streams its file through the compressor into a temporary
+file, and the main process writes the archive itself (local headers, member data and
+central directory) from the already compressed members.
+Files whose content is already compressed (PDFs, images, archives) are stored without
+recompression, since deflating them costs CPU for almost no size gain.
+
 Usage:
     Import the module: from pdf_compressor import compress_files
     Or run directly: python pdf_compressor.py source_directory output_directory [output_filename]
@@ -14,11 +21,18 @@ Date: 2025-03-25
 """
 
 import os
+import bz2
 import sys
+import lzma
+import shutil
+import struct
 import logging
+import tempfile
 import zipfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 
 from utils.ensure_directory_exists import ensure_directory_exists
 
@@ -26,8 +40,352 @@ from utils.ensure_directory_exists import ensure_directory_exists
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Supported compression methods (zstd is only available on Python 3.14+)
+COMPRESSION_METHODS: Dict[str, Optional[int]] = {
+    "stored": zipfile.ZIP_STORED,
+    "deflate": zipfile.ZIP_DEFLATED,
+    "bzip2": zipfile.ZIP_BZIP2,
+    "lzma": zipfile.ZIP_LZMA,
+    "zstd": getattr(zipfile, "ZIP_ZSTANDARD", None),
+}
+
+# Extensions whose content is already compressed and is stored as is
+ALREADY_COMPRESSED_EXTENSIONS = {
+    ".pdf", ".zip", ".gz", ".bz2", ".xz", ".zst", ".7z", ".rar",
+    ".png", ".jpg", ".jpeg", ".gif", ".webp",
+    ".docx", ".xlsx", ".pptx", ".odt", ".ods", ".parquet",
+}
+
+# Read size used when streaming files through the compressor
+CHUNK_SIZE = 1024 * 1024
+
+# Method-specific values of the ZIP format: version needed to extract
+VERSION_NEEDED = {zipfile.ZIP_STORED: 10, zipfile.ZIP_DEFLATED: 20, zipfile.ZIP_BZIP2: 46, zipfile.ZIP_LZMA: 63}
+if COMPRESSION_METHODS["zstd"] is not None:
+    VERSION_NEEDED[COMPRESSION_METHODS["zstd"]] = 63
+ZIP64_VERSION = 45
+# LZMA1 properties of the default preset (lc=3, lp=0, pb=2, 8 MiB dictionary), as zipfile writes them
+LZMA_DICT_SIZE = 1 << 23
+LZMA_PROPERTIES = bytes([(2 * 5 + 0) * 9 + 3]) + struct.pack("<I", LZMA_DICT_SIZE)
+
+
+def resolve_compression(compression: str) -> int:
+    """
+    Resolve a compression method name to its zipfile constant.
+
+    Args:
+        compression: One of "stored", "deflate", "bzip2", "lzma" or "zstd"
+
+    Returns:
+        The zipfile compression constant, falling back to ZIP_DEFLATED when the
+        requested method is not supported by the running Python version
+    """
+    if compression not in COMPRESSION_METHODS:
+        raise ValueError(f"Unknown compression method '{compression}'. "
+                         f"Options: {', '.join(COMPRESSION_METHODS)}")
+
+    compress_type = COMPRESSION_METHODS[compression]
+    if compress_type is None:
+        logger.warning(f"Compression '{compression}' is not supported by this Python version, using deflate")
+        return zipfile.ZIP_DEFLATED
+
+    return compress_type
+
+
+def select_compress_type(file_path: str, compress_type: int, store_compressed_content: bool = True) -> int:
+    """
+    Choose the compression method for a single archive member.
+
+    Args:
+        file_path: Path of the file being added
+        compress_type: Compression method requested for the archive
+        store_compressed_content: Whether already compressed files are stored without recompression
+
+    Returns:
+        ZIP_STORED for already compressed content, otherwise the requested method
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    if store_compressed_content and extension in ALREADY_COMPRESSED_EXTENSIONS:
+        return zipfile.ZIP_STORED
+    return compress_type
+
+
+def collect_files(source_dir: str) -> List[Tuple[str, str]]:
+    """
+    List all files under a directory with their archive names.
+
+    Args:
+        source_dir: Directory to walk
+
+    Returns:
+        List of (file_path, arcname) tuples, with arcname relative to source_dir
+    """
+    members = []
+    for root, _, files in os.walk(source_dir):
+        for file in sorted(files):
+            file_path = os.path.join(root, file)
+            members.append((file_path, os.path.relpath(file_path, source_dir)))
+    return members
+
+
+def build_zip_path(output_dir: str, output_filename: Optional[str] = None) -> str:
+    """
+    Build the full path of the ZIP archive to be written.
+
+    Args:
+        output_dir: Directory where the ZIP file will be saved
+        output_filename: Name of the output ZIP file (default: auto-generated name)
+
+    Returns:
+        Path of the ZIP file, always with a .zip extension
+    """
+    if not output_filename:
+        # Generate filename with timestamp if none provided
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_filename = f"anexos_{timestamp}.zip"
+
+    # Ensure the output filename has .zip extension
+    if not output_filename.endswith('.zip'):
+        output_filename += '.zip'
+
+    return os.path.join(output_dir, output_filename)
+
+
+class _LZMACompressor:
+    """Raw LZMA1 stream preceded by the header the ZIP format requires (version and properties)"""
+
+    def __init__(self):
+        self._compressor = lzma.LZMACompressor(lzma.FORMAT_RAW, filters=[{
+            "id": lzma.FILTER_LZMA1, "dict_size": LZMA_DICT_SIZE, "lc": 3, "lp": 0, "pb": 2}])
+        self._header = struct.pack("<BBH", 9, 4, len(LZMA_PROPERTIES)) + LZMA_PROPERTIES
+
+    def compress(self, data: bytes) -> bytes:
+        header, self._header = self._header, b""
+        return header + self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        header, self._header = self._header, b""
+        return header + self._compressor.flush()
+
 
-def compress_files(source_dir: str, output_dir: str, output_filename: Optional[str] = None) -> bool:
+def _get_compressor(compress_type: int, compression_level: Optional[int]):
+    """
+    Streaming compressor producing the member data of a compression method.
+
+    Args:
+        compress_type: zipfile compression constant (other than ZIP_STORED)
+        compression_level: Compression level, or None for the method default
+
+    Returns:
+        Object with compress(data) and flush() methods
+    """
+    if compress_type == zipfile.ZIP_DEFLATED:
+        level = zlib.Z_DEFAULT_COMPRESSION if compression_level is None else compression_level
+        return zlib.compressobj(level, zlib.DEFLATED, -15)
+    if compress_type == zipfile.ZIP_BZIP2:
+        return bz2.BZ2Compressor(9 if compression_level is None else compression_level)
+    if compress_type == zipfile.ZIP_LZMA:
+        return _LZMACompressor()
+    if compress_type == COMPRESSION_METHODS["zstd"]:
+        from compression import zstd
+        return zstd.ZstdCompressor(level=compression_level)
+    raise ValueError(f"Unsupported compression type: {compress_type}")
+
+
+def _compress_member(file_path: str, compress_type: int, compression_level: Optional[int],
+                     temp_dir: str) -> Tuple[str, int, int, int]:
+    """
+    Compress one file into a temporary file (runs inside a worker process).
+
+    Args:
+        file_path: File to compress
+        compress_type: zipfile compression constant
+        compression_level: Compression level, or None for the method default
+        temp_dir: Directory where the compressed data is written
+
+    Returns:
+        Tuple (temp_path, crc, file_size, compress_size)
+    """
+    compressor = _get_compressor(compress_type, compression_level)
+    crc = 0
+    file_size = 0
+
+    fd, temp_path = tempfile.mkstemp(dir=temp_dir, suffix=".part")
+    with os.fdopen(fd, "wb") as dest, open(file_path, "rb") as src:
+        while True:
+            chunk = src.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            crc = zlib.crc32(chunk, crc)
+            file_size += len(chunk)
+            dest.write(compressor.compress(chunk))
+        dest.write(compressor.flush())
+        compress_size = dest.tell()
+
+    return temp_path, crc, file_size, compress_size
+
+
+class _ZipWriter:
+    """
+    Minimal ZIP writer for members whose data is compressed elsewhere.
+
+    Writes each local header and its data as given, then the central directory (with
+    ZIP64 records when sizes, offsets or the member count need them) on close. Only
+    public zipfile APIs are used (ZipInfo.from_file for timestamps and permissions).
+    """
+
+    def __init__(self, fp):
+        self.fp = fp
+        self.entries: List[Tuple[zipfile.ZipInfo, int]] = []  # (info, local header offset)
+
+    @staticmethod
+    def _name(zinfo: zipfile.ZipInfo) -> Tuple[bytes, int]:
+        try:
+            return zinfo.filename.encode("ascii"), 0
+        except UnicodeEncodeError:
+            return zinfo.filename.encode("utf-8"), 0x800  # Language encoding flag (UTF-8 names)
+
+    @staticmethod
+    def _dos_time(zinfo: zipfile.ZipInfo) -> Tuple[int, int]:
+        year, month, day, hour, minute, second = zinfo.date_time
+        return hour << 11 | minute << 5 | second // 2, (year - 1980) << 9 | month << 5 | day
+
+    def _version(self, zinfo: zipfile.ZipInfo, zip64: bool) -> int:
+        return max(VERSION_NEEDED[zinfo.compress_type], ZIP64_VERSION if zip64 else 0)
+
+    def _local_header(self, zinfo: zipfile.ZipInfo) -> bytes:
+        name, name_flag = self._name(zinfo)
+        zip64 = zinfo.file_size > zipfile.ZIP64_LIMIT or zinfo.compress_size > zipfile.ZIP64_LIMIT
+        extra = struct.pack("<HHQQ", 1, 16, zinfo.file_size, zinfo.compress_size) if zip64 else b""
+        dos_time, dos_date = self._dos_time(zinfo)
+        return struct.pack("<IHHHHHIIIHH", 0x04034b50, self._version(zinfo, zip64), zinfo.flag_bits | name_flag,
+                           zinfo.compress_type, dos_time, dos_date, zinfo.CRC,
+                           0xFFFFFFFF if zip64 else zinfo.compress_size, 0xFFFFFFFF if zip64 else zinfo.file_size,
+                           len(name), len(extra)) + name + extra
+
+    def add(self, zinfo: zipfile.ZipInfo, data_path: str) -> None:
+        """
+        Write a member whose CRC and sizes are already set on zinfo.
+
+        Args:
+            zinfo: Member information (compress_type, flag_bits, CRC, file_size, compress_size)
+            data_path: File with the member data, exactly as stored in the archive
+        """
+        offset = self.fp.tell()
+        self.fp.write(self._local_header(zinfo))
+        with open(data_path, "rb") as src:
+            shutil.copyfileobj(src, self.fp, CHUNK_SIZE)
+        self.entries.append((zinfo, offset))
+
+    def add_stored(self, zinfo: zipfile.ZipInfo, file_path: str) -> None:
+        """
+        Write a file without compression, computing its CRC while it is copied.
+
+        The local header is written first and its CRC is filled in after the data.
+        """
+        zinfo.compress_type = zipfile.ZIP_STORED
+        zinfo.file_size = zinfo.compress_size = os.path.getsize(file_path)
+        zinfo.CRC = 0
+        offset = self.fp.tell()
+        self.fp.write(self._local_header(zinfo))
+        crc = 0
+        with open(file_path, "rb") as src:
+            while True:
+                chunk = src.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                crc = zlib.crc32(chunk, crc)
+                self.fp.write(chunk)
+        zinfo.CRC = crc
+        end = self.fp.tell()
+        self.fp.seek(offset + 14)  # CRC-32 field of the local header
+        self.fp.write(struct.pack("<I", crc))
+        self.fp.seek(end)
+        self.entries.append((zinfo, offset))
+
+    def close(self) -> None:
+        """Write the central directory and the end of central directory records"""
+        directory_offset = self.fp.tell()
+        for zinfo, offset in self.entries:
+            name, name_flag = self._name(zinfo)
+            # ZIP64 extra field holds, in this order, the values that do not fit in 32 bits
+            large = [value for value in (zinfo.file_size, zinfo.compress_size, offset) if value > zipfile.ZIP64_LIMIT]
+            extra = struct.pack("<HH", 1, 8 * len(large)) + struct.pack(f"<{len(large)}Q", *large) if large else b""
+            version = self._version(zinfo, bool(large))
+            dos_time, dos_date = self._dos_time(zinfo)
+            self.fp.write(struct.pack(
+                "<IHHHHHHIIIHHHHHII", 0x02014b50, 3 << 8 | version, version, zinfo.flag_bits | name_flag,
+                zinfo.compress_type, dos_time, dos_date, zinfo.CRC,
+                0xFFFFFFFF if zinfo.compress_size > zipfile.ZIP64_LIMIT else zinfo.compress_size,
+                0xFFFFFFFF if zinfo.file_size > zipfile.ZIP64_LIMIT else zinfo.file_size,
+                len(name), len(extra), 0, 0, 0, zinfo.external_attr,
+                0xFFFFFFFF if offset > zipfile.ZIP64_LIMIT else offset) + name + extra)
+        directory_size = self.fp.tell() - directory_offset
+
+        count = len(self.entries)
+        if count >= 0xFFFF or directory_offset > zipfile.ZIP64_LIMIT or directory_size > zipfile.ZIP64_LIMIT:
+            zip64_offset = self.fp.tell()
+            self.fp.write(struct.pack("<IQHHIIQQQQ", 0x06064b50, 44, 3 << 8 | ZIP64_VERSION, ZIP64_VERSION,
+                                      0, 0, count, count, directory_size, directory_offset))
+            self.fp.write(struct.pack("<IIQI", 0x07064b50, 0, zip64_offset, 1))
+            count = min(count, 0xFFFF)
+            directory_size = min(directory_size, 0xFFFFFFFF)
+            directory_offset = min(directory_offset, 0xFFFFFFFF)
+        self.fp.write(struct.pack("<IHHHHIIH", 0x06054b50, 0, 0, count, count, directory_size,
+                                  directory_offset, 0))
+
+
+def _write_members_parallel(zip_path: str, members: List[Tuple[str, str]], compress_type: int,
+                            compression_level: Optional[int], store_compressed_content: bool,
+                            max_workers: Optional[int], temp_parent: str) -> None:
+    """
+    Compress members concurrently in a process pool and assemble them in order.
+
+    Args:
+        zip_path: Path of the archive to write
+        members: List of (file_path, arcname) tuples
+        compress_type: Compression method requested for the archive
+        compression_level: Compression level, or None for the method default
+        store_compressed_content: Whether already compressed files are stored without recompression
+        max_workers: Number of worker processes (default: CPU count)
+        temp_parent: Directory where temporary compressed data is kept
+    """
+    with tempfile.TemporaryDirectory(dir=temp_parent, prefix=".compress_") as temp_dir, \
+            ProcessPoolExecutor(max_workers=max_workers) as executor, open(zip_path, "wb") as fp:
+        futures = []
+        for file_path, arcname in members:
+            member_type = select_compress_type(file_path, compress_type, store_compressed_content)
+            if member_type == zipfile.ZIP_STORED:
+                # Nothing to compute besides the CRC, written directly in the main process
+                futures.append((member_type, None))
+            else:
+                futures.append((member_type, executor.submit(_compress_member, file_path, member_type,
+                                                             compression_level, temp_dir)))
+
+        # Members are appended in walk order as their workers finish
+        writer = _ZipWriter(fp)
+        for (file_path, arcname), (member_type, future) in zip(members, futures):
+            zinfo = zipfile.ZipInfo.from_file(file_path, arcname)
+            if future is None:
+                writer.add_stored(zinfo, file_path)
+                continue
+            temp_path, zinfo.CRC, zinfo.file_size, zinfo.compress_size = future.result()
+            zinfo.compress_type = member_type
+            # LZMA data ends with an end-of-stream (EOS) marker
+            zinfo.flag_bits = 0x02 if member_type == zipfile.ZIP_LZMA else 0
+            writer.add(zinfo, temp_path)
+            os.remove(temp_path)
+        writer.close()
+
+
+def compress_files(source_dir: str,
+                   output_dir: str,
+                   output_filename: Optional[str] = None,
+                   compression: str = "deflate",
+                   compression_level: Optional[int] = None,
+                   parallel: bool = False,
+                   max_workers: Optional[int] = None,
+                   store_compressed_content: bool = True) -> bool:
     """
     Compress all files in the source directory into a ZIP archive in the output directory.
 
@@ -35,6 +393,11 @@ def compress_files(source_dir: str, output_dir: str, output_filename: Optional[s
         source_dir: Directory containing files to compress
         output_dir: Directory where the ZIP file will be saved
         output_filename: Name of the output ZIP file (default: auto-generated name)
+        compression: Compression method ("stored", "deflate", "bzip2", "lzma" or "zstd")
+        compression_level: Compression level for the chosen method (default: method default)
+        parallel: Whether to compress members concurrently in a process pool
+        max_workers: Number of worker processes in parallel mode (default: CPU count)
+        store_compressed_content: Whether already compressed files (e.g. PDFs) are stored as is
 
     Returns:
         True if compression successful, False otherwise
@@ -54,36 +417,30 @@ def compress_files(source_dir: str, output_dir: str, output_filename: Optional[s
             logger.error(f"Cannot create output directory '{output_dir}'")
             return False
 
-        if not output_filename:
-            # Generate filename with timestamp if none provided
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            output_filename = f"anexos_{timestamp}.zip"
+        zip_path = build_zip_path(output_dir, output_filename)
+        output_filename = os.path.basename(zip_path)
 
-        # Ensure the output filename has .zip extension
-        if not output_filename.endswith('.zip'):
-            output_filename += '.zip'
+        compress_type = resolve_compression(compression)
+        members = collect_files(source_dir)
 
-        # Full path for the zip file
-        zip_path = os.path.join(output_dir, output_filename)
+        if not members:
+            logger.warning(f"No files found in {source_dir} to compress")
+            return False
 
-        file_count = 0
-        logger.info(f"Compressing files from {source_dir} to {zip_path}")
+        mode = "parallel" if parallel else "serial"
+        logger.info(f"Compressing files from {source_dir} to {zip_path} ({compression}, {mode})")
 
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            # Add all files from the directory
-            for root, _, files in os.walk(source_dir):
-                for file in files:
-                    file_path = os.path.join(root, file)
+        if parallel:
+            _write_members_parallel(zip_path, members, compress_type, compression_level,
+                                    store_compressed_content, max_workers, output_dir)
+        else:
+            with zipfile.ZipFile(zip_path, 'w', compress_type, compresslevel=compression_level) as zipf:
+                for file_path, arcname in members:
                     # Add file to zip (with path relative to source_dir)
-                    arcname = os.path.relpath(file_path, source_dir)
-                    zipf.write(file_path, arcname)
-                    file_count += 1
+                    member_type = select_compress_type(file_path, compress_type, store_compressed_content)
+                    zipf.write(file_path, arcname, compress_type=member_type)
 
-        if file_count == 0:
-            logger.warning(f"No files found in {source_dir} to compress")
-            return False
-
-        logger.info(f"Successfully compressed {file_count} files into {output_filename}")
+        logger.info(f"Successfully compressed {len(members)} files into {output_filename}")
         return True
     except Exception as e:
         logger.error(f"Failed to compress files: {e}")
@@ -112,4 +469,4 @@ if __name__ == "__main__":
         sys.exit(0)
     else:
         print(f"Compression failed. See log for details.")
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)
@@ -0,0 +1,148 @@
+"""
+Scrape and Compress Pipeline
+
+This module runs the scraping and compression steps as a producer/consumer pipeline.
+A producer thread downloads the PDFs and hands each finished download to the archive
+writer through a bounded queue, so compression of one file overlaps with the download
+of the next and the downloaded files are never read back from disk.
+
+The bounded queue keeps memory usage limited to a few files in flight: when the writer
+falls behind, the downloader blocks until there is room in the queue.
+
+Usage:
+    from pdf_pipeline import scrape_and_compress
+
+    download_count, success = scrape_and_compress(
+        url="https://example.com",
+        download_dir="downloads",
+        output_dir="compressed",
+        keywords=["anexo"],
+        max_downloads=2
+    )
+
+Author: Vitor Oliveira
+Date: 2025-03-25
+"""
+
+import os
+import queue
+import logging
+import threading
+import zipfile
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from pdf_scrapper import scrape_pdfs
+from pdf_compressor import build_zip_path, resolve_compression, select_compress_type
+from utils.content_store import ContentStore
+from utils.ensure_directory_exists import ensure_directory_exists
+
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Marks the end of the downloads in the queue
+_END_OF_DOWNLOADS = None
+
+
+def scrape_and_compress(url: str,
+                        download_dir: str,
+                        output_dir: str,
+                        keywords: List[str],
+                        max_downloads: int,
+                        output_filename: Optional[str] = None,
+                        compression: str = "deflate",
+                        compression_level: Optional[int] = None,
+                        queue_size: int = 2,
+                        store: Optional[ContentStore] = None) -> Tuple[int, bool]:
+    """
+    Download PDFs and write them to a ZIP archive while the downloads are still in flight.
+
+    Args:
+        url: URL to fetch PDF files from
+        download_dir: Directory where downloaded files are saved
+        output_dir: Directory where the ZIP file will be saved
+        keywords: List of keywords to match in link text
+        max_downloads: Maximum number of PDFs to download
+        output_filename: Name of the output ZIP file (default: auto-generated name)
+        compression: Compression method ("stored", "deflate", "bzip2", "lzma" or "zstd")
+        compression_level: Compression level for the chosen method (default: method default)
+        queue_size: Maximum number of downloaded files waiting to be compressed
+        store: Optional content store, so PDFs already fetched are not downloaded again
+
+    Returns:
+        Tuple (number of downloaded files, True if the archive was written successfully)
+    """
+    if not ensure_directory_exists(output_dir):
+        logger.error(f"Cannot create output directory '{output_dir}'")
+        return 0, False
+
+    try:
+        compress_type = resolve_compression(compression)
+    except ValueError as e:
+        logger.error(f"Failed to compress files: {e}")
+        return 0, False
+
+    zip_path = build_zip_path(os.path.normpath(output_dir), output_filename)
+    downloads: queue.Queue = queue.Queue(maxsize=queue_size)
+    producer_result = {"count": 0, "error": None}
+
+    def produce() -> None:
+        try:
+            producer_result["count"] = scrape_pdfs(
+                url=url,
+                download_dir=download_dir,
+                keywords=keywords,
+                max_downloads=max_downloads,
+                on_download=lambda file_path, content: downloads.put((file_path, content)),
+                store=store
+            )
+        except Exception as e:
+            producer_result["error"] = e
+        finally:
+            downloads.put(_END_OF_DOWNLOADS)
+
+    producer = threading.Thread(target=produce, name="pdf-downloader", daemon=True)
+    producer.start()
+
+    file_count = 0
+    write_error = None
+    logger.info(f"Compressing downloads into {zip_path} as they arrive")
+
+    try:
+        with zipfile.ZipFile(zip_path, 'w', compress_type, compresslevel=compression_level) as zipf:
+            while True:
+                item = downloads.get()
+                if item is _END_OF_DOWNLOADS:
+                    break
+
+                file_path, content = item
+                arcname = os.path.relpath(file_path, download_dir)
+                zinfo = zipfile.ZipInfo(arcname, date_time=datetime.now().timetuple()[:6])
+                zinfo.compress_type = select_compress_type(file_path, compress_type)
+                zinfo.external_attr = 0o644 << 16
+                zipf.writestr(zinfo, content, compresslevel=compression_level)
+                file_count += 1
+                logger.info(f"Added {arcname} to {os.path.basename(zip_path)}")
+    except Exception as e:
+        write_error = e
+        # Keep draining so the producer is never blocked on a full queue
+        while downloads.get() is not _END_OF_DOWNLOADS:
+            pass
+
+    producer.join()
+
+    if producer_result["error"] is not None:
+        logger.error(f"Scraping failed: {producer_result['error']}")
+    if write_error is not None:
+        logger.error(f"Failed to compress files: {write_error}")
+
+    if file_count == 0 or write_error is not None or producer_result["error"] is not None:
+        if os.path.exists(zip_path):
+            os.remove(zip_path)
+        if file_count == 0 and write_error is None:
+            logger.warning("No PDFs were downloaded, archive was not created")
+        return producer_result["count"], False
+
+    logger.info(f"Successfully compressed {file_count} files into {os.path.basename(zip_path)}")
+    return producer_result["count"], True
@@ -23,12 +23,13 @@ Date: 2025-03-25
 
 import os
 import logging
-from typing import List, Optional
+from typing import Callable, Dict, List, Optional
 
 import requests
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
 
+from utils.content_store import ContentStore
 from utils.ensure_directory_exists import ensure_directory_exists
 
 
@@ -90,40 +91,108 @@ def extract_pdf_links(parsed_data: BeautifulSoup, keywords: List[str]) -> List[s
     return pdf_download_links
 
 
-def download_pdf(url: str, filename: str) -> bool:
+def fetch_pdf(url: str, headers: Optional[Dict[str, str]] = None) -> Optional[requests.Response]:
     """
-    Download a PDF file from a URL and save it locally.
+    Fetch a PDF file from a URL.
 
     Args:
-        url: The URL of the PDF to download
-        filename: Local path where the PDF should be saved
+        url: The URL of the PDF to fetch
+        headers: Optional request headers (e.g. conditional request validators)
 
     Returns:
-        True if download successful, False otherwise
+        Response with the PDF content (or a 304 Not Modified response) or None if request fails
     """
 
     try:
-        logger.info(f"Downloading {url} to {filename}")
-        response = requests.get(url, timeout=60)
+        logger.info(f"Downloading {url}")
+        response = requests.get(url, headers=headers, timeout=60)
         response.raise_for_status()
+        return response
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Failed to download PDF: {e}")
+        return None
+
+
+def download_pdf(url: str, filename: str,
+                 on_download: Optional[Callable[[str, bytes], None]] = None,
+                 store: Optional[ContentStore] = None) -> bool:
+    """
+    Download a PDF file from a URL and save it locally.
+
+    When a content store is given, the file is kept in the store and materialized at
+    filename, and a URL already in the store is only downloaded again if the server
+    reports that it changed (ETag / Last-Modified validators).
+
+    Args:
+        url: The URL of the PDF to download
+        filename: Local path where the PDF should be saved
+        on_download: Optional callback receiving (filename, content) once the file is saved,
+            so later stages can use the content without reading the file again
+        store: Optional content store shared with the other tools
 
-        with open(filename, "wb") as f:
-            f.write(response.content)
+    Returns:
+        True if download successful, False otherwise
+    """
 
-        logger.info(f"Successfully downloaded {filename}")
+    cached = store.lookup_url(url) if store else None
+    headers = {}
+    if cached and cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+    if cached and cached.get("last_modified"):
+        headers["If-Modified-Since"] = cached["last_modified"]
+
+    response = fetch_pdf(url, headers)
+
+    if cached and (response is None or response.status_code == 304):
+        # Unchanged (or unreachable) upstream: reuse the stored copy
+        logger.info(f"Using content store copy of {url}")
+        if not store.materialize(cached["digest"], filename):
+            return False
+        if on_download:
+            with open(filename, "rb") as f:
+                on_download(filename, f.read())
         return True
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Failed to download PDF: {e}")
+
+    if response is None:
         return False
+
+    content = response.content
+    temp_path = f"{filename}.{os.getpid()}.tmp"
+
+    try:
+        if store:
+            digest = store.put_bytes(
+                content,
+                url=url,
+                name=os.path.basename(filename),
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified")
+            )
+            if not store.materialize(digest, filename):
+                return False
+        else:
+            # Replace the file instead of rewriting it, so other links to the old file keep their content
+            with open(temp_path, "wb") as f:
+                f.write(content)
+            os.replace(temp_path, filename)
     except IOError as e:
         logger.error(f"Failed to save PDF: {e}")
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
         return False
 
+    logger.info(f"Successfully downloaded {filename}")
+    if on_download:
+        on_download(filename, content)
+    return True
+
 
 def scrape_pdfs(url: str,
     download_dir: str,
     keywords: List[str],
-    max_downloads: int) -> bool:
+    max_downloads: int,
+    on_download: Optional[Callable[[str, bytes], None]] = None,
+    store: Optional[ContentStore] = None) -> int:
     """
     Scrape and download PDF files from specified website that match given keywords.
 
@@ -132,6 +201,8 @@ def scrape_pdfs(url: str,
         download_dir: Directory where files will be saved
         keywords: List of keywords to match in link text (default: ["anexo"])
         max_downloads: Maximum number of PDFs to download (default: 2)
+        on_download: Optional callback receiving (file_path, content) for each finished download
+        store: Optional content store, so PDFs already fetched are not downloaded again
 
     Returns:
         Number of successfully downloaded files
@@ -139,19 +210,19 @@ def scrape_pdfs(url: str,
 
     if not ensure_directory_exists(download_dir):
         logger.error("Cannot proceed without valid download directory")
-        return
+        return 0
 
     # Fetch and parse the page
     parsed_data = fetch_and_parse_page_content(url)
     if not parsed_data:
         logger.error("Cannot proceed without page content")
-        return
+        return 0
 
     # Extract relevant PDF links
     pdf_links = extract_pdf_links(parsed_data, keywords)
     if not pdf_links:
         logger.warning("No matching PDFs found")
-        return
+        return 0
 
     # Download PDFs (limited to MAX_DOWNLOADS)
     download_count = 0
@@ -164,7 +235,8 @@ def scrape_pdfs(url: str,
         file_path = os.path.join(download_dir, f"Anexo_{i + 1}.pdf")
 
         # Download the PDF file
-        if download_pdf(pdf_url, file_path):
+        if download_pdf(pdf_url, file_path, on_download, store):
             download_count += 1
 
     logger.info(f"Scraping process completed. Downloaded {download_count} PDFs.")
+    return download_count
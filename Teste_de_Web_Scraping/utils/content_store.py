@@ -0,0 +1,352 @@
+"""
+Content Store Module
+
+This module provides a local content-addressed store for downloaded files, shared
+by the scraper and the table extractor so each PDF is fetched and stored only once.
+
+Files are stored under their SHA-256 digest and can be looked up by source URL
+or by file name (e.g. "Anexo_1.pdf"). Working copies are materialized from the
+store with a reflink (copy-on-write clone) when the file system supports it and
+a plain copy otherwise, never a hard link: the working copy belongs to its tool,
+which may overwrite it. The store is size-bounded
+and evicts the least recently used objects when it grows past its limit.
+
+The store location defaults to ~/.cache/ans_content_store and can be changed
+with the ANS_CONTENT_STORE environment variable, so both tools share it.
+
+Usage:
+    from utils.content_store import ContentStore
+
+    store = ContentStore()
+    digest = store.put_bytes(content, url=pdf_url, name="Anexo_1.pdf")
+    store.materialize(digest, "downloaded_files/Anexo_1.pdf")
+
+Author: Vitor Oliveira
+Date: 2025-03-25
+"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import logging
+import tempfile
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from utils.ensure_directory_exists import ensure_directory_exists
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_DIR = os.environ.get(
+    "ANS_CONTENT_STORE",
+    os.path.join(os.path.expanduser("~"), ".cache", "ans_content_store")
+)
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3  # 2 GB
+
+# Linux ioctl request for copy-on-write file clones (btrfs, xfs, ...)
+_FICLONE = 0x40049409
+_CHUNK_SIZE = 1024 * 1024
+
+
+def hash_file(path: str) -> str:
+    """
+    Compute the SHA-256 digest of a file.
+
+    Args:
+        path: Path of the file
+
+    Returns:
+        Hex digest of the file content
+    """
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK_SIZE), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def _reflink(source: str, destination: str) -> bool:
+    """Clone a file with a copy-on-write reflink, if the platform supports it"""
+    if fcntl is None:
+        return False
+
+    try:
+        with open(source, "rb") as src, open(destination, "wb") as dst:
+            fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+        return True
+    except OSError:
+        if os.path.exists(destination):
+            os.remove(destination)
+        return False
+
+
+@contextmanager
+def _file_lock(path: str) -> Iterator[None]:
+    """Hold an exclusive lock on a lock file (shared by every process using the store)"""
+    with open(path, "a+b") as f:
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class ContentStore:
+    """Local content-addressed file store with LRU eviction"""
+
+    def __init__(self, root: str = DEFAULT_STORE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.objects_dir = os.path.join(root, "objects")
+        self.index_path = os.path.join(root, "index.json")
+        # Index updates are read-modify-write, serialized across processes with this lock
+        self.lock_path = os.path.join(root, "index.lock")
+        ensure_directory_exists(self.objects_dir)
+
+    # Index handling
+
+    def _load_index(self) -> Dict[str, Any]:
+        """Load the index from disk (re-read on every call so other processes' changes are seen)"""
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"objects": {}, "urls": {}, "names": {}}
+
+    def _save_index(self, index: Dict[str, Any]) -> None:
+        """Atomically replace the index on disk"""
+        fd, temp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=2)
+        os.replace(temp_path, self.index_path)
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    # Lookup API
+
+    def lookup_url(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Find the stored object downloaded from a URL.
+
+        Args:
+            url: Source URL
+
+        Returns:
+            Dictionary with 'digest' and the HTTP validators ('etag', 'last_modified')
+            recorded for the URL, or None if the URL is unknown
+        """
+        index = self._load_index()
+        entry = index["urls"].get(url)
+        if entry and entry["digest"] in index["objects"]:
+            return entry
+        return None
+
+    def lookup_name(self, name: str) -> Optional[str]:
+        """
+        Find the digest of the latest object stored under a file name.
+
+        Args:
+            name: File name, e.g. "Anexo_1.pdf"
+
+        Returns:
+            Hex digest or None if the name is unknown
+        """
+        index = self._load_index()
+        digest = index["names"].get(os.path.basename(name))
+        return digest if digest in index["objects"] else None
+
+    def path_for(self, digest: str) -> Optional[str]:
+        """
+        Get the path of a stored object and mark it as recently used.
+
+        Args:
+            digest: Hex digest of the object
+
+        Returns:
+            Path of the object inside the store or None if it is not stored
+        """
+        with _file_lock(self.lock_path):
+            index = self._load_index()
+            path = self._object_path(digest)
+            if digest not in index["objects"] or not os.path.exists(path):
+                return None
+
+            index["objects"][digest]["last_access"] = time.time()
+            self._save_index(index)
+        return path
+
+    def contains(self, digest: str) -> bool:
+        """Check whether an object is stored"""
+        return os.path.exists(self._object_path(digest))
+
+    # Insertion
+
+    def _register(self, digest: str, size: int, url: Optional[str], name: Optional[str],
+                  etag: Optional[str], last_modified: Optional[str]) -> None:
+        """Record an object and its aliases in the index, then enforce the size limit"""
+        with _file_lock(self.lock_path):
+            index = self._load_index()
+            index["objects"][digest] = {"size": size, "last_access": time.time()}
+            if url:
+                index["urls"][url] = {"digest": digest, "etag": etag, "last_modified": last_modified}
+            if name:
+                index["names"][os.path.basename(name)] = digest
+            self._evict(index, keep=digest)
+            self._save_index(index)
+
+    def put_bytes(self, content: bytes, url: Optional[str] = None, name: Optional[str] = None,
+                  etag: Optional[str] = None, last_modified: Optional[str] = None) -> str:
+        """
+        Store content in memory under its SHA-256 digest.
+
+        Args:
+            content: File content
+            url: Source URL to record as an alias
+            name: File name to record as an alias
+            etag: ETag header returned with the content
+            last_modified: Last-Modified header returned with the content
+
+        Returns:
+            Hex digest of the content
+        """
+        digest = hashlib.sha256(content).hexdigest()
+        path = self._object_path(digest)
+
+        if not os.path.exists(path):
+            ensure_directory_exists(os.path.dirname(path))
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+            os.chmod(temp_path, 0o444)
+            os.replace(temp_path, path)
+
+        self._register(digest, len(content), url, name, etag, last_modified)
+        return digest
+
+    def put_file(self, file_path: str, url: Optional[str] = None, name: Optional[str] = None) -> str:
+        """
+        Store a copy of an existing file (a reflink when the file system supports it).
+
+        The file is never hard-linked: the caller still owns it and may overwrite it,
+        which would change the stored object without changing its digest. The digest
+        is computed from the store's own read-only copy.
+
+        Args:
+            file_path: File to store
+            url: Source URL to record as an alias
+            name: File name to record as an alias (default: the file's own name)
+
+        Returns:
+            Hex digest of the file content
+        """
+        fd, temp_path = tempfile.mkstemp(dir=self.objects_dir, suffix=".tmp")
+        os.close(fd)
+        try:
+            if not _reflink(file_path, temp_path):
+                shutil.copyfile(file_path, temp_path)
+            digest = hash_file(temp_path)
+            path = self._object_path(digest)
+            if not os.path.exists(path):
+                ensure_directory_exists(os.path.dirname(path))
+                os.chmod(temp_path, 0o444)
+                os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        self._register(digest, os.path.getsize(path), url, name or os.path.basename(file_path), None, None)
+        return digest
+
+    # Materialization
+
+    @staticmethod
+    def _clone_or_copy(source: str, destination: str) -> str:
+        """
+        Create destination from source with a reflink, or a copy if reflinks are not supported.
+
+        Returns:
+            The method used: "reflink" or "copy"
+        """
+        if _reflink(source, destination):
+            return "reflink"
+        shutil.copyfile(source, destination)
+        return "copy"
+
+    def materialize(self, digest: str, destination: str) -> bool:
+        """
+        Make a stored object available at a destination path.
+
+        Args:
+            digest: Hex digest of the object
+            destination: Path where the file should appear
+
+        Returns:
+            True if the destination holds the object's content, False otherwise
+        """
+        source = self.path_for(digest)
+        if source is None:
+            logger.warning(f"Object {digest[:12]} is not in the content store")
+            return False
+
+        try:
+            # A hard link to the object (made by older versions) is replaced by a copy
+            if (os.path.exists(destination) and not os.path.samefile(source, destination)
+                    and hash_file(destination) == digest):
+                return True
+
+            ensure_directory_exists(os.path.dirname(os.path.abspath(destination)))
+            temp_path = f"{destination}.{os.getpid()}.tmp"
+            method = self._clone_or_copy(source, temp_path)
+            os.replace(temp_path, destination)
+            logger.info(f"Materialized {os.path.basename(destination)} from content store ({method})")
+            return True
+        except OSError as e:
+            logger.error(f"Failed to materialize {destination}: {e}")
+            return False
+
+    # Eviction
+
+    def _evict(self, index: Dict[str, Any], keep: Optional[str] = None) -> None:
+        """Remove least recently used objects until the store fits in max_bytes"""
+        total = sum(entry["size"] for entry in index["objects"].values())
+        if total <= self.max_bytes:
+            return
+
+        by_access = sorted(index["objects"].items(), key=lambda item: item[1]["last_access"])
+        for digest, entry in by_access:
+            if total <= self.max_bytes:
+                break
+            if digest == keep:
+                continue
+
+            try:
+                os.remove(self._object_path(digest))
+            except FileNotFoundError:
+                pass
+            del index["objects"][digest]
+            total -= entry["size"]
+            logger.info(f"Evicted {digest[:12]} from content store ({entry['size']} bytes)")
+
+        # Drop aliases pointing to evicted objects
+        index["urls"] = {url: entry for url, entry in index["urls"].items()
+                         if entry["digest"] in index["objects"]}
+        index["names"] = {name: digest for name, digest in index["names"].items()
+                          if digest in index["objects"]}